@@ -1,6 +1,8 @@
 from crewai import Agent
-from tools.file_operations import write_file, read_file, create_directory, list_directory, append_to_file, copy_item, move_item, delete_item, get_file_info, search_files, create_from_template
-from tools.code_execution import validate_syntax, install_dependencies, execute_code, run_tests, format_code, lint_code, build_project
+from tools.file_operations import write_file, write_files, apply_patch, read_file, read_files, create_directory, list_directory, append_to_file, copy_item, move_item, delete_item, get_file_info, search_files, create_from_template
+from tools.code_execution import validate_syntax, validate_project_syntax, install_dependencies, execute_code, run_tests, format_code, lint_code, build_project, list_toolchains
+from tools.toolchains import get_toolchains
+from llm import create_llm
 from config import AGENT_VERBOSE
 
 
@@ -9,20 +11,22 @@ def create_developer_agent():
     dev_backstory = """You are an experienced software engineer who writes high-quality code \
         following best practices and industry standards. You focus on creating robust solutions \
         with proper error handling and documentation."""
+    # Tools missing on this machine are listed up front so they are not attempted
+    dev_backstory += "\n\n" + get_toolchains().summary(versions=False)
     
     return Agent(
         role="Senior Full-Stack Software Engineer",
         
         goal="""Write clean, efficient, and maintainable code based on detailed technical specifications.""",
         backstory=dev_backstory,
-        llm="openai/gpt-5-mini",
+        llm=create_llm("developer"),
         verbose=AGENT_VERBOSE,
         tools=[
-            write_file, read_file, create_directory, list_directory,
-            validate_syntax, install_dependencies, append_to_file, 
+            write_file, write_files, apply_patch, read_file, read_files, create_directory, list_directory,
+            validate_syntax, validate_project_syntax, install_dependencies, append_to_file, 
             copy_item, move_item, delete_item, get_file_info, 
             search_files, create_from_template, execute_code, 
-            run_tests, format_code, lint_code, build_project
+            run_tests, format_code, lint_code, build_project, list_toolchains
         ],
         allow_delegation=False,
         max_iter=20
@@ -5,6 +5,7 @@ from tools.github_tools import (
     get_repo_status, clone_repository
 )
 from tools.file_operations import write_file
+from llm import create_llm
 from config import AGENT_VERBOSE
 
 
@@ -184,7 +185,7 @@ def create_github_agent():
         
         When the task tells you to use a tool, copy the name EXACTLY as shown.
         Do not paraphrase or create variations.""",
-        llm="openai/gpt-5-mini",
+        llm=create_llm("github"),
         verbose=AGENT_VERBOSE,
         tools=[
             create_github_repo,
@@ -1,4 +1,5 @@
 from crewai import Agent
+from llm import create_llm
 from config import AGENT_VERBOSE
 
 
@@ -146,7 +147,7 @@ def create_manager_agent():
         REMEMBER: Your plan should be so detailed that a competent developer who has never seen 
         the project can implement it exactly as specified without asking questions.""",
         
-        llm="openai/gpt-5-mini",
+        llm=create_llm("manager"),
         verbose=AGENT_VERBOSE,
         allow_delegation=False,
         max_iter=20
@@ -1,7 +1,9 @@
 from crewai import Agent
 from tools.testing_tools import run_tests, run_tests_with_coverage, format_code, lint_code, generate_test_file
-from tools.code_execution import execute_code, validate_syntax
-from tools.file_operations import write_file, read_file, create_directory, list_directory, append_to_file, copy_item, move_item, delete_item, get_file_info, search_files, create_from_template
+from tools.code_execution import execute_code, validate_syntax, validate_project_syntax, list_toolchains
+from tools.toolchains import get_toolchains
+from tools.file_operations import write_file, write_files, apply_patch, read_file, read_files, create_directory, list_directory, append_to_file, copy_item, move_item, delete_item, get_file_info, search_files, create_from_template
+from llm import create_llm
 from config import AGENT_VERBOSE
 
 
@@ -9,15 +11,16 @@ def create_tester_agent():
     return Agent(
         role="QA Engineer & Test Specialist",
         goal="Ensure code quality through comprehensive testing and validation",
-        backstory="You are a meticulous QA engineer who ensures code reliability through thorough testing and validation.",
+        backstory="You are a meticulous QA engineer who ensures code reliability through thorough testing and validation.\n\n"
+                  + get_toolchains().summary(versions=False),
         verbose=AGENT_VERBOSE,
-        llm="openai/gpt-5-mini",
+        llm=create_llm("tester"),
         tools=[
             run_tests, format_code, lint_code, generate_test_file,
-            execute_code, validate_syntax, read_file, write_file,
+            execute_code, validate_syntax, validate_project_syntax, read_file, read_files, write_file, write_files, apply_patch,
             append_to_file, run_tests_with_coverage, create_directory,
             list_directory, copy_item, move_item, delete_item,
-            get_file_info, search_files, create_from_template
+            get_file_info, search_files, create_from_template, list_toolchains
         ],
         allow_delegation=False,
         max_iter=20
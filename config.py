@@ -15,6 +15,77 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5-mini")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "codellama:13b-instruct")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+# Alternative OpenAI-compatible endpoint for openai/ models (e.g. the offline mock server:
+# python -m llm.mock_server, then LLM_BASE_URL=http://127.0.0.1:8787/v1)
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "")
+# Record every agent LLM exchange to this JSON-lines file (replayable by the mock server);
+# answers served from the response cache are recorded too
+LLM_TRANSCRIPT_PATH = os.getenv("LLM_TRANSCRIPT_PATH", "")
+MOCK_LLM_HOST = os.getenv("MOCK_LLM_HOST", "127.0.0.1")
+MOCK_LLM_PORT = int(os.getenv("MOCK_LLM_PORT", "8787"))
+
+# Model Routing
+# Each agent starts on a tier; the router may move a request to the large tier (big prompt or
+# reasoning-heavy task) and falls back along the list when a model is slow, saturated or failing.
+DEFAULT_MODEL = f"ollama/{OLLAMA_MODEL}" if LLM_PROVIDER == "ollama" else f"openai/{OPENAI_MODEL}"
+LLM_LARGE_MODEL = os.getenv("LLM_LARGE_MODEL", DEFAULT_MODEL)
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", LLM_LARGE_MODEL)
+LLM_FALLBACK_MODELS = [m.strip() for m in os.getenv("LLM_FALLBACK_MODELS", "").split(",") if m.strip()]
+LLM_AGENT_TIERS = {
+    "manager": os.getenv("LLM_TIER_MANAGER", "large"),
+    "developer": os.getenv("LLM_TIER_DEVELOPER", "large"),
+    "tester": os.getenv("LLM_TIER_TESTER", "large"),
+    "github": os.getenv("LLM_TIER_GITHUB", "small"),
+}
+LLM_ROUTING_POLICY = {
+    "small_max_prompt_tokens": int(os.getenv("LLM_SMALL_MAX_PROMPT_TOKENS", "6000")),  # bigger prompts go large
+    "latency_budget_seconds": float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "90")),   # slower average = "slow"
+    "max_inflight_per_model": int(os.getenv("LLM_MAX_INFLIGHT_PER_MODEL", "8")),      # more = "saturated"
+    "failure_cooldown_seconds": float(os.getenv("LLM_FAILURE_COOLDOWN_SECONDS", "60")),
+}
+
+# LLM Rate Limiting (per model, shared by all agents and by batch/server workers; set to your provider quota)
+LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENT_CALLS = int(os.getenv("LLM_MAX_CONCURRENT_CALLS", "8"))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "5"))
+# SQLite file holding buckets shared by several processes (set automatically for batch and job-server workers)
+LLM_RATE_LIMIT_DB = os.getenv("LLM_RATE_LIMIT_DB", "")
+# Completion tokens assumed per call when reserving token-bucket capacity
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "1500"))
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", Path.home() / ".developer_ai_agent" / "llm_cache"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "512"))
+
+# Tool Result Cache (syntax/lint/format results per file content, reused while files are unchanged)
+TOOL_RESULT_CACHE_ENABLED = os.getenv("TOOL_RESULT_CACHE_ENABLED", "true").lower() == "true"
+TOOL_RESULT_CACHE_DIR = Path(os.getenv("TOOL_RESULT_CACHE_DIR", Path.home() / ".developer_ai_agent" / "tool_results"))
+TOOL_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_RESULT_CACHE_MAX_ENTRIES", "200000"))
+
+# Toolchain Registry (paths/versions of the executables the tools call, probed once and reused for a day)
+TOOLCHAIN_CACHE_FILE = Path(os.getenv("TOOLCHAIN_CACHE_FILE", Path.home() / ".developer_ai_agent" / "toolchains.json"))
+TOOLCHAIN_CACHE_TTL_HOURS = float(os.getenv("TOOLCHAIN_CACHE_TTL_HOURS", "24"))
+
+# Warm Python Pool (execute_code forks Python scripts from interpreters with the project's imports preloaded; POSIX only)
+PYTHON_WARM_POOL_ENABLED = os.getenv("PYTHON_WARM_POOL_ENABLED", "true").lower() == "true"
+PYTHON_WARM_POOL_SIZE = int(os.getenv("PYTHON_WARM_POOL_SIZE", "2"))
+
+# Subprocess Output (bytes kept from the start and the end of each stream of a run; the middle is dropped)
+PROCESS_OUTPUT_HEAD_BYTES = int(os.getenv("PROCESS_OUTPUT_HEAD_BYTES", "6000"))
+PROCESS_OUTPUT_TAIL_BYTES = int(os.getenv("PROCESS_OUTPUT_TAIL_BYTES", "10000"))
+
+# Context Compaction (token budget for prior task outputs passed to each agent in the feedback loop)
+CONTEXT_COMPACTION_ENABLED = os.getenv("CONTEXT_COMPACTION_ENABLED", "true").lower() == "true"
+CONTEXT_TOKEN_BUDGETS = {
+    "manager": int(os.getenv("CONTEXT_BUDGET_MANAGER", "8000")),
+    "developer": int(os.getenv("CONTEXT_BUDGET_DEVELOPER", "10000")),
+    "tester": int(os.getenv("CONTEXT_BUDGET_TESTER", "8000")),
+    "github": int(os.getenv("CONTEXT_BUDGET_GITHUB", "3000")),
+}
+
 # GitHub Configuration
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_USERNAME = os.getenv("GITHUB_USERNAME", "")
@@ -27,6 +98,30 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 # Agent Configuration
 AGENT_VERBOSE = True
 MAX_ITERATIONS = 15
+# Threads used by the batch file tools (write_files / read_files)
+FILE_IO_WORKERS = int(os.getenv("FILE_IO_WORKERS", "8"))
+# File tool writes go to a temp file renamed over the target; fsync policy before/after the
+# rename: none (crash-safe only), file (fsync the data) or dir (also fsync the directory)
+FILE_FSYNC_POLICY = os.getenv("FILE_FSYNC_POLICY", "file")
+# Watch project directories for changes (inotify on Linux, polling elsewhere) so tool caches
+# are invalidated by events instead of rescans
+FILE_WATCHER_ENABLED = os.getenv("FILE_WATCHER_ENABLED", "true").lower() == "true"
+WATCHER_POLL_SECONDS = float(os.getenv("WATCHER_POLL_SECONDS", "2"))
+# Characters per page of listing/search tool output (about 4 per token); longer results are
+# paged with an offset
+TOOL_OUTPUT_MAX_CHARS = int(os.getenv("TOOL_OUTPUT_MAX_CHARS", "16000"))
+# Worker processes compiling Python for "Validate project syntax" (also threads running other checkers)
+SYNTAX_CHECK_WORKERS = int(os.getenv("SYNTAX_CHECK_WORKERS", str(min(os.cpu_count() or 4, 8))))
+
+# Job Server
+JOB_SERVER_HOST = os.getenv("JOB_SERVER_HOST", "127.0.0.1")
+JOB_SERVER_PORT = int(os.getenv("JOB_SERVER_PORT", "8765"))
+JOB_SERVER_WORKERS = int(os.getenv("JOB_SERVER_WORKERS", "2"))
+JOB_DIR = Path(os.getenv("JOB_DIR", OUTPUT_DIR / ".jobs"))
+
+# Tracing (per-run span tree exported as OTLP JSON plus collapsed stacks for flamegraphs)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_DIR = Path(os.getenv("TRACE_DIR", OUTPUT_DIR / ".traces"))
 
 # File Extensions for Different Project Types
 PROJECT_EXTENSIONS = {
@@ -0,0 +1,24 @@
+"""LLM layer shared by all agents"""
+from .cache import ResponseCache, get_response_cache
+from .client import AgentLLM, create_llm
+from .tokens import estimate_tokens, truncate_to_tokens
+from .routing import ModelRouter, routing_stats
+from .ratelimit import RateLimiter, get_rate_limiter, rate_limit_stats
+from .transcript import TranscriptRecorder, get_transcript_recorder, load_transcript
+
+__all__ = [
+    'ResponseCache',
+    'get_response_cache',
+    'AgentLLM',
+    'create_llm',
+    'estimate_tokens',
+    'truncate_to_tokens',
+    'ModelRouter',
+    'routing_stats',
+    'RateLimiter',
+    'get_rate_limiter',
+    'rate_limit_stats',
+    'TranscriptRecorder',
+    'get_transcript_recorder',
+    'load_transcript'
+]
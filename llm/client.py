@@ -0,0 +1,149 @@
+from typing import Any, Dict, List, Optional
+from pydantic import PrivateAttr
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+from .cache import get_response_cache
+from .routing import ModelRouter, prompt_tokens
+from .transcript import get_transcript_recorder
+from tracing import span
+
+
+def _encode_response(response: Any) -> Optional[Dict[str, Any]]:
+    """Convert an LLM response into a cacheable JSON structure (None if not cacheable)"""
+    if isinstance(response, str):
+        return {'kind': 'text', 'text': response}
+
+    if isinstance(response, list) and response:
+        calls = []
+        for call in response:
+            if isinstance(call, dict) and 'function' in call:
+                function = call['function']
+                calls.append({
+                    'id': call.get('id'),
+                    'name': function.get('name'),
+                    'arguments': function.get('arguments'),
+                })
+            elif hasattr(call, 'function'):
+                calls.append({
+                    'id': getattr(call, 'id', None),
+                    'name': call.function.name,
+                    'arguments': call.function.arguments,
+                })
+            else:
+                return None
+        return {'kind': 'tool_calls', 'calls': calls}
+
+    return None
+
+
+def _decode_response(value: Dict[str, Any]) -> Any:
+    """Rebuild a response from its cached form"""
+    if value['kind'] == 'text':
+        return value['text']
+
+    # OpenAI-style dicts are understood by the crewai native tool-call loop
+    return [
+        {
+            'id': call['id'],
+            'type': 'function',
+            'function': {'name': call['name'], 'arguments': call['arguments']},
+        }
+        for call in value['calls']
+    ]
+
+
+class AgentLLM(BaseLLM):
+    """
+    LLM used by every agent.
+
+    Routes each request to a model through the agent's ModelRouter (with
+    fallback to the next candidate when a model fails) and answers repeated
+    requests from the on-disk response cache. Requests that would execute tools
+    inside the LLM call (available_functions) or need structured output are
+    never cached.
+    """
+
+    llm_type: str = "agent"
+    agent_name: str = "agent"
+    _router: Any = PrivateAttr(default=None)
+
+    def __init__(self, agent_name: str, model: Optional[str] = None, **kwargs: Any):
+        router = ModelRouter(agent_name, model, **kwargs)
+        super().__init__(model=router.preferred, agent_name=agent_name, **kwargs)
+        self._router = router
+
+    @property
+    def _inner(self) -> Any:
+        return self._router.llm(self.model)
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[Dict[str, Any]] = None, from_task: Any = None,
+             from_agent: Any = None, response_model: Any = None) -> Any:
+        cache = get_response_cache()
+        stop = self.stop_sequences
+        role = getattr(from_agent, 'role', None) or self.agent_name
+        cacheable = cache is not None and available_functions is None and response_model is None
+        candidates = self._router.candidates(messages, from_task, tools)
+        recorder = get_transcript_recorder()
+
+        with span(f"llm:{self.agent_name}", 'llm', agent=role,
+                  prompt_tokens=prompt_tokens(messages)) as llm_span:
+            if cacheable:
+                cached = cache.get(cache.make_key(candidates[0], role, messages, tools, stop))
+                if cached is not None:
+                    llm_span.set(model=candidates[0], cached=True)
+                    # Cached answers belong in the transcript too, or a replay would miss them
+                    if recorder is not None:
+                        recorder.record(role, candidates[0], messages, cached)
+                    return _decode_response(cached)
+
+            last_error = None
+            for model in candidates:
+                try:
+                    with call_stop_override(self._router.llm(model), stop):
+                        response = self._router.call(
+                            model,
+                            messages,
+                            tools=tools,
+                            callbacks=callbacks,
+                            available_functions=available_functions,
+                            from_task=from_task,
+                            from_agent=from_agent,
+                            response_model=response_model,
+                        )
+                except Exception as e:
+                    last_error = e
+                    if model != candidates[-1]:
+                        print(f"⚠ {model} failed for {self.agent_name} ({type(e).__name__}); falling back")
+                    continue
+
+                llm_span.set(model=model)
+                encoded = _encode_response(response)
+                if cacheable and encoded is not None:
+                    cache.put(cache.make_key(model, role, messages, tools, stop), encoded,
+                              model=model, agent=role)
+
+                if recorder is not None and encoded is not None:
+                    recorder.record(role, model, messages, encoded)
+                return response
+
+            raise last_error
+
+    def supports_function_calling(self) -> bool:
+        return self._inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._inner.supports_stop_words()
+
+    def supports_multimodal(self) -> bool:
+        return self._inner.supports_multimodal()
+
+    def get_context_window_size(self) -> int:
+        return self._inner.get_context_window_size()
+
+    def get_token_usage_summary(self) -> Any:
+        return self._inner.get_token_usage_summary()
+
+
+def create_llm(agent_name: str, model: Optional[str] = None, **kwargs: Any) -> AgentLLM:
+    """Create the LLM for one of the agents in agents/ (model pins it; otherwise config routing decides)"""
+    return AgentLLM(agent_name=agent_name, model=model, **kwargs)
@@ -0,0 +1,336 @@
+"""
+Offline OpenAI-compatible LLM stand-in for benchmarking the full pipeline.
+
+Serves POST /v1/chat/completions (plain and streamed) and GET /v1/models from
+either a recorded transcript (LLM_TRANSCRIPT_PATH of an earlier run) or a
+script of tool calls per agent role, with configurable latency. Point the
+agents at it with LLM_BASE_URL:
+
+    python -m llm.mock_server --script bench.json --latency 0.5
+    LLM_BASE_URL=http://127.0.0.1:8787/v1 OPENAI_API_KEY=mock LLM_CACHE_ENABLED=false python main.py --batch projects.json
+
+Script format (first entry whose role/task patterns match the request wins;
+{project_dir} expands to the directory named in the task prompt):
+
+    {"scripts": [
+        {"role": "Full-Stack", "task": "implement", "steps": [
+            {"tool": "Write content to a file",
+             "args": {"file_path": "{project_dir}/main.py", "content": "print('hi')\\n"}},
+            {"final": "Implemented main.py"}
+        ]}
+    ]}
+
+The step is the number of tool observations already in the conversation, so
+every request is answered deterministically from the prompt alone.
+"""
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict, deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .tokens import estimate_tokens
+from .transcript import load_transcript, normalize_messages, transcript_key
+from config import MOCK_LLM_HOST, MOCK_LLM_PORT
+
+
+# Directory the task is about, as written by the task templates in tasks/
+PROJECT_DIR_PATTERNS = [
+    re.compile(r'PROJECT DIRECTORY:\s*(\S+)'),
+    re.compile(r'LOCAL PATH:\s*(\S+)'),
+    re.compile(r'Directory:\s*(\S+)'),
+]
+
+# crewai puts "You are <role>." at the start of every agent's system prompt
+ROLE_PATTERN = re.compile(r'You are ([^.\n]+)\.')
+
+DEFAULT_PLAN = """# Technical Plan
+
+## 1. Project Overview
+A small command line application generated by the offline benchmark.
+
+## 2. Technology Stack
+- Python 3.11 (standard library only)
+
+## 3. File Structure
+- src/main.py - entry point
+- requirements.txt - dependencies
+- tests/test_main.py - tests
+
+## 4. Implementation Steps
+1. Write src/main.py with a main() function
+2. Add tests/test_main.py
+"""
+
+# Realistic enough to exercise every phase and the file/validation/git tools without network access
+DEFAULT_SCRIPT = {
+    'scripts': [
+        {'role': 'Solution Architect', 'steps': [{'final': DEFAULT_PLAN}]},
+        {'role': 'DevOps', 'task': 'Create a new GitHub repository', 'steps': [
+            {'tool': 'Write content to a file',
+             'args': {'file_path': '{project_dir}/README.md', 'content': '# Benchmark project\n'}},
+            {'final': 'Repository created and cloned to {project_dir}'}
+        ]},
+        {'role': 'DevOps', 'steps': [
+            {'tool': 'Get repository status', 'args': {'directory': '{project_dir}', 'verbose': True}},
+            {'final': 'Deployment complete'}
+        ]},
+        {'role': 'Full-Stack', 'steps': [
+            {'tool': 'Write content to a file',
+             'args': {'file_path': '{project_dir}/src/main.py',
+                      'content': 'def main() -> int:\n    print("hello")\n    return 0\n\n\n'
+                                 'if __name__ == "__main__":\n    main()\n'}},
+            {'tool': 'Write content to a file',
+             'args': {'file_path': '{project_dir}/tests/test_main.py',
+                      'content': 'from src.main import main\n\n\ndef test_main():\n    assert main() == 0\n'}},
+            {'tool': 'Write content to a file',
+             'args': {'file_path': '{project_dir}/requirements.txt', 'content': 'pytest\n'}},
+            {'tool': 'Validate code syntax', 'args': {'file_path': '{project_dir}/src/main.py'}},
+            {'final': 'Implemented src/main.py, tests/test_main.py and requirements.txt'}
+        ]},
+        {'role': 'QA Engineer', 'steps': [
+            {'tool': 'List files in a directory', 'args': {'directory': '{project_dir}', 'recursive': True}},
+            {'tool': 'Validate code syntax', 'args': {'file_path': '{project_dir}/src/main.py'}},
+            {'tool': 'Write content to a file',
+             'args': {'file_path': '{project_dir}/TEST_REPORT.md', 'content': '# Test Report\n\nAll checks passed.\n'}},
+            {'final': 'All tests passed. Report written to TEST_REPORT.md'}
+        ]},
+        {'steps': [{'final': 'Done'}]},
+    ]
+}
+
+
+def tool_function_name(name: str) -> str:
+    """Function name crewai sends for a tool ('Write content to a file' -> 'write_content_to_a_file')"""
+    return re.sub(r'_+', '_', re.sub(r'[^a-z0-9]', '_', name.lower())).strip('_')
+
+
+def count_observations(messages: List[Dict[str, Any]]) -> int:
+    """Tool results already in the conversation (native tool messages or ReAct observations)"""
+    count = 0
+    for message in messages:
+        if message.get('role') == 'tool':
+            count += 1
+        elif message.get('role') in ('assistant', 'user') and isinstance(message.get('content'), str):
+            count += message['content'].count('\nObservation:')
+    return count
+
+
+class MockLLM:
+    """Produces deterministic completions for chat requests"""
+
+    def __init__(self, script: Optional[Dict[str, Any]] = None, transcript: Optional[Path] = None,
+                 latency: float = 0.0, tokens_per_second: float = 0.0):
+        self.scripts = (script or DEFAULT_SCRIPT)['scripts']
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.by_key: Dict[str, Dict[str, Any]] = {}
+        self.by_role: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.replayed = 0
+        if transcript:
+            for entry in load_transcript(transcript):
+                self.by_key.setdefault(entry['key'], entry['response'])
+                self.by_role[entry['agent']].append(entry['response'])
+
+    def _replay(self, messages: List[Dict[str, Any]], role: str) -> Optional[Dict[str, Any]]:
+        """Recorded response for this exact prompt, else the next unused one recorded for the role"""
+        response = self.by_key.get(transcript_key(messages))
+        if response is None and self.by_role.get(role):
+            with self._lock:
+                if self.by_role[role]:
+                    response = self.by_role[role].popleft()
+        return response
+
+    def _script_step(self, messages: List[Dict[str, Any]], system: str, prompt: str) -> Dict[str, Any]:
+        for script in self.scripts:
+            if script.get('role') and not re.search(script['role'], system, re.IGNORECASE):
+                continue
+            if script.get('task') and not re.search(script['task'], prompt, re.IGNORECASE):
+                continue
+            steps = script['steps']
+            return steps[min(count_observations(messages), len(steps) - 1)]
+        return {'final': 'Done'}
+
+    def respond(self, body: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """Build the assistant message for a chat completion request; returns (message, completion tokens)"""
+        messages = body.get('messages', [])
+        pairs = normalize_messages(messages)
+        system = "\n".join(content for role, content in pairs if role in ('system', 'developer'))
+        prompt = "\n".join(content for role, content in pairs if role == 'user')
+        match = ROLE_PATTERN.search(system) or ROLE_PATTERN.search(prompt)
+        role = match.group(1).strip() if match else ""
+
+        with self._lock:
+            self.requests += 1
+            call_number = self.requests
+
+        recorded = self._replay(messages, role)
+        if recorded is not None:
+            with self._lock:
+                self.replayed += 1
+            if recorded['kind'] == 'text':
+                message = {'role': 'assistant', 'content': recorded['text']}
+            else:
+                message = {'role': 'assistant', 'content': None, 'tool_calls': [
+                    {'id': call['id'] or f"call_{call_number}_{i}", 'type': 'function',
+                     'function': {'name': call['name'], 'arguments': call['arguments']}}
+                    for i, call in enumerate(recorded['calls'])
+                ]}
+            return message, estimate_tokens(json.dumps(message))
+
+        project_dir = ""
+        for pattern in PROJECT_DIR_PATTERNS:
+            found = pattern.search(prompt)
+            if found:
+                project_dir = found.group(1).rstrip('.,)')
+                break
+
+        step = self._script_step(messages, system, prompt)
+        expand = lambda value: json.loads(json.dumps(value).replace('{project_dir}', project_dir.replace('\\', '\\\\')))
+
+        if 'tool' in step:
+            args = expand(step.get('args', {}))
+            offered = {tool_function_name(t['function']['name']): t['function']['name']
+                       for t in body.get('tools') or [] if t.get('type') == 'function'}
+            if body.get('tools'):
+                name = offered.get(tool_function_name(step['tool']), tool_function_name(step['tool']))
+                message = {'role': 'assistant', 'content': None, 'tool_calls': [{
+                    'id': f"call_{call_number}_0", 'type': 'function',
+                    'function': {'name': name, 'arguments': json.dumps(args)}
+                }]}
+            else:
+                message = {'role': 'assistant', 'content':
+                           f"Thought: I should use {step['tool']}\nAction: {step['tool']}\n"
+                           f"Action Input: {json.dumps(args)}"}
+        else:
+            final = expand(step.get('final', 'Done'))
+            content = final if body.get('tools') else f"Thought: I now know the final answer\nFinal Answer: {final}"
+            message = {'role': 'assistant', 'content': content}
+
+        return message, estimate_tokens(json.dumps(message))
+
+    def delay(self, completion_tokens: int) -> None:
+        seconds = self.latency
+        if self.tokens_per_second:
+            seconds += completion_tokens / self.tokens_per_second
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            print(f"🤖 {format % args}")
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [
+                {'id': 'mock', 'object': 'model', 'created': 0, 'owned_by': 'mock'}
+            ]})
+        else:
+            self._send_json(404, {'error': {'message': f"Unknown endpoint: {self.path}"}})
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f"Unknown endpoint: {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': {'message': "Invalid JSON body"}})
+            return
+
+        mock: MockLLM = self.server.mock
+        message, completion_tokens = mock.respond(body)
+        prompt_tokens = sum(estimate_tokens(content) for _, content in normalize_messages(body.get('messages')))
+        mock.delay(completion_tokens)
+
+        finish_reason = 'tool_calls' if message.get('tool_calls') else 'stop'
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-mock-{mock.requests}"
+        model = body.get('model', 'mock')
+
+        if body.get('stream'):
+            delta = dict(message)
+            if delta.get('tool_calls'):
+                delta['tool_calls'] = [dict(call, index=i) for i, call in enumerate(delta['tool_calls'])]
+            chunks = [
+                {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]},
+                {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                 'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}], 'usage': usage},
+            ]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for chunk in chunks:
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        self._send_json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'message': message, 'finish_reason': finish_reason}],
+            'usage': usage,
+        })
+
+
+def serve_mock(host: str = MOCK_LLM_HOST, port: int = MOCK_LLM_PORT, script: Optional[Path] = None,
+               transcript: Optional[Path] = None, latency: float = 0.0, tokens_per_second: float = 0.0,
+               verbose: bool = False) -> None:
+    """Run the mock server until interrupted"""
+    script_data = json.loads(Path(script).read_text(encoding='utf-8')) if script else None
+    httpd = ThreadingHTTPServer((host, port), MockRequestHandler)
+    httpd.mock = MockLLM(script_data, transcript, latency, tokens_per_second)
+    httpd.verbose = verbose
+
+    source = f"transcript {transcript}" if transcript else f"script {script}" if script else "built-in script"
+    print(f"🤖 Mock LLM on http://{host}:{port}/v1 ({source}, {latency}s latency)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"\n🤖 Served {httpd.mock.requests} requests ({httpd.mock.replayed} replayed)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default=MOCK_LLM_HOST)
+    parser.add_argument("--port", type=int, default=MOCK_LLM_PORT)
+    parser.add_argument("--script", type=Path, help="JSON script of per-role tool-call steps")
+    parser.add_argument("--transcript", type=Path, help="Transcript recorded with LLM_TRANSCRIPT_PATH to replay")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Simulated generation speed (0 = instant)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+    serve_mock(args.host, args.port, args.script, args.transcript, args.latency,
+               args.tokens_per_second, args.verbose)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,397 @@
+import os
+import re
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from config import (
+    LLM_RATE_LIMIT_ENABLED, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_CONCURRENT_CALLS,
+    LLM_RATE_LIMIT_DB
+)
+
+
+# Lower value = served first when several agents wait for the same model
+AGENT_PRIORITIES = {
+    "manager": 0,     # planning
+    "developer": 1,
+    "tester": 2,
+    "github": 3,      # deployment
+}
+DEFAULT_PRIORITY = 2
+
+# Rate multiplier after a 429 (multiplicative decrease) and per successful call (additive increase)
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+MIN_RATE_FACTOR = 0.1
+
+# Backoff when a 429 carries no usable header: 2, 4, 8 ... seconds
+MAX_BACKOFF_SECONDS = 60.0
+
+# How often a call waiting on another process's capacity re-reads the shared bucket
+SHARED_POLL_SECONDS = 0.2
+
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in an OpenAI-style reset header ('1s', '6m0s', '250ms') or a plain number"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def retry_after_from_error(error: BaseException) -> Optional[float]:
+    """Seconds to wait according to the rate-limit headers attached to a provider error"""
+    seen = set()
+    candidate = error
+    while candidate is not None and id(candidate) not in seen:
+        seen.add(id(candidate))
+        headers = getattr(getattr(candidate, 'response', None), 'headers', None)
+        if headers:
+            if headers.get('retry-after-ms'):
+                delay = parse_duration(headers['retry-after-ms'])
+                if delay is not None:
+                    return delay / 1000
+            retry_after = headers.get('retry-after')
+            if retry_after:
+                delay = parse_duration(retry_after)
+                if delay is None:
+                    try:
+                        delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    except (TypeError, ValueError):
+                        delay = None
+                if delay is not None:
+                    return max(delay, 0.0)
+            resets = []
+            for kind in ('requests', 'tokens'):
+                remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+                reset = headers.get(f'x-ratelimit-reset-{kind}')
+                if reset and (remaining is None or remaining.strip() in ('0', '')):
+                    resets.append(parse_duration(reset))
+            resets = [r for r in resets if r is not None]
+            if resets:
+                return max(resets)
+        candidate = candidate.__cause__ or candidate.__context__
+    return None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for provider 429 / rate-limit errors (checked through the exception chain)"""
+    seen = set()
+    candidate = error
+    while candidate is not None and id(candidate) not in seen:
+        seen.add(id(candidate))
+        if 'RateLimit' in type(candidate).__name__ or getattr(candidate, 'status_code', None) == 429:
+            return True
+        candidate = candidate.__cause__ or candidate.__context__
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name != 'posix':
+        # os.kill(pid, 0) would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class SharedBucketStore:
+    """
+    Bucket state of every model in one SQLite file, so worker processes draw
+    from the same quota. Each read-modify-write is one IMMEDIATE transaction;
+    calls in flight are counted per process, and rows of processes that died
+    are dropped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # One connection serves the limiters of every model: one transaction at a time
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS buckets (
+                   model TEXT PRIMARY KEY,
+                   requests REAL NOT NULL,
+                   tokens REAL NOT NULL,
+                   updated REAL NOT NULL,
+                   rate_factor REAL NOT NULL,
+                   paused_until REAL NOT NULL
+               )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS slots (
+                   model TEXT NOT NULL,
+                   pid INTEGER NOT NULL,
+                   active INTEGER NOT NULL,
+                   PRIMARY KEY (model, pid)
+               )"""
+        )
+
+    @contextmanager
+    def transaction(self, limiter: 'RateLimiter') -> Iterator[None]:
+        """Load the shared bucket into limiter, run the block, and store it back atomically"""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT requests, tokens, updated, rate_factor, paused_until FROM buckets WHERE model = ?",
+                    (limiter.name,)
+                ).fetchone()
+                if row:
+                    limiter._requests, limiter._tokens, limiter._updated, limiter.rate_factor, limiter.paused_until = row
+                others = 0
+                for pid, active in conn.execute("SELECT pid, active FROM slots WHERE model = ?", (limiter.name,)).fetchall():
+                    if pid == os.getpid():
+                        continue
+                    if _process_alive(pid):
+                        others += active
+                    else:
+                        conn.execute("DELETE FROM slots WHERE model = ? AND pid = ?", (limiter.name, pid))
+                limiter._active_elsewhere = others
+                yield
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (model, requests, tokens, updated, rate_factor, paused_until) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (limiter.name, limiter._requests, limiter._tokens, limiter._updated,
+                     limiter.rate_factor, limiter.paused_until)
+                )
+                conn.execute("INSERT OR REPLACE INTO slots (model, pid, active) VALUES (?, ?, ?)",
+                             (limiter.name, os.getpid(), limiter.active))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for one model: requests per minute, tokens per minute
+    and concurrent calls.
+
+    Callers queue by priority (AGENT_PRIORITIES) and only the head of the queue
+    may take capacity, so planning is never starved by a burst of deployment
+    calls. A 429 pauses the whole queue for the time given by the provider's
+    rate-limit headers and halves the refill rate, which then recovers
+    gradually with every successful call.
+
+    With a SharedBucketStore the bucket, the pause and the concurrency count
+    are shared with the other worker processes (priority still orders the
+    calls of this process).
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int, max_concurrent: int,
+                 shared: Optional[SharedBucketStore] = None):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrent = max_concurrent
+        self._shared = shared
+        # Shared state is compared across processes, so it needs wall-clock time
+        self._clock = time.time if shared else time.monotonic
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = self._clock()
+        self.rate_factor = 1.0
+        self.paused_until = 0.0
+        self.active = 0
+        self._active_elsewhere = 0
+        self._consecutive_limits = 0
+
+        # Metrics
+        self.calls = 0
+        self.tokens_used = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_queue = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm * self.rate_factor / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm * self.rate_factor / 60)
+
+    @contextmanager
+    def _bucket(self) -> Iterator[None]:
+        """Hold the bucket state for a read-modify-write (shared with other processes when configured)"""
+        if self._shared is None:
+            yield
+        else:
+            with self._shared.transaction(self):
+                yield
+
+    def _wait_time(self, tokens: int, now: float) -> Optional[float]:
+        """Seconds until the head of the queue can start (None = wait for a running call to finish)"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.max_concurrent and self.active + self._active_elsewhere >= self.max_concurrent:
+            return None
+        wait = 0.0
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / (self.rpm * self.rate_factor))
+        # A request larger than the whole bucket only waits for a full bucket
+        cost = min(tokens, self.tpm)
+        if self.tpm and self._tokens < cost:
+            wait = max(wait, (cost - self._tokens) * 60 / (self.tpm * self.rate_factor))
+        return wait
+
+    def is_saturated(self) -> bool:
+        """True when calls are queued or the provider asked us to pause"""
+        with self._cond:
+            if self._waiters:
+                return True
+            with self._bucket():
+                return self._clock() < self.paused_until
+
+    def acquire(self, tokens: int, priority: int = DEFAULT_PRIORITY) -> float:
+        """Block until a call estimated at `tokens` may start; returns seconds waited"""
+        started = time.monotonic()
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            self.max_queue = max(self.max_queue, len(self._waiters))
+            while True:
+                wait = None
+                if self._waiters[0] == entry:
+                    with self._bucket():
+                        now = self._clock()
+                        self._refill(now)
+                        wait = self._wait_time(tokens, now)
+                        if wait == 0:
+                            self._requests -= 1 if self.rpm else 0
+                            self._tokens -= min(tokens, self.tpm) if self.tpm else 0
+                            self.active += 1
+                if wait == 0:
+                    heapq.heappop(self._waiters)
+                    waited = time.monotonic() - started
+                    self.total_wait += waited
+                    self._cond.notify_all()
+                    return waited
+                if self._shared is not None and self._waiters[0] == entry:
+                    # Other processes do not notify us: look at the bucket again soon
+                    wait = SHARED_POLL_SECONDS if wait is None else min(wait, SHARED_POLL_SECONDS)
+                self._cond.wait(timeout=wait)
+
+    def release(self, estimated: int, actual: Optional[int] = None, rate_limited: bool = False) -> None:
+        """Finish a call; actual token usage corrects the estimate taken at acquire time"""
+        with self._cond:
+            # Freed before touching the shared file, so a failing write cannot leak the slot
+            self.active -= 1
+            with self._bucket():
+                if actual is not None and self.tpm:
+                    self._tokens -= actual - min(estimated, self.tpm)
+                if not rate_limited:
+                    self.rate_factor = min(1.0, self.rate_factor + RECOVERY_STEP)
+            if not rate_limited:
+                self.calls += 1
+                self.tokens_used += actual if actual is not None else estimated
+                self._consecutive_limits = 0
+            self._cond.notify_all()
+
+    def backoff(self, error: BaseException) -> float:
+        """Pause the queue after a 429; returns the pause in seconds"""
+        with self._cond:
+            self.rate_limited += 1
+            self._consecutive_limits += 1
+            delay = retry_after_from_error(error)
+            if delay is None:
+                delay = min(2.0 ** self._consecutive_limits, MAX_BACKOFF_SECONDS)
+            with self._bucket():
+                self.paused_until = max(self.paused_until, self._clock() + delay)
+                self.rate_factor = max(MIN_RATE_FACTOR, self.rate_factor * BACKOFF_FACTOR)
+            self._cond.notify_all()
+        return delay
+
+    @contextmanager
+    def slot(self, tokens: int, priority: int = DEFAULT_PRIORITY) -> Iterator[Dict[str, Any]]:
+        """
+        Hold capacity for one call. The body may set usage['tokens'] to the actual
+        usage and usage['rate_limited'] when the provider rejected the call.
+        """
+        self.acquire(tokens, priority)
+        usage: Dict[str, Any] = {'tokens': None, 'rate_limited': False}
+        try:
+            yield usage
+        finally:
+            self.release(tokens, usage['tokens'], usage['rate_limited'])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'calls': self.calls,
+                'tokens': self.tokens_used,
+                'rate_limited': self.rate_limited,
+                'total_wait': self.total_wait,
+                'max_queue': self.max_queue,
+                'queued': len(self._waiters),
+                'active': self.active,
+                'rate_factor': self.rate_factor,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+_shared_store: Optional[SharedBucketStore] = None
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """
+    Process-wide limiter for a model, shared by every agent (None when disabled).
+    With LLM_RATE_LIMIT_DB set (batch and job-server workers) the bucket is
+    also shared with the other processes using that file.
+
+    Local ollama models have no provider quota and only get the concurrency cap.
+    """
+    global _shared_store
+    if not LLM_RATE_LIMIT_ENABLED:
+        return None
+    with _limiters_lock:
+        if model not in _limiters:
+            if LLM_RATE_LIMIT_DB and _shared_store is None:
+                _shared_store = SharedBucketStore(Path(LLM_RATE_LIMIT_DB))
+            local = model.startswith("ollama/")
+            _limiters[model] = RateLimiter(
+                model,
+                rpm=0 if local else LLM_REQUESTS_PER_MINUTE,
+                tpm=0 if local else LLM_TOKENS_PER_MINUTE,
+                max_concurrent=LLM_MAX_CONCURRENT_CALLS,
+                shared=_shared_store
+            )
+        return _limiters[model]
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every limiter created in this process"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def agent_priority(agent_name: str) -> int:
+    return AGENT_PRIORITIES.get(agent_name, DEFAULT_PRIORITY)
+
@@ -0,0 +1,219 @@
+import re
+import time
+import threading
+from typing import Any, Dict, List, Optional
+from crewai import LLM
+from .tokens import estimate_tokens
+from .ratelimit import get_rate_limiter, agent_priority, is_rate_limit_error
+from tracing import add_to_span
+from config import (
+    OLLAMA_BASE_URL, LLM_BASE_URL,
+    LLM_LARGE_MODEL, LLM_SMALL_MODEL, LLM_FALLBACK_MODELS,
+    LLM_AGENT_TIERS, LLM_ROUTING_POLICY,
+    LLM_RATE_LIMIT_ENABLED, LLM_RATE_LIMIT_RETRIES, LLM_EXPECTED_COMPLETION_TOKENS
+)
+
+
+# Task descriptions that need the large model regardless of the agent's tier
+REASONING_TASK_HINTS = re.compile(
+    r'technical specification|improvement plan|architect|analy[sz]e (?:user )?feedback|root cause',
+    re.IGNORECASE
+)
+
+# Weight of the newest sample in the moving latency average
+LATENCY_SMOOTHING = 0.3
+
+
+class ModelHealth:
+    """Latency, load and failure state of one model, shared by every router in the process"""
+
+    def __init__(self):
+        self.inflight = 0
+        self.avg_latency = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.last_call = 0.0
+
+    def is_available(self, policy: Dict[str, Any]) -> bool:
+        """
+        False while cooling down after a failure, saturated, or recently slower than the
+        latency budget (a slow model is retried once the cooldown has passed since its last call)
+        """
+        now = time.time()
+        if now < self.cooldown_until:
+            return False
+        if self.inflight >= policy['max_inflight_per_model']:
+            return False
+        recently_used = now - self.last_call < policy['failure_cooldown_seconds']
+        return not (recently_used and self.avg_latency > policy['latency_budget_seconds'])
+
+
+_health: Dict[str, ModelHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_model_health(model: str) -> ModelHealth:
+    with _health_lock:
+        if model not in _health:
+            _health[model] = ModelHealth()
+        return _health[model]
+
+
+def routing_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-model call counts, failures and average latency for this process"""
+    with _health_lock:
+        return {
+            model: {
+                'calls': health.calls,
+                'failures': health.failures,
+                'avg_latency': health.avg_latency,
+                'inflight': health.inflight,
+            }
+            for model, health in _health.items()
+        }
+
+
+def prompt_tokens(messages: Any) -> int:
+    """Token estimate for a prompt given as a string or a list of chat messages"""
+    if isinstance(messages, str):
+        return estimate_tokens(messages)
+    total = 0
+    for message in messages or []:
+        content = message.get('content') if isinstance(message, dict) else message
+        if isinstance(content, list):
+            content = " ".join(part.get('text', '') for part in content if isinstance(part, dict))
+        total += estimate_tokens(str(content or ""))
+    return total
+
+
+class ModelRouter:
+    """
+    Picks the model for each LLM request of one agent and delegates to it.
+
+    Routing policy (config.LLM_ROUTING_POLICY):
+    - the agent's tier (LLM_AGENT_TIERS) selects the preferred model
+    - small-tier requests move to the large model when the prompt exceeds
+      small_max_prompt_tokens or the task needs reasoning (planning, analysis)
+    - models that are cooling down after a failure, saturated (too many
+      in-flight calls, or callers queued at the rate limiter) or slower than
+      the latency budget are tried last
+    - on failure the next candidate is tried (LLM_FALLBACK_MODELS at the end)
+
+    Every call goes through the model's shared RateLimiter with this agent's
+    priority; 429s are retried there after the provider's advertised delay.
+    """
+
+    def __init__(self, agent_name: str, model: Optional[str] = None, **llm_kwargs: Any):
+        self.agent_name = agent_name
+        self.priority = agent_priority(agent_name)
+        self.policy = LLM_ROUTING_POLICY
+        self.llm_kwargs = llm_kwargs
+        if LLM_RATE_LIMIT_ENABLED:
+            # The rate limiter owns retries; the provider SDK's own retries would bypass it
+            self.llm_kwargs.setdefault('max_retries', 0)
+        tier = LLM_AGENT_TIERS.get(agent_name, "large")
+        # An explicit model pins the agent's preferred model
+        self.preferred = model or (LLM_SMALL_MODEL if tier == "small" else LLM_LARGE_MODEL)
+        self.large = model or LLM_LARGE_MODEL
+        self._llms: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def llm(self, model: str) -> Any:
+        """Inner crewai LLM for a model (created on first use)"""
+        with self._lock:
+            if model not in self._llms:
+                kwargs = dict(self.llm_kwargs)
+                if model.startswith("ollama/"):
+                    kwargs.setdefault('base_url', OLLAMA_BASE_URL)
+                elif LLM_BASE_URL:
+                    kwargs.setdefault('base_url', LLM_BASE_URL)
+                self._llms[model] = LLM(model=model, **kwargs)
+            return self._llms[model]
+
+    def candidates(self, messages: Any, from_task: Any = None, tools: Optional[List[dict]] = None) -> List[str]:
+        """Models to try for a request, best first"""
+        first = self.preferred
+        if first != self.large:
+            description = getattr(from_task, 'description', '') or ''
+            if prompt_tokens(messages) > self.policy['small_max_prompt_tokens'] \
+                    or REASONING_TASK_HINTS.search(description):
+                first = self.large
+
+        ordered = []
+        for model in [first, self.preferred, self.large] + LLM_FALLBACK_MODELS:
+            if model not in ordered:
+                ordered.append(model)
+
+        if tools:
+            # A model without native tool calling cannot answer a tool-calling request
+            capable = [m for m in ordered if self.llm(m).supports_function_calling()]
+            ordered = capable or ordered
+
+        healthy = [
+            m for m in ordered
+            if get_model_health(m).is_available(self.policy)
+            and not (get_rate_limiter(m) and get_rate_limiter(m).is_saturated())
+        ]
+        return healthy + [m for m in ordered if m not in healthy]
+
+    def _call_limited(self, model: str, messages: Any, **kwargs: Any) -> tuple:
+        """
+        Call a model inside its rate limiter; returns (response, seconds spent in the
+        provider call, tokens used or None when the provider reports no usage)
+        """
+        llm = self.llm(model)
+        limiter = get_rate_limiter(model)
+        if limiter is None:
+            before = llm.get_token_usage_summary().total_tokens
+            started = time.time()
+            response = llm.call(messages, **kwargs)
+            elapsed = time.time() - started
+            used = llm.get_token_usage_summary().total_tokens - before
+            return response, elapsed, used if used > 0 else None
+
+        estimate = prompt_tokens(messages) + LLM_EXPECTED_COMPLETION_TOKENS
+        attempt = 0
+        while True:
+            with limiter.slot(estimate, self.priority) as usage:
+                before = llm.get_token_usage_summary().total_tokens
+                started = time.time()
+                try:
+                    response = llm.call(messages, **kwargs)
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt >= LLM_RATE_LIMIT_RETRIES:
+                        raise
+                    usage['rate_limited'] = True
+                    attempt += 1
+                    delay = limiter.backoff(e)
+                    print(f"⏳ {model} rate limited - {self.agent_name} retries in {delay:.1f}s "
+                          f"(attempt {attempt}/{LLM_RATE_LIMIT_RETRIES})")
+                    continue
+                elapsed = time.time() - started
+                used = llm.get_token_usage_summary().total_tokens - before
+                usage['tokens'] = used if used > 0 else None
+            return response, elapsed, usage['tokens']
+
+    def call(self, model: str, messages: Any, **kwargs: Any) -> Any:
+        """Call one model, recording its latency, load and failures"""
+        health = get_model_health(model)
+        with _health_lock:
+            health.inflight += 1
+        try:
+            response, elapsed, used = self._call_limited(model, messages, **kwargs)
+        except Exception:
+            with _health_lock:
+                health.failures += 1
+                health.cooldown_until = time.time() + self.policy['failure_cooldown_seconds']
+            raise
+        finally:
+            with _health_lock:
+                health.inflight -= 1
+        with _health_lock:
+            health.avg_latency = elapsed if not health.calls else \
+                (1 - LATENCY_SMOOTHING) * health.avg_latency + LATENCY_SMOOTHING * elapsed
+            health.calls += 1
+            health.last_call = time.time()
+        if used:
+            add_to_span(tokens=used)
+        return response
@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+
+# Rough characters-per-token ratio for English prose and code when no tokenizer is installed
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken missing, or its encoding files cannot be downloaded
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of text (tiktoken when available, otherwise a character estimate)"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, budget: int, marker: str = "\n\n[... truncated ...]\n\n") -> str:
+    """Keep the head and tail of text so it fits in budget tokens"""
+    if budget <= 0:
+        return ""
+    if estimate_tokens(text) <= budget:
+        return text
+
+    encoding = _encoding()
+    keep = max(budget - estimate_tokens(marker), 1)
+    head = keep * 2 // 3
+    tail = keep - head
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return encoding.decode(tokens[:head]) + marker + (encoding.decode(tokens[-tail:]) if tail else "")
+    head_chars, tail_chars = head * CHARS_PER_TOKEN, tail * CHARS_PER_TOKEN
+    return text[:head_chars] + marker + (text[-tail_chars:] if tail_chars else "")
@@ -0,0 +1,87 @@
+import json
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config import LLM_TRANSCRIPT_PATH
+
+
+def normalize_messages(messages: Any) -> List[List[str]]:
+    """
+    Role/content pairs of a prompt, in the form both crewai and an HTTP request
+    body produce for the same conversation (tool-call metadata is dropped).
+    """
+    if isinstance(messages, str):
+        return [["user", messages]]
+    normalized = []
+    for message in messages or []:
+        if not isinstance(message, dict):
+            message = {'role': getattr(message, 'role', 'user'), 'content': getattr(message, 'content', '')}
+        content = message.get('content')
+        if isinstance(content, list):
+            content = "".join(part.get('text', '') for part in content if isinstance(part, dict))
+        normalized.append([str(message.get('role', 'user')), str(content or "")])
+    return normalized
+
+
+def transcript_key(messages: Any) -> str:
+    """Model-independent address of a prompt used to match replayed responses"""
+    payload = json.dumps(normalize_messages(messages), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TranscriptRecorder:
+    """
+    Appends every agent LLM exchange to a JSON-lines transcript.
+
+    Each line holds the agent role, model, prompt key, prompt and the encoded
+    response (text or tool calls), which llm.mock_server can replay offline.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, model: str, messages: Any, response: Dict[str, Any]) -> None:
+        entry = {
+            'timestamp': time.time(),
+            'agent': agent,
+            'model': model,
+            'key': transcript_key(messages),
+            'messages': normalize_messages(messages),
+            'response': response,
+        }
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_transcript(path: Path) -> List[Dict[str, Any]]:
+    """Entries of a recorded transcript in recording order"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return entries
+
+
+_recorder: Optional[TranscriptRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_transcript_recorder() -> Optional[TranscriptRecorder]:
+    """Process-wide recorder, or None unless LLM_TRANSCRIPT_PATH is set"""
+    global _recorder
+    if not LLM_TRANSCRIPT_PATH:
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = TranscriptRecorder(Path(LLM_TRANSCRIPT_PATH))
+    return _recorder
@@ -0,0 +1,22 @@
+"""Project generation pipeline"""
+from .checkpoints import CheckpointStore, restore_task
+from .runner import run_project, run_project_async
+from .approvals import InteractiveApprover, PolicyApprover
+from .batch import load_manifest, run_batch
+from .jobs import JobQueue
+from .context import ContextCompactor
+from .server import serve
+
+__all__ = [
+    'CheckpointStore',
+    'restore_task',
+    'run_project',
+    'run_project_async',
+    'InteractiveApprover',
+    'PolicyApprover',
+    'load_manifest',
+    'run_batch',
+    'JobQueue',
+    'ContextCompactor',
+    'serve'
+]
@@ -0,0 +1,137 @@
+from typing import Any, Dict, List, Optional
+
+
+def get_user_approval(phase: str = "plan") -> tuple[bool, str]:
+    """
+    Get user approval for the plan or final product.
+
+    Args:
+        phase: 'plan', 'improvement_plan', or 'final' to customize messaging
+
+    Returns:
+        tuple: (approved: bool, feedback: str)
+    """
+    print("\n" + "=" * 80)
+    print("👤 HUMAN REVIEW REQUIRED")
+    print("=" * 80)
+
+    if phase == "plan":
+        print("\nPlease review the technical plan above.")
+    elif phase == "improvement_plan":
+        print("\nPlease review the improvement plan above.")
+        print("This plan will guide how changes are implemented.")
+    else:
+        print("\nPlease review the generated project.")
+        print("Check the files, run the code, and test the functionality.")
+
+    print("\nOptions:")
+    if phase in ["plan", "improvement_plan"]:
+        print("  1. Approve - Proceed with implementation")
+        print("  2. Request Changes - Provide additional requirements")
+    else:
+        print("  1. Approve - Complete the project")
+        print("  2. Request Changes - Provide feedback for improvements")
+    print("  3. Cancel - Exit the system")
+
+    while True:
+        choice = input("\nYour choice (1/2/3): ").strip()
+
+        if choice == "1":
+            if phase in ["plan", "improvement_plan"]:
+                print("\n✓ Plan approved! Proceeding with implementation...")
+            else:
+                print("\n✓ Project approved! Generation complete!")
+            return True, ""
+
+        elif choice == "2":
+            if phase == "final":
+                print("\n📝 What would you like to change or improve?")
+                print("Be specific about features, bugs, or improvements needed.")
+            elif phase == "improvement_plan":
+                print("\n📝 What changes to the improvement plan?")
+            else:
+                print("\n📝 Please provide your additional requirements or changes:")
+
+            print("(You can provide multiple lines. Press Enter twice to finish)\n")
+
+            feedback_lines = []
+            empty_count = 0
+
+            while empty_count < 2:
+                line = input()
+                if line.strip():
+                    feedback_lines.append(line)
+                    empty_count = 0
+                else:
+                    empty_count += 1
+
+            feedback = "\n".join(feedback_lines).strip()
+
+            if feedback:
+                print(f"\n✓ Feedback received ({len(feedback)} characters)")
+                return False, feedback
+            else:
+                print("\n⚠ No feedback provided. Please try again.")
+                continue
+
+        elif choice == "3":
+            print("\n❌ " + ("Project generation cancelled by user." if phase in ["plan", "improvement_plan"] else "Exiting system."))
+            return False, "CANCELLED"
+
+        else:
+            print("\n⚠ Invalid choice. Please enter 1, 2, or 3.")
+
+
+class InteractiveApprover:
+    """Asks the person at the terminal for every approval, retry and pause"""
+
+    def review(self, phase: str) -> tuple[bool, str]:
+        return get_user_approval(phase=phase)
+
+    def confirm(self, prompt: str) -> bool:
+        return input(prompt).strip().lower() == 'y'
+
+    def pause(self, prompt: str) -> None:
+        input(prompt)
+
+
+class PolicyApprover:
+    """
+    Answers approvals from a manifest policy so the pipeline runs headless.
+
+    Policy keys (all optional):
+        plan_feedback: change requests applied to successive plan reviews before approving
+        improvement_feedback: same for improvement plans
+        feedback: change requests for successive final reviews; once exhausted the project is approved
+        retry_on_error: answer 'y' to retry prompts after a failed phase (default: False)
+        max_retries: upper bound on retries answered 'y' (default: 1)
+    """
+
+    def __init__(self, policy: Optional[Dict[str, Any]] = None):
+        policy = policy or {}
+        self._pending: Dict[str, List[str]] = {
+            'plan': list(policy.get('plan_feedback', [])),
+            'improvement_plan': list(policy.get('improvement_feedback', [])),
+            'final': list(policy.get('feedback', [])),
+        }
+        self.retry_on_error = bool(policy.get('retry_on_error', False))
+        self.retries_left = int(policy.get('max_retries', 1))
+
+    def review(self, phase: str) -> tuple[bool, str]:
+        pending = self._pending.get(phase, [])
+        if pending:
+            feedback = pending.pop(0)
+            print(f"\n🤖 Auto-review ({phase}): requesting changes ({len(feedback)} characters)")
+            return False, feedback
+        print(f"\n🤖 Auto-review ({phase}): approved by policy")
+        return True, ""
+
+    def confirm(self, prompt: str) -> bool:
+        answer = self.retry_on_error and self.retries_left > 0
+        if answer:
+            self.retries_left -= 1
+        print(f"{prompt.strip()} {'y' if answer else 'n'} (policy)")
+        return answer
+
+    def pause(self, prompt: str) -> None:
+        pass
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Import config
+from config import OUTPUT_DIR, GITHUB_USERNAME
+
+
+# Batch logs live next to the generated projects, one file per project
+BATCH_LOG_DIR_NAME = ".batch_logs"
+
+DEFAULT_CONCURRENCY = 2
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """
+    Load a batch manifest (YAML or JSON).
+
+    Layout:
+        concurrency: 4                      # optional, overridden by --concurrency
+        defaults:                           # optional, merged into every project
+          type: python
+          approval: {retry_on_error: true}
+        projects:
+          - name: todo-api
+            description: REST API for todo lists ...
+            type: python                    # python/web/ml/javascript
+            plan: |                         # optional pre-approved plan (or plan_file: path)
+              ...
+            approval:                       # optional PolicyApprover policy
+              feedback: ["Add pagination to the list endpoint"]
+
+    Returns:
+        dict with 'concurrency' and the normalized 'projects' list
+    """
+    manifest_path = Path(path)
+    text = manifest_path.read_text(encoding='utf-8')
+
+    if manifest_path.suffix.lower() in ('.yml', '.yaml'):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("PyYAML is required for YAML manifests. Install: pip install pyyaml (or use a .json manifest)")
+        data = yaml.safe_load(text) or {}
+    else:
+        data = json.loads(text)
+
+    if isinstance(data, list):
+        data = {'projects': data}
+
+    # Imported here like in the workers: pipeline.runner loads the agent stack
+    from pipeline.runner import sanitize_repo_name
+
+    defaults = data.get('defaults', {}) or {}
+    projects = []
+    repo_names: Dict[str, int] = {}
+    for index, entry in enumerate(data.get('projects', []) or [], 1):
+        project = {**defaults, **entry}
+        project['approval'] = {**(defaults.get('approval') or {}), **(entry.get('approval') or {})}
+
+        if not project.get('description'):
+            raise ValueError(f"Project #{index} in {manifest_path.name} has no description")
+        project.setdefault('name', f"ai-generated-project-{index}")
+        project.setdefault('type', 'python')
+
+        # Projects run in parallel in OUTPUT_DIR/<repo> and log to .batch_logs/<repo>.log
+        repo_name = sanitize_repo_name(str(project['name']))
+        if repo_name in repo_names:
+            raise ValueError(f"Projects #{repo_names[repo_name]} and #{index} in {manifest_path.name} "
+                             f"both use the repository name '{repo_name}'; give them distinct names")
+        repo_names[repo_name] = index
+
+        plan_file = project.pop('plan_file', None)
+        if plan_file and not project.get('plan'):
+            project['plan'] = (manifest_path.parent / plan_file).read_text(encoding='utf-8')
+
+        projects.append(project)
+
+    return {
+        'concurrency': int(data.get('concurrency', DEFAULT_CONCURRENCY)),
+        'projects': projects
+    }
+
+
+def _run_batch_project(project: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point: run one manifest project with its output captured in a log file"""
+    # Imported here so each spawned worker builds its own agents, LLM clients and caches
+    from pipeline.runner import run_project, sanitize_repo_name
+    from pipeline.approvals import PolicyApprover
+
+    repo_name = sanitize_repo_name(project['name'])
+    log_dir = OUTPUT_DIR / BATCH_LOG_DIR_NAME
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"{repo_name}.log"
+
+    started = time.time()
+    status, error = "failed", ""
+
+    stdout, stderr = sys.stdout, sys.stderr
+    with open(log_file, 'w', encoding='utf-8', buffering=1) as log:
+        sys.stdout = sys.stderr = log
+        try:
+            status = run_project(
+                project['description'],
+                project['type'],
+                repo_name,
+                github_username=project.get('github_username', GITHUB_USERNAME),
+                resume=bool(project.get('resume', False)),
+                approver=PolicyApprover(project.get('approval')),
+                approved_plan=project.get('plan')
+            ) or "completed"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            error = str(e)
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+    return {
+        'name': repo_name,
+        'status': status,
+        'error': error,
+        'duration': time.time() - started,
+        'log': str(log_file)
+    }
+
+
+def display_batch_summary(results: List[Dict[str, Any]], elapsed: float) -> None:
+    """Print the per-project outcome table"""
+    print("\n" + "=" * 80)
+    print("📦 BATCH SUMMARY")
+    print("=" * 80)
+
+    icons = {'completed': '✅', 'cancelled': '⚠️', 'failed': '❌'}
+    for result in results:
+        icon = icons.get(result['status'], '❓')
+        print(f"  {icon} {result['name']:<40} {result['status']:<10} {result['duration']:>7.0f}s")
+        if result['error']:
+            print(f"     Error: {result['error'][:100]}")
+        print(f"     Log: {result['log']}")
+
+    completed = sum(1 for r in results if r['status'] == 'completed')
+    print(f"\n📊 {completed}/{len(results)} projects completed in {elapsed:.0f}s")
+    if elapsed > 0 and completed:
+        print(f"   Throughput: {completed * 3600 / elapsed:.1f} projects/hour")
+    print("=" * 80)
+
+
+def run_batch(manifest_path: str, concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run every project in a manifest through the phase pipeline without prompting.
+
+    Projects run in separate worker processes (spawned, so no agent, LLM client
+    or SQLite handle is shared); each worker's output goes to
+    OUTPUT_DIR/.batch_logs/<repo>.log.
+
+    Args:
+        manifest_path: Path to a YAML/JSON manifest (see load_manifest)
+        concurrency: Projects generated at the same time (default: manifest value)
+
+    Returns:
+        One result dict per project, in manifest order
+    """
+    manifest = load_manifest(manifest_path)
+    projects = manifest['projects']
+    workers = max(1, concurrency or manifest['concurrency'])
+
+    if not projects:
+        print(f"⚠ No projects in {manifest_path}")
+        return []
+
+    print(f"\n🚀 Running {len(projects)} projects ({workers} at a time)")
+    print(f"📄 Logs: {OUTPUT_DIR / BATCH_LOG_DIR_NAME}")
+
+    started = time.time()
+    results: Dict[int, Dict[str, Any]] = {}
+
+    # Workers inherit the environment: they all draw from one rate-limit bucket per model
+    os.environ.setdefault("LLM_RATE_LIMIT_DB", str(OUTPUT_DIR / BATCH_LOG_DIR_NAME / "ratelimit.sqlite3"))
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {executor.submit(_run_batch_project, project): index for index, project in enumerate(projects)}
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker process died (e.g. killed or out of memory)
+                result = {'name': projects[index]['name'], 'status': 'failed', 'error': str(e),
+                          'duration': time.time() - started, 'log': ''}
+            results[index] = result
+            print(f"  {'✅' if result['status'] == 'completed' else '❌'} {result['name']}: {result['status']} "
+                  f"({len(results)}/{len(projects)})")
+
+    ordered = [results[i] for i in range(len(projects))]
+    display_batch_summary(ordered, time.time() - started)
+    return ordered
@@ -0,0 +1,147 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from crewai.tasks.task_output import TaskOutput
+
+
+# Per-project state lives here; the directory ignores itself so it is never committed
+STATE_DIR_NAME = ".agent_state"
+
+# Directories that are never part of a phase's file footprint
+SNAPSHOT_SKIP_DIRS = {'.git', STATE_DIR_NAME, '__pycache__', 'node_modules', '.venv', 'venv'}
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def restore_task(task, output: str):
+    """Attach a stored output to a freshly created task so it can serve as context without re-running it"""
+    task.output = TaskOutput(
+        description=task.description,
+        raw=output,
+        agent=task.agent.role if task.agent else ""
+    )
+    return task
+
+
+class CheckpointStore:
+    """
+    JSON-lines checkpoint log kept in <project_dir>/.agent_state/checkpoints.jsonl.
+
+    Every completed phase appends one record with its task output and the files
+    it added, modified or deleted (with content hashes), so an interrupted run
+    can be resumed without re-invoking the LLM for finished phases.
+    """
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = Path(project_dir)
+        self.state_dir = self.project_dir / STATE_DIR_NAME
+        self.path = self.state_dir / "checkpoints.jsonl"
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def reset(self) -> None:
+        """Forget all checkpoints (used when a project is generated from scratch)"""
+        if self.path.exists():
+            self.path.unlink()
+
+    def snapshot(self) -> Dict[str, str]:
+        """Map of relative path -> content hash for every file in the project"""
+        hashes = {}
+        if not self.project_dir.exists():
+            return hashes
+        for root, dirs, files in os.walk(self.project_dir):
+            dirs[:] = [d for d in dirs if d not in SNAPSHOT_SKIP_DIRS]
+            for name in files:
+                path = Path(root) / name
+                try:
+                    hashes[path.relative_to(self.project_dir).as_posix()] = hash_file(path)
+                except OSError:
+                    continue
+        return hashes
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if not self.state_dir.exists():
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            (self.state_dir / ".gitignore").write_text("*\n", encoding='utf-8')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def save_project(self, **metadata: Any) -> None:
+        """Record the project parameters needed to resume without prompting"""
+        self._append({
+            'phase': 'project',
+            'timestamp': datetime.now().isoformat(),
+            'data': metadata
+        })
+
+    def record(self, phase: str, output: str, before: Dict[str, str], iteration: Optional[int] = None,
+               status: str = "completed", **data: Any) -> Dict[str, Any]:
+        """Append a checkpoint for a finished phase, diffing the file snapshot taken before it ran"""
+        after = self.snapshot()
+        files = {}
+        for rel_path, digest in after.items():
+            if rel_path not in before:
+                files[rel_path] = {'change': 'added', 'sha256': digest}
+            elif before[rel_path] != digest:
+                files[rel_path] = {'change': 'modified', 'sha256': digest}
+        for rel_path in before:
+            if rel_path not in after:
+                files[rel_path] = {'change': 'deleted', 'sha256': None}
+
+        record = {
+            'phase': phase,
+            'iteration': iteration,
+            'status': status,
+            'timestamp': datetime.now().isoformat(),
+            'output': output,
+            'files': files,
+            'data': data
+        }
+        self._append(record)
+        return record
+
+    def records(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+        return records
+
+    def project(self) -> Optional[Dict[str, Any]]:
+        """Project parameters saved by save_project (None if never saved)"""
+        for record in reversed(self.records()):
+            if record['phase'] == 'project':
+                return record['data']
+        return None
+
+    def latest(self, phase: str, iteration: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Most recent checkpoint for a phase (and feedback iteration, if given)"""
+        for record in reversed(self.records()):
+            if record['phase'] == phase and (iteration is None or record.get('iteration') == iteration):
+                return record
+        return None
+
+    def last_feedback_iteration(self) -> int:
+        """Highest feedback iteration with at least one checkpoint (0 if none)"""
+        iterations = [r.get('iteration') or 0 for r in self.records() if r['phase'].startswith('feedback_')]
+        return max(iterations, default=0)
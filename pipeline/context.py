@@ -0,0 +1,174 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from crewai import Task
+
+# Import LLM layer
+from llm.tokens import estimate_tokens, truncate_to_tokens
+
+# Import checkpointing
+from pipeline.checkpoints import restore_task
+
+# Import config
+from config import CONTEXT_COMPACTION_ENABLED, CONTEXT_TOKEN_BUDGETS
+
+
+# Markdown headings, numbered ALL-CAPS headings ("3. FILE STRUCTURE") and bold-only lines
+SECTION_HEADING = re.compile(r'^(#{1,4}\s+\S.*|\d{1,2}[.)]\s+[A-Z][A-Z0-9 &/()\-,]+:?|\*\*[^*]+\*\*:?)\s*$')
+
+# Words too common in plans to say anything about relevance
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the this to was were will
+with should must can all any each not but if then than so we you your our use using add make new
+""".split())
+
+# Sections always kept because every later step depends on them
+ALWAYS_KEEP = re.compile(r'overview|summary|objective|structure|technology|stack', re.IGNORECASE)
+
+# Smallest leftover budget worth filling with a truncated section
+MIN_PARTIAL_SECTION_TOKENS = 200
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split a task output into (heading, body) sections; text before the first heading gets heading ''"""
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    in_code = False
+    for line in text.splitlines():
+        if line.strip().startswith("```"):
+            in_code = not in_code
+        if not in_code and SECTION_HEADING.match(line.strip()):
+            sections.append((line.strip(), [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines)) for heading, lines in sections if "\n".join(lines).strip()]
+
+
+def keywords(text: str) -> Dict[str, int]:
+    """Lower-case word counts without stop words (file names and identifiers are kept whole)"""
+    counts: Dict[str, int] = {}
+    for word in re.findall(r'[A-Za-z_][A-Za-z0-9_./-]{2,}', text.lower()):
+        if word not in STOP_WORDS:
+            counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def relevance(section: str, query_words: Dict[str, int]) -> float:
+    """Share of the query's keywords that appear in a section, weighted by how often the query uses them"""
+    if not query_words:
+        return 0.0
+    words = keywords(section)
+    total = sum(query_words.values())
+    return sum(count for word, count in query_words.items() if word in words) / total
+
+
+def slice_to_budget(text: str, query: str, budget: int) -> str:
+    """
+    Keep the sections of text most relevant to query within budget tokens.
+
+    Overview/structure sections are always kept first, then the remaining
+    sections by relevance; kept sections stay in their original order and
+    omitted ones are listed by heading so the agent knows they exist.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+
+    sections = split_sections(text)
+    if len(sections) < 2:
+        return truncate_to_tokens(text, budget)
+
+    query_words = keywords(query)
+    costs = [estimate_tokens(body) for _, body in sections]
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: (not ALWAYS_KEEP.search(sections[i][0]), -relevance(sections[i][1], query_words), i)
+    )
+
+    kept, used = {}, 0
+    for i in ranked:
+        if used + costs[i] <= budget:
+            kept[i] = sections[i][1]
+            used += costs[i]
+        elif budget - used >= MIN_PARTIAL_SECTION_TOKENS and (
+                ALWAYS_KEEP.search(sections[i][0]) or relevance(sections[i][1], query_words) > 0):
+            # Too large to keep whole but needed: keep its beginning and end
+            kept[i] = truncate_to_tokens(sections[i][1], budget - used)
+            used = budget
+
+    if not kept:
+        return truncate_to_tokens(text, budget)
+
+    omitted = [sections[i][0] for i in range(len(sections)) if i not in kept and sections[i][0]]
+    parts = [kept[i] for i in sorted(kept)]
+    if omitted:
+        parts.append("[Sections omitted as not relevant to this change: " + "; ".join(omitted) + "]")
+    return "\n".join(parts)
+
+
+class ContextCompactor:
+    """
+    Shrinks the outputs of context tasks to a per-agent token budget.
+
+    Each context task is replaced by a proxy task carrying a compacted copy of
+    its output (the original task is untouched, so checkpoints and later
+    iterations still see the full text). Token savings are reported per call
+    and accumulated for the run summary.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, enabled: bool = CONTEXT_COMPACTION_ENABLED):
+        self.budgets = budgets or CONTEXT_TOKEN_BUDGETS
+        self.enabled = enabled
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def compact(self, agent_name: str, context_tasks: List[Optional[Task]], query: str) -> List[Task]:
+        """
+        Args:
+            agent_name: Key into the budget table (manager/developer/tester/github)
+            context_tasks: Tasks whose outputs form the context (None entries are dropped)
+            query: Text describing the current change (feedback, improvement plan)
+
+        Returns:
+            Context tasks to pass to the next task
+        """
+        tasks = [task for task in context_tasks if task is not None]
+        if not self.enabled:
+            return tasks
+
+        outputs = [task.output.raw if task.output else "" for task in tasks]
+        sizes = [estimate_tokens(output) for output in outputs]
+        before = sum(sizes)
+        budget = self.budgets.get(agent_name, self.budgets.get('default', 6000))
+        if before <= budget:
+            self.tokens_before += before
+            self.tokens_after += before
+            return tasks
+
+        # Small outputs keep their full text; what they leave unused is shared by the larger ones
+        shares = [0] * len(tasks)
+        remaining, pending = budget, sorted(range(len(tasks)), key=lambda i: sizes[i])
+        while pending:
+            share = remaining // len(pending)
+            i = pending.pop(0)
+            shares[i] = min(sizes[i], share)
+            remaining -= shares[i]
+
+        compacted = []
+        after = 0
+        for task, output, size, share in zip(tasks, outputs, sizes, shares):
+            if size <= share:
+                compacted.append(task)
+                after += size
+                continue
+            sliced = slice_to_budget(output, query, share)
+            after += estimate_tokens(sliced)
+            proxy = Task(description=task.description, expected_output=task.expected_output, agent=task.agent)
+            compacted.append(restore_task(proxy, sliced))
+
+        self.tokens_before += before
+        self.tokens_after += after
+        print(f"\n🗜️  Context for {agent_name}: {before:,} → {after:,} tokens "
+              f"(saved {before - after:,}, budget {budget:,})")
+        return compacted
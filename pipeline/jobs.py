@@ -0,0 +1,192 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Job lifecycle: queued -> running -> completed/failed/cancelled
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED_STATES = ("completed", "failed", "cancelled")
+
+JOB_FIELDS = ('id', 'user', 'name', 'description', 'project_type', 'plan', 'approval', 'status',
+              'cancel_requested', 'worker', 'attempts', 'created', 'started', 'finished', 'error', 'log')
+
+
+class JobQueue:
+    """
+    Persistent generation job queue stored in SQLite.
+
+    Shared by the HTTP server and every worker process (each opens its own
+    connection). Jobs are claimed with a write transaction so two workers never
+    run the same job, and claim order is fair across users: the next job comes
+    from the user with the fewest running jobs, oldest submission first. Jobs
+    that would write the same project directory are never claimed at once.
+    """
+
+    def __init__(self, db_path: Path):
+        self.path = Path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   user TEXT NOT NULL,
+                   name TEXT NOT NULL,
+                   description TEXT NOT NULL,
+                   project_type TEXT NOT NULL,
+                   plan TEXT,
+                   approval TEXT,
+                   status TEXT NOT NULL,
+                   cancel_requested INTEGER NOT NULL DEFAULT 0,
+                   worker TEXT,
+                   attempts INTEGER NOT NULL DEFAULT 0,
+                   created REAL NOT NULL,
+                   started REAL,
+                   finished REAL,
+                   error TEXT,
+                   log TEXT
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_status_user ON jobs(status, user)")
+
+    def _row(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = {field: row[field] for field in JOB_FIELDS}
+        job['approval'] = json.loads(job['approval']) if job['approval'] else {}
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    def submit(self, user: str, name: str, description: str, project_type: str = "python",
+               plan: Optional[str] = None, approval: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a project for generation"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (user, name, description, project_type, plan, approval, status, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user, name, description, project_type, plan, json.dumps(approval or {}), QUEUED, time.time())
+            )
+            job_id = cursor.lastrowid
+        return self.get(job_id)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def list(self, user: Optional[str] = None, status: Optional[str] = None,
+             limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally filtered by user and status"""
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List[Any] = []
+        if user:
+            query += " AND user = ?"
+            params.append(user)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def claim_next(self, worker: str,
+                   project_key: Optional[Callable[[str], str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the next fair-share job to running for this worker.
+
+        Args:
+            worker: Worker id recorded on the job
+            project_key: Maps a job name to the project it writes; jobs whose
+                         project is being generated by a running job wait
+
+        Returns:
+            The claimed job, or None when nothing can be claimed
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                busy = set()
+                if project_key is not None:
+                    busy = {project_key(row['name']) for row in
+                            self._conn.execute("SELECT name FROM jobs WHERE status = ?", (RUNNING,))}
+                candidates = self._conn.execute(
+                    """SELECT q.id, q.name FROM jobs q
+                       LEFT JOIN (SELECT user, COUNT(*) AS running FROM jobs
+                                  WHERE status = ? GROUP BY user) r ON r.user = q.user
+                       WHERE q.status = ?
+                       ORDER BY COALESCE(r.running, 0) ASC,
+                                (SELECT MIN(id) FROM jobs WHERE user = q.user AND status = ?) ASC,
+                                q.id ASC""",
+                    (RUNNING, QUEUED, QUEUED)
+                )
+                row = next((candidate for candidate in candidates
+                            if project_key is None or project_key(candidate['name']) not in busy), None)
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started = ?, attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, worker, time.time(), row['id'])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row['id'])
+
+    def set_log(self, job_id: int, log_path: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET log = ? WHERE id = ?", (log_path, job_id))
+
+    def finish(self, job_id: int, status: str, error: str = "") -> None:
+        """Record the outcome of a running job"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, error = ? WHERE id = ?",
+                (status, time.time(), error, job_id)
+            )
+
+    def cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs are
+        flagged and stop at the next phase boundary.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = ?",
+                (time.time(), job_id, QUEUED)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING)
+            )
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def requeue_running(self) -> int:
+        """Put jobs left running by a previous server process back in the queue (they resume from checkpoints)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, started = NULL WHERE status = ?",
+                (QUEUED, RUNNING)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+from typing import List
+from crewai import Task
+
+# Import tools (called directly, outside any agent)
+from tools.code_execution import validate_project_syntax
+from tools.testing_tools import lint_code
+from tools.github_tools import detect_project_type, generate_gitignore
+
+# Import checkpointing
+from pipeline.checkpoints import restore_task
+
+
+# Keep pre-check output small enough to sit in the tester's context
+MAX_LINT_REPORT_CHARS = 4000
+
+
+def prepare_gitignore(project_dir: Path) -> str:
+    """Create a .gitignore for the detected project type if the project has none"""
+    gitignore_path = project_dir / '.gitignore'
+    if gitignore_path.exists():
+        return "✓ Using existing .gitignore"
+    project_type = detect_project_type(str(project_dir))
+    gitignore_path.write_text(generate_gitignore(project_type), encoding='utf-8')
+    return f"✓ Created .gitignore ({project_type} template)"
+
+
+def prepare_readme(project_dir: Path, repo_name: str, description: str) -> str:
+    """Create a minimal README.md if the developer did not write one"""
+    readme_path = project_dir / 'README.md'
+    if readme_path.exists() and readme_path.stat().st_size > 0:
+        return "✓ Using existing README.md"
+    readme_path.write_text(f"# {repo_name}\n\n{description}\n", encoding='utf-8')
+    return "✓ Created README.md"
+
+
+async def prepare_deployment(project_dir: Path, repo_name: str, description: str) -> List[str]:
+    """README and .gitignore prep for the GitHub phase (independent, so run together)"""
+    return list(await asyncio.gather(
+        asyncio.to_thread(prepare_gitignore, project_dir),
+        asyncio.to_thread(prepare_readme, project_dir, repo_name, description)
+    ))
+
+
+async def run_prechecks(project_dir: Path) -> str:
+    """
+    Lint the project and validate the syntax of every source file concurrently.
+
+    Returns:
+        Combined report used as context for the testing task
+    """
+    lint_result, syntax_report = await asyncio.gather(
+        asyncio.to_thread(lint_code.func, str(project_dir)),
+        asyncio.to_thread(validate_project_syntax.func, str(project_dir))
+    )
+
+    if len(lint_result) > MAX_LINT_REPORT_CHARS:
+        lint_result = lint_result[:MAX_LINT_REPORT_CHARS] + "\n... (lint output truncated)"
+
+    report = "AUTOMATED PRE-CHECKS\n"
+    report += "═" * 70 + "\n"
+    report += syntax_report
+    report += "─" * 70 + "\n"
+    report += lint_result
+    return report
+
+
+def create_precheck_task(report: str) -> Task:
+    """Wrap a pre-check report in a completed task so it can be passed as context"""
+    return restore_task(
+        Task(
+            description="Automated lint and syntax validation run before testing",
+            expected_output="Lint output and syntax errors per file"
+        ),
+        report
+    )
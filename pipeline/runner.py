@@ -0,0 +1,995 @@
+import os
+import re
+import asyncio
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from crewai import Crew, Process
+
+# Import agents
+from agents.manager import create_manager_agent
+from agents.developer import create_developer_agent
+from agents.tester import create_tester_agent
+from agents.github import create_github_agent
+
+# Import tasks
+from tasks.manager_tasks import create_planning_task
+from tasks.manager_tasks import create_improvement_planning_task_inline
+from tasks.developer_tasks import create_development_task
+from tasks.tester_tasks import create_testing_task
+from tasks.github_tasks import create_github_deployment_task, create_github_repository_task
+
+# Import LLM layer
+from llm import get_response_cache, routing_stats, rate_limit_stats
+
+# Import tracing
+from tracing import start_trace, enter_phase, traced_kickoff
+
+# Import checkpointing and approvals
+from pipeline.checkpoints import CheckpointStore, restore_task
+from pipeline.approvals import InteractiveApprover
+from pipeline.prep import prepare_deployment, run_prechecks, create_precheck_task
+from pipeline.context import ContextCompactor
+
+# Import workspace index and watcher
+from tools.workspace_index import get_workspace_index, matches_pattern
+from tools.watcher import watch, unwatch, watcher_for
+
+# Import config
+from config import OUTPUT_DIR, GITHUB_USERNAME
+
+
+def sanitize_repo_name(name: str) -> str:
+    """Convert project name to valid GitHub repository name"""
+    name = re.sub(r'[^a-zA-Z0-9\s-]', '', name)
+    name = name.lower().strip().replace(' ', '-')
+    name = re.sub(r'-+', '-', name)
+    return name
+
+
+def create_project_directory(project_name: str) -> Path:
+    """Create and return project directory path"""
+    safe_name = sanitize_repo_name(project_name)
+    project_dir = OUTPUT_DIR / f"{safe_name}"
+    project_dir.mkdir(parents=True, exist_ok=True)
+    return project_dir
+
+
+def display_plan(plan: str, title: str = "TECHNICAL PLAN") -> None:
+    """Display the technical plan in a formatted way"""
+    print("\n" + "=" * 80)
+    print(f"📋 {title}")
+    print("=" * 80)
+    print(plan)
+    print("=" * 80)
+
+
+def display_project_summary(project_dir: Path) -> None:
+    """Display summary of generated project"""
+    print("\n" + "=" * 80)
+    print("📦 PROJECT SUMMARY")
+    print("=" * 80)
+
+    print(f"\n📁 Project Location: {project_dir}")
+
+    # List key files
+    print("\n📄 Key Files Generated:")
+    key_patterns = ['README.md', 'requirements.txt', 'package.json', '*.py', '*.js', '*.ts', 'TEST_REPORT.md']
+    entries = get_workspace_index(project_dir).list(project_dir)
+
+    # Top-level key files and everything under src/
+    key_files = [
+        (relative, entry.path) for relative, entry in entries
+        if not entry.is_dir and (relative.startswith('src' + os.sep)
+                                 or any(matches_pattern(relative, pattern, False) for pattern in key_patterns))
+    ]
+
+    for file_count, (relative, file) in enumerate(key_files, 1):
+        print(f"  {file_count}. {relative}")
+
+        # Show first line of important files
+        if file.name in ['README.md', 'TEST_REPORT.md']:
+            try:
+                with open(file, 'r', encoding='utf-8') as f:
+                    first_line = f.readline()
+                if first_line:
+                    print(f"     Preview: {first_line.strip()[:60]}...")
+            except:
+                pass
+
+    print(f"\n📊 Total Files: {len(entries)} files")
+    print("=" * 80)
+
+
+def create_agents() -> Dict[str, Any]:
+    """Create the manager, developer, tester and GitHub agents for one pipeline owner"""
+    return {
+        'manager': create_manager_agent(),
+        'developer': create_developer_agent(),
+        'tester': create_tester_agent(),
+        'github': create_github_agent()
+    }
+
+
+def print_skipped(phase: str) -> None:
+    """Announce a phase restored from its checkpoint"""
+    print(f"\n⏭️  {phase} already completed - restored from checkpoint")
+
+
+def run_project(project_description: str, project_type: str, repo_name: str,
+                github_username: str = GITHUB_USERNAME, resume: bool = False,
+                approver=None, approved_plan: Optional[str] = None,
+                agents: Optional[Dict[str, Any]] = None,
+                should_cancel: Optional[Callable[[], bool]] = None) -> str:
+    """
+    Run the full generation pipeline (PHASE 0-5) for one project (see run_project_async).
+
+    The run is traced; the span tree is exported to TRACE_DIR when it ends. The
+    project directory is watched for changes from PHASE 1 until the run ends.
+    """
+    with start_trace(repo_name) as trace:
+        try:
+            status = asyncio.run(run_project_async(
+                project_description, project_type, repo_name,
+                github_username=github_username, resume=resume,
+                approver=approver, approved_plan=approved_plan,
+                agents=agents, should_cancel=should_cancel
+            ))
+        finally:
+            unwatch(OUTPUT_DIR / repo_name)
+        if trace is not None:
+            trace.root.set(status=status, project_type=project_type, resume=resume)
+        return status
+
+
+async def run_project_async(project_description: str, project_type: str, repo_name: str,
+                            github_username: str = GITHUB_USERNAME, resume: bool = False,
+                            approver=None, approved_plan: Optional[str] = None,
+                            agents: Optional[Dict[str, Any]] = None,
+                            should_cancel: Optional[Callable[[], bool]] = None) -> str:
+    """
+    Run the full generation pipeline (PHASE 0-5) for one project.
+
+    Phases run as coroutines: every crew is started with kickoff_async, and work
+    without a data dependency runs concurrently (the first plan is drafted while the
+    repository is created, README/.gitignore prep and lint/syntax pre-checks run
+    together). Phases that consume another phase's output or files still run in order.
+
+    Args:
+        project_description: Natural language description of the project
+        project_type: python/web/ml/javascript
+        repo_name: Sanitized repository name (also the project directory name)
+        github_username: GitHub account that owns the repository
+        resume: Skip phases recorded in the project's checkpoint log and rebuild
+                their task context from the stored outputs instead of re-running them
+        approver: Answers reviews, retry prompts and pauses (default: InteractiveApprover)
+        approved_plan: Pre-approved technical plan; PHASE 1 uses it instead of calling the planner
+        agents: Agent set from create_agents() to reuse (default: create a new one)
+        should_cancel: Polled at phase boundaries; returning True stops the run as 'cancelled'
+
+    Returns:
+        'completed', 'cancelled' or 'failed'
+    """
+    approver = approver or InteractiveApprover()
+    compactor = ContextCompactor()
+
+    def cancelled() -> bool:
+        if should_cancel is not None and should_cancel():
+            print("\n🛑 Cancellation requested - stopping at phase boundary")
+            return True
+        return False
+
+    # Create project directory
+    project_dir = OUTPUT_DIR / f"{repo_name}"
+    print(f"✓ Project will be created at: {project_dir}")
+
+    checkpoints = CheckpointStore(project_dir)
+    if not resume:
+        checkpoints.reset()
+
+    print("\n" + "=" * 80)
+    print("🚀 " + ("RESUMING PROJECT GENERATION" if resume else "STARTING PROJECT GENERATION"))
+    print("=" * 80)
+
+    # Create agents (only once)
+    if agents is None:
+        print("\n👥 Initializing AI agents...")
+        agents = create_agents()
+        print("✓ Agents ready!")
+    manager = agents['manager']
+    developer = agents['developer']
+    tester = agents['tester']
+    github_manager = agents['github']
+
+    # =========================================================================
+    # PHASE 0: GITHUB REPOSITORY CREATION
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("🔧 PHASE 0: GITHUB REPOSITORY CREATION")
+    print("=" * 80)
+    enter_phase("PHASE 0: REPOSITORY")
+
+    # The first plan only needs the description, so the manager drafts it while the
+    # repository is created and cloned; it is saved and reviewed once both finish
+    planning_kickoff = None
+    planning_task = None
+    if not (resume and checkpoints.latest('planning')) and not approved_plan:
+        print("\n📋 Drafting technical plan in parallel...")
+        planning_task = create_planning_task(manager, str(project_dir), project_description, project_type)
+        planning_crew = Crew(
+            agents=[manager],
+            tasks=[planning_task],
+            process=Process.sequential,
+            verbose=True
+        )
+        planning_kickoff = asyncio.ensure_future(traced_kickoff(planning_crew, "planning"))
+
+    async def drop_planning_draft() -> None:
+        # The crew runs in a worker thread that cancel() cannot stop: let it finish
+        # (and its span close) before returning, discarding its result or error
+        if planning_kickoff is not None:
+            print("⏳ Waiting for the plan drafted in parallel to finish...")
+            await asyncio.gather(planning_kickoff, return_exceptions=True)
+
+    if resume and checkpoints.latest('repository'):
+        print_skipped("PHASE 0")
+    else:
+        try:
+            print("\n📦 Creating GitHub repository...")
+            before = checkpoints.snapshot()
+
+            repo_creation_task = create_github_repository_task(
+                github_manager,
+                repo_name,
+                project_description,
+                github_username,
+                str(project_dir),
+                visibility="public",
+                license_type="MIT"
+            )
+
+            repo_creation_crew = Crew(
+                agents=[github_manager],
+                tasks=[repo_creation_task],
+                process=Process.sequential,
+                verbose=True
+            )
+
+            repo_result = await traced_kickoff(repo_creation_crew, "repository")
+            print("\n✅ GitHub repository created and cloned!")
+            print(f"📍 Repository: https://github.com/{github_username}/{repo_name}")
+
+            checkpoints.save_project(
+                description=project_description,
+                project_type=project_type,
+                repo_name=repo_name,
+                github_username=github_username
+            )
+            checkpoints.record('repository', str(repo_result), before)
+
+        except Exception as e:
+            print(f"\n❌ Error creating repository: {str(e)}")
+            print("Project generation cannot continue without repository.")
+            await drop_planning_draft()
+            return "failed"
+
+    if cancelled():
+        await drop_planning_draft()
+        return "cancelled"
+
+    # The clone exists now; watch it so tool caches follow changes made outside the file tools
+    if watch(project_dir):
+        print(f"👀 Watching {project_dir} for changes ({watcher_for(project_dir).backend.name})")
+
+    # =========================================================================
+    # PHASE 1: PLANNING WITH APPROVAL LOOP
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("📋 PHASE 1: TECHNICAL PLANNING")
+    print("=" * 80)
+    enter_phase("PHASE 1: PLANNING")
+
+    plan_approved = False
+    planning_iteration = 0
+    max_planning_iterations = 5
+    current_description = project_description
+
+    checkpoint = checkpoints.latest('planning') if resume else None
+    if checkpoint:
+        print_skipped("PHASE 1")
+        planning_iteration = checkpoint['data']['iterations']
+        current_description = checkpoint['data']['description']
+        planning_task = restore_task(
+            create_planning_task(manager, str(project_dir), current_description, project_type),
+            checkpoint['output']
+        )
+        plan_approved = True
+    elif approved_plan:
+        print("\n✓ Using pre-approved plan")
+        before = checkpoints.snapshot()
+        planning_task = restore_task(
+            create_planning_task(manager, str(project_dir), current_description, project_type),
+            approved_plan
+        )
+        plan_file = project_dir / "TECHNICAL_PLAN.md"
+        plan_file.write_text(approved_plan, encoding='utf-8')
+        print(f"💾 Plan saved to: {plan_file}")
+        checkpoints.record('planning', approved_plan, before,
+                           iterations=planning_iteration, description=current_description)
+        plan_approved = True
+
+    while not plan_approved and planning_iteration < max_planning_iterations:
+        planning_iteration += 1
+        print(f"\n🔄 Planning iteration {planning_iteration}/{max_planning_iterations}...")
+        before = checkpoints.snapshot()
+
+        try:
+            if planning_kickoff is not None:
+                # Started alongside PHASE 0
+                kickoff, planning_kickoff = planning_kickoff, None
+                plan_result = await kickoff
+            else:
+                planning_task = create_planning_task(
+                    manager,
+                    str(project_dir),
+                    current_description,
+                    project_type
+                )
+
+                planning_crew = Crew(
+                    agents=[manager],
+                    tasks=[planning_task],
+                    process=Process.sequential,
+                    verbose=True
+                )
+
+                plan_result = await traced_kickoff(planning_crew, "planning")
+            display_plan(str(plan_result))
+
+            # Save plan
+            plan_file = project_dir / "TECHNICAL_PLAN.md"
+            plan_file.write_text(str(plan_result), encoding='utf-8')
+            print(f"\n💾 Plan saved to: {plan_file}")
+
+            # Get approval
+            approved, feedback = approver.review("plan")
+
+            if feedback == "CANCELLED":
+                print("\n👋 Goodbye!")
+                return "cancelled"
+
+            if approved:
+                plan_approved = True
+                checkpoints.record('planning', str(plan_result), before,
+                                   iterations=planning_iteration, description=current_description)
+                break
+            else:
+                current_description = f"""{current_description}
+
+ADDITIONAL REQUIREMENTS (Iteration {planning_iteration}):
+{feedback}
+
+Update the technical plan to incorporate these requirements."""
+                print("\n🔄 Regenerating plan with your feedback...")
+
+        except Exception as e:
+            print(f"\n❌ Error during planning: {str(e)}")
+            if not approver.confirm("\nRetry? (y/n): "):
+                return "failed"
+
+    if not plan_approved:
+        print(f"\n⚠ Max planning iterations ({max_planning_iterations}) reached.")
+        return "failed"
+
+    if cancelled():
+        return "cancelled"
+
+    # =========================================================================
+    # PHASE 2: INITIAL IMPLEMENTATION
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("💻 PHASE 2: CODE IMPLEMENTATION")
+    print("=" * 80)
+    enter_phase("PHASE 2: IMPLEMENTATION")
+
+    development_task = create_development_task(
+        developer,
+        str(project_dir),
+        str(project_type),
+        context_tasks=[planning_task]
+    )
+
+    checkpoint = checkpoints.latest('development') if resume else None
+    if checkpoint:
+        print_skipped("PHASE 2")
+        restore_task(development_task, checkpoint['output'])
+    else:
+        try:
+            before = checkpoints.snapshot()
+
+            development_crew = Crew(
+                agents=[developer],
+                tasks=[development_task],
+                process=Process.sequential,
+                verbose=True
+            )
+
+            print("\n🔨 Writing code... This may take several minutes...")
+            dev_result = await traced_kickoff(development_crew, "development")
+            print("\n✅ Code implementation complete!")
+            checkpoints.record('development', str(dev_result), before)
+
+        except Exception as e:
+            print(f"\n❌ Error during development: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return "failed"
+
+    if cancelled():
+        return "cancelled"
+
+    # =========================================================================
+    # PHASE 3: INITIAL TESTING
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("🧪 PHASE 3: TESTING & QUALITY ASSURANCE")
+    print("=" * 80)
+    enter_phase("PHASE 3: TESTING")
+
+    testing_task = create_testing_task(
+        tester,
+        str(project_dir),
+        str(project_type),
+        context_tasks=[planning_task, development_task]
+    )
+
+    checkpoint = checkpoints.latest('testing') if resume else None
+    if checkpoint:
+        print_skipped("PHASE 3")
+        if checkpoint['status'] == 'completed':
+            restore_task(testing_task, checkpoint['output'])
+    else:
+        before = checkpoints.snapshot()
+        try:
+            print("\n🔎 Running lint and syntax pre-checks...")
+            precheck_task = create_precheck_task(await run_prechecks(project_dir))
+            testing_task = create_testing_task(
+                tester,
+                str(project_dir),
+                str(project_type),
+                context_tasks=[planning_task, development_task, precheck_task]
+            )
+
+            testing_crew = Crew(
+                agents=[tester],
+                tasks=[testing_task],
+                process=Process.sequential,
+                verbose=True
+            )
+
+            print("\n🔍 Running tests and quality checks...")
+            test_result = await traced_kickoff(testing_crew, "testing")
+            print("\n✅ Testing complete!")
+            checkpoints.record('testing', str(test_result), before)
+
+            test_report = project_dir / "TEST_REPORT.md"
+            if test_report.exists():
+                print(f"\n📊 Test report: {test_report}")
+
+        except Exception as e:
+            print(f"\n❌ Error during testing: {str(e)}")
+            print("⚠ Continuing to deployment...")
+            import traceback
+            traceback.print_exc()
+            checkpoints.record('testing', "", before, status="failed", error=str(e))
+
+    if cancelled():
+        return "cancelled"
+
+    # =========================================================================
+    # PHASE 4: INITIAL GITHUB DEPLOYMENT
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("🚀 PHASE 4: GITHUB DEPLOYMENT")
+    print("=" * 80)
+    enter_phase("PHASE 4: DEPLOYMENT")
+
+    if resume and checkpoints.latest('deployment'):
+        print_skipped("PHASE 4")
+    else:
+        before = checkpoints.snapshot()
+        try:
+            for line in await prepare_deployment(project_dir, repo_name, project_description):
+                print(line)
+
+            github_task = create_github_deployment_task(
+                agent=github_manager,
+                project_dir=str(project_dir),
+                repo_name=repo_name,
+                github_username=github_username,
+                context_tasks=[planning_task, development_task, testing_task]
+            )
+
+            github_crew = Crew(
+                agents=[github_manager],
+                tasks=[github_task],
+                process=Process.sequential,
+                verbose=True
+            )
+
+            print("\n📤 Deploying to GitHub...")
+            github_result = await traced_kickoff(github_crew, "deployment")
+            print("\n✅ GitHub deployment complete!")
+            print(f"🔗 View at: https://github.com/{github_username}/{repo_name}")
+            checkpoints.record('deployment', str(github_result), before)
+
+        except Exception as e:
+            print(f"\n❌ Error during deployment: {str(e)}")
+            print("Continuing with feedback loop...")
+            import traceback
+            traceback.print_exc()
+            checkpoints.record('deployment', "", before, status="failed", error=str(e))
+
+    if cancelled():
+        return "cancelled"
+
+    # =========================================================================
+    # PHASE 5: POST-DEPLOYMENT FEEDBACK LOOP (WITH MANAGER)
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("🎯 PHASE 5: FEEDBACK LOOP - ITERATIVE IMPROVEMENTS")
+    print("=" * 80)
+    enter_phase("PHASE 5: FEEDBACK LOOP")
+
+    print("\n📦 Initial project generated and deployed!")
+    print(f"\n🔗 GitHub: https://github.com/{github_username}/{repo_name}")
+    print(f"📁 Local: {project_dir}")
+
+    # Display project summary
+    display_project_summary(project_dir)
+
+    print("\n" + "=" * 80)
+    print("⏸️  PAUSE FOR REVIEW")
+    print("=" * 80)
+    print("\nPlease take time to:")
+    print("  1. 📂 Browse the generated files locally")
+    print("  2. 📖 Read the README.md and documentation")
+    print("  3. 🧪 Check the TEST_REPORT.md")
+    print("  4. 🚀 Run and test the project")
+    print("  5. 🔗 Review the GitHub repository")
+
+    approver.pause("\n⏸️  Press Enter when ready to provide feedback...\n")
+
+    # Feedback iteration loop
+    feedback_iteration = 0
+    max_feedback_iterations = 10  # Continue until user is satisfied
+    project_approved = False
+    improvement_plan_task = None
+
+    # Restore the latest feedback iteration; an unfinished one is continued where it stopped
+    resume_iteration = None
+    if resume and checkpoints.last_feedback_iteration():
+        last_iteration = checkpoints.last_feedback_iteration()
+        plan_checkpoint = checkpoints.latest('feedback_plan', last_iteration)
+        if plan_checkpoint:
+            improvement_plan_task = restore_task(
+                create_improvement_planning_task_inline(
+                    manager, str(project_dir), project_type,
+                    plan_checkpoint['data']['feedback'], last_iteration,
+                    context_tasks=[planning_task, development_task, testing_task]
+                ),
+                plan_checkpoint['output']
+            )
+            checkpoint = checkpoints.latest('feedback_development', last_iteration)
+            if checkpoint:
+                development_task = restore_task(
+                    create_development_task(developer, str(project_dir), str(project_type),
+                                            context_tasks=[planning_task, improvement_plan_task]),
+                    checkpoint['output']
+                )
+            checkpoint = checkpoints.latest('feedback_testing', last_iteration)
+            if checkpoint and checkpoint['status'] == 'completed':
+                testing_task = restore_task(
+                    create_testing_task(tester, str(project_dir), str(project_type),
+                                        context_tasks=[planning_task, improvement_plan_task, development_task]),
+                    checkpoint['output']
+                )
+
+        if checkpoints.latest('feedback_deployment', last_iteration) or not plan_checkpoint:
+            feedback_iteration = last_iteration if plan_checkpoint else last_iteration - 1
+        else:
+            feedback_iteration = last_iteration - 1
+            resume_iteration = {
+                'iteration': last_iteration,
+                'feedback': plan_checkpoint['data']['feedback']
+            }
+        print(f"\n⏭️  Restored feedback loop state up to iteration {last_iteration}")
+
+    while not project_approved:
+        if cancelled():
+            return "cancelled"
+
+        feedback_iteration += 1
+        print(f"\n" + "=" * 80)
+        print(f"🔄 FEEDBACK ITERATION {feedback_iteration}")
+        print("=" * 80)
+        enter_phase(f"ITERATION {feedback_iteration}", depth=1)
+
+        resuming = resume_iteration is not None and resume_iteration['iteration'] == feedback_iteration
+
+        # Get user feedback
+        if resuming:
+            approved, user_feedback = False, resume_iteration['feedback']
+            print("\n⏭️  Continuing interrupted iteration with the recorded feedback")
+        else:
+            approved, user_feedback = approver.review("final")
+
+        if user_feedback == "CANCELLED":
+            print("\n✓ Project saved locally and on GitHub")
+            break
+
+        if approved:
+            project_approved = True
+            print("\n🎉 Project approved! You're satisfied with the result!")
+            break
+
+        # User wants changes - Process through Manager → Developer → Tester → GitHub
+        print("\n" + "=" * 80)
+        print(f"📝 PROCESSING FEEDBACK (Iteration {feedback_iteration})")
+        print("=" * 80)
+        print("\nYour Feedback:")
+        print("-" * 80)
+        print(user_feedback)
+        print("-" * 80)
+
+        # Save user feedback
+        feedback_file = project_dir / f"USER_FEEDBACK_{feedback_iteration}.md"
+        feedback_file.write_text(f"""# User Feedback - Iteration {feedback_iteration}
+
+## Requested Changes:
+{user_feedback}
+
+## Status: Processing...
+""", encoding='utf-8')
+
+        # =====================================================================
+        # STEP 1: MANAGER CREATES IMPROVEMENT PLAN
+        # =====================================================================
+        print("\n" + "=" * 80)
+        print("🧠 STEP 1: MANAGER ANALYZING FEEDBACK")
+        print("=" * 80)
+        enter_phase("STEP 1: IMPROVEMENT PLAN", depth=2)
+
+        improvement_plan_approved = False
+        improvement_plan_iteration = 0
+        max_improvement_plan_iterations = 2
+        current_feedback = user_feedback
+
+        if resuming:
+            print_skipped("STEP 1")
+            improvement_plan_approved = True
+        else:
+            improvement_plan_task = None
+
+        while not improvement_plan_approved and improvement_plan_iteration < max_improvement_plan_iterations:
+            improvement_plan_iteration += 1
+
+            if improvement_plan_iteration > 1:
+                print(f"\n🔄 Refining improvement plan (attempt {improvement_plan_iteration})...")
+            else:
+                print("\n🤔 Manager analyzing feedback and creating improvement plan...")
+
+            try:
+                before = checkpoints.snapshot()
+
+                # Create improvement plan using inline task
+                improvement_plan_task = create_improvement_planning_task_inline(
+                    manager,
+                    str(project_dir),
+                    project_type,
+                    current_feedback,
+                    feedback_iteration,
+                    context_tasks=compactor.compact(
+                        'manager', [planning_task, development_task, testing_task], current_feedback
+                    )
+                )
+
+                improvement_crew = Crew(
+                    agents=[manager],
+                    tasks=[improvement_plan_task],
+                    process=Process.sequential,
+                    verbose=True
+                )
+
+                improvement_result = await traced_kickoff(improvement_crew, "improvement_plan")
+
+                # Display improvement plan
+                display_plan(str(improvement_result),
+                           title=f"IMPROVEMENT PLAN (Iteration {feedback_iteration})")
+
+                # Save improvement plan
+                plan_file = project_dir / f"IMPROVEMENT_PLAN_{feedback_iteration}.md"
+                plan_file.write_text(str(improvement_result), encoding='utf-8')
+                print(f"\n💾 Improvement plan saved to: {plan_file}")
+
+                # Get approval for improvement plan
+                plan_approved, plan_feedback = approver.review("improvement_plan")
+
+                if plan_feedback == "CANCELLED":
+                    print("\n✓ Project saved. You can continue manually.")
+                    return "cancelled"
+
+                if plan_approved:
+                    improvement_plan_approved = True
+                    checkpoints.record('feedback_plan', str(improvement_result), before,
+                                       iteration=feedback_iteration, feedback=current_feedback)
+                    break
+                else:
+                    current_feedback = f"""{user_feedback}
+
+ADDITIONAL FEEDBACK ON IMPROVEMENT PLAN:
+{plan_feedback}
+
+Please update the improvement plan based on this additional feedback."""
+                    print("\n🔄 Manager will refine the improvement plan...")
+
+            except Exception as e:
+                print(f"\n❌ Error creating improvement plan: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                if not approver.confirm("\nRetry improvement planning? (y/n): "):
+                    break
+
+        if not improvement_plan_approved:
+            print("\n⚠ Could not finalize improvement plan.")
+            if not approver.confirm("\nSkip this iteration? (y/n): "):
+                break
+            continue
+
+        # Update feedback file
+        feedback_file.write_text(f"""# User Feedback - Iteration {feedback_iteration}
+
+## Requested Changes:
+{user_feedback}
+
+## Status: ✅ Improvement plan created
+
+See IMPROVEMENT_PLAN_{feedback_iteration}.md for details.
+""", encoding='utf-8')
+
+        if cancelled():
+            return "cancelled"
+
+        # Later steps only get the parts of earlier outputs that relate to this change
+        change_query = user_feedback
+        if improvement_plan_task is not None and improvement_plan_task.output:
+            change_query += "\n" + improvement_plan_task.output.raw
+
+        # =====================================================================
+        # STEP 2: DEVELOPER IMPLEMENTS CHANGES
+        # =====================================================================
+        print("\n" + "=" * 80)
+        print("💻 STEP 2: DEVELOPER IMPLEMENTING CHANGES")
+        print("=" * 80)
+        enter_phase("STEP 2: IMPLEMENTATION", depth=2)
+
+        if resuming and checkpoints.latest('feedback_development', feedback_iteration):
+            print_skipped("STEP 2")
+        else:
+            try:
+                print("\n🔨 Implementing improvements based on Manager's plan...")
+                before = checkpoints.snapshot()
+
+                # Developer implements with improvement plan context
+                development_task = create_development_task(
+                    developer,
+                    str(project_dir),
+                    str(project_type),
+                    context_tasks=compactor.compact(
+                        'developer', [planning_task, improvement_plan_task], change_query
+                    )
+                )
+
+                development_crew = Crew(
+                    agents=[developer],
+                    tasks=[development_task],
+                    process=Process.sequential,
+                    verbose=True
+                )
+
+                dev_result = await traced_kickoff(development_crew, "development")
+                print("\n✅ Code changes implemented!")
+                checkpoints.record('feedback_development', str(dev_result), before,
+                                   iteration=feedback_iteration)
+
+            except Exception as e:
+                print(f"\n❌ Error during development: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                if not approver.confirm("\nRetry this iteration? (y/n): "):
+                    continue
+
+        if cancelled():
+            return "cancelled"
+
+        # =====================================================================
+        # STEP 3: TESTER VALIDATES CHANGES
+        # =====================================================================
+        print("\n" + "=" * 80)
+        print("🧪 STEP 3: TESTER VALIDATING CHANGES")
+        print("=" * 80)
+        enter_phase("STEP 3: TESTING", depth=2)
+
+        if resuming and checkpoints.latest('feedback_testing', feedback_iteration):
+            print_skipped("STEP 3")
+        else:
+            before = checkpoints.snapshot()
+            try:
+                print("\n🔍 Testing improvements based on Manager's requirements...")
+
+                precheck_task = create_precheck_task(await run_prechecks(project_dir))
+                testing_task = create_testing_task(
+                    tester,
+                    str(project_dir),
+                    str(project_type),
+                    context_tasks=compactor.compact(
+                        'tester', [planning_task, improvement_plan_task, development_task, precheck_task], change_query
+                    )
+                )
+
+                testing_crew = Crew(
+                    agents=[tester],
+                    tasks=[testing_task],
+                    process=Process.sequential,
+                    verbose=True
+                )
+
+                test_result = await traced_kickoff(testing_crew, "testing")
+                print("\n✅ Testing complete!")
+                checkpoints.record('feedback_testing', str(test_result), before,
+                                   iteration=feedback_iteration)
+
+            except Exception as e:
+                print(f"\n❌ Error during testing: {str(e)}")
+                print("⚠ Continuing to deployment...")
+                import traceback
+                traceback.print_exc()
+                checkpoints.record('feedback_testing', "", before, iteration=feedback_iteration,
+                                   status="failed", error=str(e))
+
+        if cancelled():
+            return "cancelled"
+
+        # =====================================================================
+        # STEP 4: GITHUB MANAGER DEPLOYS UPDATES
+        # =====================================================================
+        print("\n" + "=" * 80)
+        print("🚀 STEP 4: DEPLOYING UPDATES TO GITHUB")
+        print("=" * 80)
+        enter_phase("STEP 4: DEPLOYMENT", depth=2)
+
+        before = checkpoints.snapshot()
+        try:
+            for line in await prepare_deployment(project_dir, repo_name, project_description):
+                print(line)
+
+            github_task = create_github_deployment_task(
+                agent=github_manager,
+                project_dir=str(project_dir),
+                repo_name=repo_name,
+                github_username=github_username,
+                context_tasks=compactor.compact(
+                    'github', [planning_task, improvement_plan_task, development_task, testing_task], change_query
+                )
+            )
+
+            github_crew = Crew(
+                agents=[github_manager],
+                tasks=[github_task],
+                process=Process.sequential,
+                verbose=True
+            )
+
+            print("\n📤 Deploying improvements to GitHub...")
+            github_result = await traced_kickoff(github_crew, "deployment")
+            print("\n✅ Deployment complete!")
+            print(f"🔗 View updates: https://github.com/{github_username}/{repo_name}")
+            checkpoints.record('feedback_deployment', str(github_result), before,
+                               iteration=feedback_iteration)
+
+        except Exception as e:
+            print(f"\n❌ Error during deployment: {str(e)}")
+            print(f"📁 Changes available locally at: {project_dir}")
+            import traceback
+            traceback.print_exc()
+            checkpoints.record('feedback_deployment', "", before, iteration=feedback_iteration,
+                               status="failed", error=str(e))
+
+        # Update feedback file with completion status
+        feedback_file.write_text(f"""# User Feedback - Iteration {feedback_iteration}
+
+## Requested Changes:
+{user_feedback}
+
+## Manager's Improvement Plan:
+See IMPROVEMENT_PLAN_{feedback_iteration}.md
+
+## Status: ✅ Implemented and Deployed
+
+Changes have been:
+1. ✅ Analyzed by Manager Agent
+2. ✅ Implemented by Developer Agent
+3. ✅ Tested by Tester Agent
+4. ✅ Deployed to GitHub
+
+View at: https://github.com/{github_username}/{repo_name}
+""", encoding='utf-8')
+
+        print("\n✅ Iteration {feedback_iteration} complete!".format(feedback_iteration=feedback_iteration))
+        print(f"🔗 Updated project: https://github.com/{github_username}/{repo_name}")
+
+        # Display updated summary
+        display_project_summary(project_dir)
+
+        print("\n⏸️  Please review the updated project...")
+        print("     Test the changes and see if they meet your expectations.")
+        approver.pause("\nPress Enter when ready to continue...\n")
+
+    # =========================================================================
+    # FINAL SUMMARY
+    # =========================================================================
+    print("\n" + "=" * 80)
+    print("✅ PROJECT GENERATION COMPLETE!")
+    print("=" * 80)
+
+    print(f"\n📊 Final Statistics:")
+    print(f"  - Planning Iterations: {planning_iteration}")
+    print(f"  - Feedback Iterations: {feedback_iteration}")
+    print(f"  - Project Type: {project_type}")
+    print(f"  - Repository: {repo_name}")
+
+    total_files = sum(1 for _, entry in get_workspace_index(project_dir).list(project_dir) if not entry.is_dir)
+    print(f"  - Total Files: {total_files}")
+
+    cache = get_response_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"  - LLM Cache: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} entries)")
+    for model, stats in routing_stats().items():
+        if stats['calls'] or stats['failures']:
+            print(f"  - Model {model}: {stats['calls']} calls, {stats['failures']} failures, "
+                  f"{stats['avg_latency']:.1f}s avg latency")
+    for model, stats in rate_limit_stats().items():
+        if stats['rate_limited'] or stats['total_wait'] >= 1:
+            print(f"  - Rate Limiter {model}: {stats['rate_limited']} 429s, "
+                  f"{stats['total_wait']:.0f}s queued, peak queue {stats['max_queue']}")
+    if compactor.tokens_saved:
+        print(f"  - Context Compaction: {compactor.tokens_saved:,} tokens saved "
+              f"({compactor.tokens_before:,} → {compactor.tokens_after:,})")
+
+    print(f"\n📍 Project Locations:")
+    print(f"  🔗 GitHub: https://github.com/{github_username}/{repo_name}")
+    print(f"  📁 Local: {project_dir}")
+
+    print("\n📚 Documentation Generated:")
+    key_files = ['README.md', 'TEST_REPORT.md', 'TECHNICAL_PLAN.md']
+    for i in range(1, feedback_iteration + 1):
+        key_files.append(f'IMPROVEMENT_PLAN_{i}.md')
+        key_files.append(f'USER_FEEDBACK_{i}.md')
+
+    for filename in key_files:
+        file_path = project_dir / filename
+        if file_path.exists():
+            print(f"  ✓ {filename}")
+
+    print("\n🚀 Next Steps:")
+    print(f"  1. Clone: git clone https://github.com/{github_username}/{repo_name}.git")
+    print("  2. Follow the README.md for setup")
+    print("  3. Run tests to verify everything works")
+    print("  4. Start using your project!")
+
+    print("\n" + "=" * 80)
+    print("🎉 Thank you for using Developer AI Agent System!")
+    print("=" * 80)
+
+    return "completed"
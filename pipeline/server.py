@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import signal
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Any, Dict, Optional, Tuple
+
+# Import job queue
+from pipeline.jobs import JobQueue, FINISHED_STATES
+
+# Import config
+from config import (
+    OUTPUT_DIR, GITHUB_USERNAME,
+    JOB_SERVER_HOST, JOB_SERVER_PORT, JOB_SERVER_WORKERS, JOB_DIR
+)
+
+
+# Seconds an idle worker waits before polling the queue again
+POLL_INTERVAL = 2.0
+
+# Default number of log lines returned by GET /jobs/<id>/log
+LOG_TAIL_LINES = 200
+
+
+def job_queue() -> JobQueue:
+    return JobQueue(JOB_DIR / "jobs.sqlite3")
+
+
+def worker_main(worker_id: str, stop_event) -> None:
+    """
+    Worker process loop: claim jobs fairly from the queue and run each one
+    through the pipeline with this worker's own agent set.
+    """
+    # Imported here so each spawned worker builds its own agents, LLM clients and caches
+    from pipeline.runner import run_project, create_agents, sanitize_repo_name
+    from pipeline.approvals import PolicyApprover
+    from pipeline.checkpoints import CheckpointStore
+
+    # Ctrl+C goes to the whole process group; the server shuts workers down via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    queue = job_queue()
+    log_dir = JOB_DIR / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    agents = None
+
+    while not stop_event.is_set():
+        # Jobs that share a project directory never run at the same time
+        job = queue.claim_next(worker_id, project_key=sanitize_repo_name)
+        if job is None:
+            stop_event.wait(POLL_INTERVAL)
+            continue
+
+        if agents is None:
+            agents = create_agents()
+
+        repo_name = sanitize_repo_name(job['name'])
+        log_file = log_dir / f"{job['id']}-{repo_name}.log"
+        queue.set_log(job['id'], str(log_file))
+
+        # A job claimed again after a server restart continues from its checkpoints,
+        # unless another job with the same name has used the project directory since
+        owner_file = JOB_DIR / "projects" / repo_name
+        try:
+            last_job = owner_file.read_text(encoding='utf-8').strip()
+        except OSError:
+            last_job = ""
+        resume = (job['attempts'] > 1 and last_job == str(job['id'])
+                  and CheckpointStore(OUTPUT_DIR / repo_name).exists())
+        owner_file.parent.mkdir(parents=True, exist_ok=True)
+        owner_file.write_text(str(job['id']), encoding='utf-8')
+
+        status, error = "failed", ""
+        stdout, stderr = sys.stdout, sys.stderr
+        with open(log_file, 'a', encoding='utf-8', buffering=1) as log:
+            sys.stdout = sys.stderr = log
+            try:
+                status = run_project(
+                    job['description'],
+                    job['project_type'],
+                    repo_name,
+                    github_username=GITHUB_USERNAME,
+                    resume=resume,
+                    approver=PolicyApprover(job['approval']),
+                    approved_plan=job['plan'],
+                    agents=agents,
+                    should_cancel=lambda: queue.is_cancel_requested(job['id'])
+                ) or "completed"
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                error = str(e)
+            finally:
+                sys.stdout, sys.stderr = stdout, stderr
+
+        queue.finish(job['id'], status, error)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API:
+        POST /jobs                 submit {user, name, description, type, plan, approval}
+        GET  /jobs?user=&status=   list jobs
+        GET  /jobs/<id>            job status
+        GET  /jobs/<id>/log        last lines of the job log (?lines=N)
+        POST /jobs/<id>/cancel     cancel (queued: immediately, running: at next phase)
+        GET  /health               worker and queue counts
+    """
+
+    server_version = "DeveloperAIAgent/1.0"
+
+    @property
+    def queue(self) -> JobQueue:
+        return self.server.queue
+
+    def log_message(self, format: str, *args: Any) -> None:
+        print(f"🌐 {self.address_string()} {format % args}")
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Optional[Dict[str, Any]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _route(self) -> Tuple[list, Dict[str, list]]:
+        url = urlparse(self.path)
+        return [part for part in url.path.split('/') if part], parse_qs(url.query)
+
+    def _job_or_404(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.queue.get(int(job_id)) if job_id.isdigit() else None
+        if job is None:
+            self._send(404, {'error': f"Job not found: {job_id}"})
+        return job
+
+    def do_GET(self) -> None:
+        parts, query = self._route()
+
+        if parts == ['health']:
+            self._send(200, {
+                'workers': sum(1 for w in self.server.workers if w.is_alive()),
+                'jobs': self.queue.counts()
+            })
+        elif parts == ['jobs']:
+            self._send(200, self.queue.list(
+                user=query.get('user', [None])[0],
+                status=query.get('status', [None])[0]
+            ))
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self._job_or_404(parts[1])
+            if job:
+                self._send(200, job)
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'log':
+            job = self._job_or_404(parts[1])
+            if job:
+                lines = int(query.get('lines', [LOG_TAIL_LINES])[0])
+                log = ""
+                if job['log']:
+                    try:
+                        with open(job['log'], 'r', encoding='utf-8', errors='replace') as f:
+                            log = "".join(f.readlines()[-lines:])
+                    except OSError:
+                        pass
+                self._send(200, {'id': job['id'], 'status': job['status'], 'log': log})
+        else:
+            self._send(404, {'error': f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        parts, _ = self._route()
+
+        if parts == ['jobs']:
+            data = self._read_json()
+            if data is None:
+                self._send(400, {'error': "Request body must be a JSON object"})
+                return
+            user = data.get('user') or self.headers.get('X-User')
+            if not user or not data.get('description'):
+                self._send(400, {'error': "'user' (or X-User header) and 'description' are required"})
+                return
+            job = self.queue.submit(
+                user=user,
+                name=data.get('name') or "ai-generated-project",
+                description=data['description'],
+                project_type=data.get('type', 'python'),
+                plan=data.get('plan'),
+                approval=data.get('approval')
+            )
+            self._send(201, job)
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+            job = self._job_or_404(parts[1])
+            if not job:
+                return
+            if job['status'] in FINISHED_STATES:
+                self._send(409, {'error': f"Job already {job['status']}", 'job': job})
+                return
+            self._send(200, self.queue.cancel(job['id']))
+        else:
+            self._send(404, {'error': f"Unknown endpoint: {self.path}"})
+
+
+def serve(host: str = JOB_SERVER_HOST, port: int = JOB_SERVER_PORT,
+          workers: int = JOB_SERVER_WORKERS) -> None:
+    """
+    Run the job server until interrupted.
+
+    Starts `workers` spawned worker processes (each owns one agent set and runs
+    one job at a time) and serves the JSON API on host:port.
+    """
+    queue = job_queue()
+    requeued = queue.requeue_running()
+    if requeued:
+        print(f"🔁 Requeued {requeued} jobs interrupted by the last shutdown")
+
+    # Workers inherit the environment: they all draw from one rate-limit bucket per model
+    os.environ.setdefault("LLM_RATE_LIMIT_DB", str(JOB_DIR / "ratelimit.sqlite3"))
+
+    context = multiprocessing.get_context('spawn')
+    stop_event = context.Event()
+    processes = []
+    for index in range(max(1, workers)):
+        process = context.Process(target=worker_main, args=(f"worker-{index + 1}", stop_event),
+                                  name=f"job-worker-{index + 1}", daemon=True)
+        process.start()
+        processes.append(process)
+
+    httpd = ThreadingHTTPServer((host, port), JobRequestHandler)
+    httpd.queue = queue
+    httpd.workers = processes
+
+    print(f"\n🚀 Job server listening on http://{host}:{port} ({len(processes)} workers)")
+    print(f"📄 Queue: {queue.path}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down (running jobs are requeued and resume from their checkpoints on next start)...")
+    finally:
+        httpd.server_close()
+        stop_event.set()
+        deadline = time.time() + 5
+        for process in processes:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
@@ -24,6 +24,11 @@ def create_development_task(agent, project_dir: str, project_type: str, context_
                     - {project_dir}/tests/test_main.py
                     - {project_dir}/.gitignore
 
+                    Create files in batches with the "Write multiple files" tool (one call can hold
+                    a whole directory or the entire scaffold) rather than one "Write content to a file" call per file.
+                    To change a file that already exists, use the "Apply patch" tool with only the
+                    changed hunks (unified diff or SEARCH/REPLACE blocks) instead of rewriting the whole file.
+
                     based on the project directory given implement the project as the directory has been already created.
 
                     ═══════════════════════════════════════════════════════════════════════════════
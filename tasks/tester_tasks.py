@@ -16,7 +16,8 @@ def create_testing_task(agent, project_dir: str, project_type: str, context_task
          1. Review ALL source code files for quality and correctness:
             
             Syntax & Compilation:
-            □ Check for syntax errors using language-specific validators
+            □ Check for syntax errors in all files with one "Validate project syntax" call
+              ("Validate code syntax" is for re-checking a single file after a fix)
             □ Verify code compiles/transpiles without errors
             □ Ensure all imports/includes are valid and available
             □ Check for undefined variables or functions
@@ -498,8 +499,9 @@ def create_testing_task(agent, project_dir: str, project_type: str, context_task
          ═══════════════════════════════════════════════════════════════════════════════
 
          Required Tools:
+         □ Toolchain List: List available toolchains (skip checks whose tools are not installed)
          □ File Reader: Read all source code files
-         □ Syntax Validator: Validate code syntax for each language
+         □ Syntax Validator: Validate project syntax (all files and languages in one call)
          □ Test Generator: Create comprehensive test files
          □ Test Runner: Execute test suites
          □ Code Formatter: Format code (Black, Prettier, etc.)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the project's top-level modules (config, tools, llm) like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,131 @@
+"""apply_patch: hunks apply, a failed hunk changes nothing, a patch is not applied twice"""
+import pytest
+
+from tools import file_operations
+from tools.file_operations import apply_patch
+
+
+ORIGINAL = "def f():\n    return 1\n\n\ndef g():\n    return 2\n"
+
+PATCH = """--- a/app.py
++++ b/app.py
+@@ -1,2 +1,2 @@
+ def f():
+-    return 1
++    return 10
+@@ -5,2 +5,2 @@
+ def g():
+-    return 2
++    return 20
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "app.py").write_text(ORIGINAL)
+    (tmp_path / "other.py").write_text("x = 1\n")
+    return tmp_path
+
+
+def test_applies_unified_diff(project):
+    result = apply_patch.func(PATCH, str(project))
+    assert result.startswith("✓ Applied 2 hunks to 1 files")
+    assert (project / "app.py").read_text() == "def f():\n    return 10\n\n\ndef g():\n    return 20\n"
+
+
+def test_applies_hunk_at_offset(project):
+    (project / "app.py").write_text("import os\n\n" + ORIGINAL)
+    result = apply_patch.func(PATCH, str(project))
+    assert result.startswith("✓"), result
+    assert "offset +2" in result
+    assert (project / "app.py").read_text().endswith("def g():\n    return 20\n")
+
+
+def test_search_replace_blocks(project):
+    patch = "other.py\n<<<<<<< SEARCH\nx = 1\n=======\nx = 2\n>>>>>>> REPLACE\n"
+    assert apply_patch.func(patch, str(project)).startswith("✓")
+    assert (project / "other.py").read_text() == "x = 2\n"
+
+
+def test_failed_hunk_changes_no_file(project):
+    patch = """--- a/other.py
++++ b/other.py
+@@ -1 +1 @@
+-x = 1
++x = 2
+--- a/app.py
++++ b/app.py
+@@ -5,2 +5,2 @@
+ def missing():
+-    return 99
++    return 3
+"""
+    result = apply_patch.func(patch, str(project))
+    assert result.startswith("✗ Patch not applied (1 of 2 hunks")
+    assert "app.py hunk 1: context not found" in result
+    assert (project / "other.py").read_text() == "x = 1\n"
+    assert (project / "app.py").read_text() == ORIGINAL
+
+
+def test_failed_write_restores_written_files(project, monkeypatch):
+    patch = PATCH + """--- a/other.py
++++ b/other.py
+@@ -1 +1 @@
+-x = 1
++x = 2
+"""
+    real_write = file_operations.atomic_write
+    writes = []
+
+    def failing_write(path, text, *args, **kwargs):
+        writes.append(path)
+        if len(writes) == 2:
+            raise OSError("disk full")
+        return real_write(path, text, *args, **kwargs)
+
+    monkeypatch.setattr(file_operations, "atomic_write", failing_write)
+    result = apply_patch.func(patch, str(project))
+    assert result.startswith("✗ Error applying patch: disk full")
+    assert (project / "app.py").read_text() == ORIGINAL
+    assert (project / "other.py").read_text() == "x = 1\n"
+
+
+def test_reapplying_patch_is_refused(project):
+    assert apply_patch.func(PATCH, str(project)).startswith("✓")
+    patched = (project / "app.py").read_text()
+    result = apply_patch.func(PATCH, str(project))
+    assert result.startswith("✗ Patch not applied")
+    assert (project / "app.py").read_text() == patched
+
+
+def test_creates_and_deletes_files(project):
+    patch = """--- /dev/null
++++ b/new.py
+@@ -0,0 +1 @@
++y = 1
+--- a/other.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+"""
+    assert apply_patch.func(patch, str(project)).startswith("✓")
+    assert (project / "new.py").read_text() == "y = 1\n"
+    assert not (project / "other.py").exists()
+
+
+def test_only_newlines_split_lines(project):
+    # str.splitlines() would also break on the form feed and U+2028 and rewrite them as newlines
+    original = "# page\x0cbreak\nx = 1\ny\u2028z = 2\n"
+    (project / "other.py").write_bytes(original.encode())
+    patch = "--- a/other.py\n+++ b/other.py\n@@ -2 +2 @@\n-x = 1\n+x = 3\n"
+    result = apply_patch.func(patch, str(project))
+    assert result.startswith("✓"), result
+    assert "#1 line 2" in result and "offset" not in result
+    assert (project / "other.py").read_bytes().decode() == original.replace("x = 1", "x = 3")
+
+
+def test_crlf_file_keeps_its_newlines(project):
+    (project / "other.py").write_bytes(b"a = 1\r\nb = 2\r\nc = 3")
+    patch = "--- a/other.py\r\n+++ b/other.py\r\n@@ -2 +2 @@\r\n-b = 2\r\n+b = 20\r\n"
+    assert apply_patch.func(patch, str(project)).startswith("✓")
+    assert (project / "other.py").read_bytes() == b"a = 1\r\nb = 20\r\nc = 3"
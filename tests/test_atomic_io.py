@@ -0,0 +1,80 @@
+"""atomic_write: links, permissions and backups"""
+import os
+import stat
+
+import pytest
+
+from tools.atomic_io import atomic_write, new_file_mode, snapshot
+from tools.file_operations import write_file
+
+
+posix_only = pytest.mark.skipif(os.name != 'posix', reason="POSIX links and modes")
+
+
+def test_replaces_content(tmp_path):
+    path = tmp_path / "a.txt"
+    assert atomic_write(path, "one") == 3
+    assert atomic_write(path, b"two!") == 4
+    assert path.read_text() == "two!"
+    assert [p.name for p in tmp_path.iterdir()] == ["a.txt"]
+
+
+@posix_only
+def test_new_file_mode_follows_umask(tmp_path):
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert new_file_mode() == 0o666 & ~umask
+    atomic_write(tmp_path / "new.txt", "x")
+    assert stat.S_IMODE(os.stat(tmp_path / "new.txt").st_mode) == new_file_mode()
+
+
+@posix_only
+def test_existing_file_keeps_mode(tmp_path):
+    path = tmp_path / "run.sh"
+    path.write_text("echo 1\n")
+    os.chmod(path, 0o751)
+    atomic_write(path, "echo 2\n")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o751
+
+
+@posix_only
+def test_symlink_is_kept_and_target_written(tmp_path):
+    target = tmp_path / "real.txt"
+    target.write_text("old")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+    atomic_write(link, "new")
+    assert link.is_symlink()
+    assert target.read_text() == "new"
+
+
+@posix_only
+def test_hardlinks_see_the_write(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+    other = tmp_path / "b.txt"
+    os.link(path, other)
+    atomic_write(path, "new")
+    assert other.read_text() == "new"
+    assert os.stat(path).st_ino == os.stat(other).st_ino
+
+
+@posix_only
+def test_hardlink_backup_keeps_old_content(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+    result = write_file.func(str(path), "new", create_backup=True)
+    assert result.startswith("✓")
+    assert path.read_text() == "new"
+    assert (tmp_path / "a.txt.backup").read_text() == "old"
+
+
+@posix_only
+def test_snapshot_of_linked_file_is_a_copy(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+    os.link(path, tmp_path / "b.txt")
+    assert snapshot(path, tmp_path / "a.bak") in ('reflink', 'copy')
+    atomic_write(path, "new")
+    assert (tmp_path / "a.bak").read_text() == "old"
+    assert (tmp_path / "b.txt").read_text() == "new"
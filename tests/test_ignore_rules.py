@@ -0,0 +1,85 @@
+"""gitignore rules: anchored, negated, '**' and directory-only patterns"""
+import os
+
+import pytest
+
+from tools.ignore_rules import GitIgnore, _translate, is_ignored
+
+
+def ignored(rules: str, path: str, is_dir: bool = False):
+    return GitIgnore(rules).match(path, is_dir)
+
+
+@pytest.mark.parametrize("pattern, regex", [
+    ("*.py", r"[^/]*\.py"),
+    ("a?c", r"a[^/]c"),
+    ("**/build", r"(?:.*/)?build"),
+    ("logs/**", r"logs/.*"),
+    ("[!a]x", r"[^a]x"),
+])
+def test_translate(pattern, regex):
+    assert _translate(pattern) == regex
+
+
+def test_unanchored_pattern_matches_at_any_depth():
+    assert ignored("*.log", "debug.log") is True
+    assert ignored("*.log", "src/deep/debug.log") is True
+    assert ignored("*.log", "debug.log.txt") is None
+
+
+def test_wildcards_stop_at_slash():
+    assert ignored("src/*.py", "src/app.py") is True
+    assert ignored("src/*.py", "src/pkg/app.py") is None
+
+
+def test_anchored_pattern_matches_only_at_root():
+    assert ignored("/build", "build", is_dir=True) is True
+    assert ignored("/build", "src/build", is_dir=True) is None
+    # A slash in the middle anchors too
+    assert ignored("docs/out", "docs/out", is_dir=True) is True
+    assert ignored("docs/out", "site/docs/out", is_dir=True) is None
+
+
+def test_negation_reincludes_and_last_rule_wins():
+    rules = "*.log\n!keep.log\n"
+    assert ignored(rules, "debug.log") is True
+    assert ignored(rules, "keep.log") is False
+    assert ignored(rules, "logs/keep.log") is False
+    assert ignored("!keep.log\n*.log\n", "keep.log") is True
+
+
+def test_double_star():
+    assert ignored("**/cache", "cache", is_dir=True) is True
+    assert ignored("**/cache", "a/b/cache", is_dir=True) is True
+    assert ignored("logs/**", "logs/a/b.txt") is True
+    assert ignored("logs/**", "other/logs/a.txt") is None
+    assert ignored("a/**/z", "a/z") is True
+    assert ignored("a/**/z", "a/b/c/z") is True
+
+
+def test_directory_only_rule():
+    assert ignored("build/", "build", is_dir=True) is True
+    assert ignored("build/", "build", is_dir=False) is None
+    assert ignored("build/", "src/build", is_dir=True) is True
+    # Same answers on the per-rule path taken when the file has negations
+    assert ignored("build/\n!x", "build", is_dir=False) is None
+    assert ignored("build/\n!x", "build", is_dir=True) is True
+
+
+def test_comments_blanks_and_escapes():
+    rules = "# comment\n\n\\#literal\n\\!bang\n"
+    assert ignored(rules, "# comment") is None
+    assert ignored(rules, "#literal") is True
+    assert ignored(rules, "!bang") is True
+
+
+def test_nested_gitignore_overrides_outer_rules():
+    rules = (("", GitIgnore("*.txt\n")), ("docs", GitIgnore("!notes.txt\n")))
+    assert is_ignored(rules, "readme.txt", "readme.txt", False) is True
+    assert is_ignored(rules, os.path.join("docs", "notes.txt"), "notes.txt", False) is False
+    assert is_ignored(rules, os.path.join("docs", "other.txt"), "other.txt", False) is True
+
+
+def test_heavy_dirs_always_ignored():
+    assert is_ignored((), "node_modules", "node_modules", True) is True
+    assert is_ignored((), "node_modules", "node_modules", False) is False
@@ -0,0 +1,38 @@
+"""OutputBuffer: bounded head and tail, cut at whole UTF-8 characters"""
+import pytest
+
+from tools.process_runner import OutputBuffer
+
+
+TEXT = "é€😀" * 50
+
+
+def test_short_output_is_kept_whole():
+    buffer = OutputBuffer(100, 100)
+    buffer.feed("ok é\r\n".encode())
+    assert buffer.text() == "ok é\n"
+    assert buffer.omitted == 0
+
+
+def test_head_and_tail_with_marker():
+    buffer = OutputBuffer(10, 10)
+    for piece in (b"0123456789", b"abcdefghij", b"KLMNOPQRST", b"uvw"):
+        buffer.feed(piece)
+    assert buffer.omitted == 13
+    assert buffer.text() == "0123456789\n... [13 bytes omitted] ...\nNOPQRSTuvw"
+
+
+@pytest.mark.parametrize("head_bytes, tail_bytes", [(h, t) for h in range(1, 9) for t in range(1, 9)])
+def test_cut_never_splits_a_character(head_bytes, tail_bytes):
+    buffer = OutputBuffer(head_bytes, tail_bytes)
+    data = TEXT.encode()
+    for start in range(0, len(data), 7):
+        buffer.feed(data[start:start + 7])
+    text = buffer.text()
+    assert '�' not in text
+    head, _, rest = text.partition("\n... [")
+    omitted, _, tail = rest.partition(" bytes omitted] ...\n")
+    omitted = int(omitted.replace(",", ""))
+    assert TEXT.startswith(head) and TEXT.endswith(tail)
+    # Bytes of the dropped partial characters are counted as omitted
+    assert len(head.encode()) + omitted + len(tail.encode()) == len(data)
@@ -0,0 +1,147 @@
+"""RateLimiter: priority ordering, 429 backoff and the bucket shared between processes"""
+import threading
+import time
+from types import SimpleNamespace
+
+from llm.ratelimit import (
+    BACKOFF_FACTOR, RECOVERY_STEP, RateLimiter, SharedBucketStore, parse_duration, retry_after_from_error
+)
+
+
+def rate_limit_error(**headers):
+    error = Exception("429 Too Many Requests")
+    error.response = SimpleNamespace(headers=headers)
+    return error
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_waiting_calls_start_by_priority():
+    limiter = RateLimiter("test", rpm=0, tpm=0, max_concurrent=1)
+    limiter.acquire(10)
+    order = []
+
+    def call(priority):
+        limiter.acquire(10, priority)
+        order.append(priority)
+        limiter.release(10)
+
+    threads = []
+    for priority in (3, 1, 2, 0):
+        thread = threading.Thread(target=call, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: limiter.stats()['queued'] == len(threads))
+    limiter.release(10)
+    for thread in threads:
+        thread.join(5)
+    assert order == [0, 1, 2, 3]
+    assert limiter.stats()['max_queue'] == 4
+
+
+def test_concurrency_cap():
+    limiter = RateLimiter("test", rpm=0, tpm=0, max_concurrent=2)
+    limiter.acquire(1)
+    limiter.acquire(1)
+    started = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(1), started.set()))
+    thread.start()
+    assert not started.wait(0.2)
+    limiter.release(1)
+    assert started.wait(5)
+    thread.join(5)
+
+
+def test_request_bucket_refills_over_time():
+    limiter = RateLimiter("test", rpm=600, tpm=0, max_concurrent=0)
+    for _ in range(600):
+        assert limiter.acquire(1) < 0.05
+        limiter.release(1)
+    # 600 per minute refills one request every 0.1 s
+    waited = limiter.acquire(1)
+    assert 0.05 < waited < 1.0
+
+
+def test_backoff_uses_retry_after_header():
+    limiter = RateLimiter("test", rpm=0, tpm=0, max_concurrent=0)
+    assert limiter.backoff(rate_limit_error(**{'retry-after': '0.3'})) == 0.3
+    assert limiter.rate_factor == BACKOFF_FACTOR
+    assert limiter.is_saturated()
+    assert limiter.acquire(1) >= 0.25
+    limiter.release(1)
+    assert limiter.rate_factor == BACKOFF_FACTOR + RECOVERY_STEP
+    assert not limiter.is_saturated()
+
+
+def test_backoff_without_headers_is_exponential():
+    limiter = RateLimiter("test", rpm=0, tpm=0, max_concurrent=0)
+    assert limiter.backoff(Exception("429")) == 2.0
+    assert limiter.backoff(Exception("429")) == 4.0
+    assert limiter.stats()['rate_limited'] == 2
+    # A successful call resets the sequence
+    limiter.paused_until = 0.0
+    limiter.acquire(1)
+    limiter.release(1)
+    assert limiter.backoff(Exception("429")) == 2.0
+
+
+def test_rate_limit_headers():
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("250ms") == 0.25
+    assert retry_after_from_error(rate_limit_error(**{'retry-after-ms': '1500'})) == 1.5
+    error = rate_limit_error(**{'x-ratelimit-remaining-tokens': '0', 'x-ratelimit-reset-tokens': '2s',
+                                'x-ratelimit-remaining-requests': '10', 'x-ratelimit-reset-requests': '9s'})
+    assert retry_after_from_error(error) == 2.0
+    wrapped = RuntimeError("call failed")
+    wrapped.__cause__ = rate_limit_error(**{'retry-after': '3'})
+    assert retry_after_from_error(wrapped) == 3.0
+
+
+def test_shared_store_shares_bucket_and_pause(tmp_path):
+    # Two limiters on one file behave like the limiters of two worker processes
+    path = tmp_path / "ratelimit.sqlite3"
+    first = RateLimiter("model", rpm=0, tpm=600, max_concurrent=0, shared=SharedBucketStore(path))
+    second = RateLimiter("model", rpm=0, tpm=600, max_concurrent=0, shared=SharedBucketStore(path))
+    other = RateLimiter("other", rpm=0, tpm=600, max_concurrent=0, shared=SharedBucketStore(path))
+
+    first.acquire(600)
+    first.release(600)
+    # The first limiter emptied the shared bucket: 5 tokens refill in 0.5 s
+    assert second.acquire(5) >= 0.3
+    second.release(5)
+    assert other.acquire(5) < 0.2
+    other.release(5)
+
+    first.backoff(rate_limit_error(**{'retry-after': '5'}))
+    assert second.is_saturated()
+    assert second.rate_factor == BACKOFF_FACTOR
+    assert not other.is_saturated()
+
+
+def test_shared_store_serves_several_models_from_threads(tmp_path):
+    store = SharedBucketStore(tmp_path / "ratelimit.sqlite3")
+    limiters = [RateLimiter(name, rpm=0, tpm=0, max_concurrent=2, shared=store) for name in ("a", "b")]
+    errors = []
+
+    def calls(limiter):
+        try:
+            for _ in range(50):
+                limiter.acquire(1)
+                limiter.is_saturated()
+                limiter.release(1)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=calls, args=(limiters[index % 2],)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert errors == []
+    assert [limiter.stats()['active'] for limiter in limiters] == [0, 0]
+    assert sum(limiter.stats()['calls'] for limiter in limiters) == 200
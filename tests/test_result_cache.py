@@ -0,0 +1,79 @@
+"""lint_files / format_files: per-file caching and bounded command lines"""
+import sys
+
+import pytest
+
+from tools import result_cache
+from tools.result_cache import ARGUMENT_CHUNK_FILES, ResultCache, argument_chunks, format_files, lint_files
+
+
+# Prints "<file>:1:1: E999 bad" for every file argument containing "bad", and logs its argument count
+# (results are cached by content, so every file gets distinct content)
+LINTER = """import sys
+with open(sys.argv[1], 'a') as log:
+    log.write(f"{len(sys.argv) - 2}\\n")
+bad = [name for name in sys.argv[2:] if 'bad' in open(name).read()]
+for name in bad:
+    print(f"{name}:1:1: E999 bad")
+sys.exit(1 if bad else 0)
+"""
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "_cache", ResultCache(tmp_path / "cache", 100000))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    (tmp_path / "linter.py").write_text(LINTER)
+    return root
+
+
+def invocations(tmp_path):
+    return [int(line) for line in (tmp_path / "calls.log").read_text().split()]
+
+
+def test_argument_chunks_bound_count_and_bytes():
+    paths = [f"p{i}" for i in range(ARGUMENT_CHUNK_FILES * 2 + 1)]
+    chunks = list(argument_chunks(paths, {path: path for path in paths}))
+    assert [len(chunk) for chunk in chunks] == [ARGUMENT_CHUNK_FILES, ARGUMENT_CHUNK_FILES, 1]
+    long = {path: "x" * 10000 for path in paths[:5]}
+    assert [len(chunk) for chunk in argument_chunks(paths[:5], long)] == [2, 2, 1]
+
+
+def test_lint_files_chunks_and_caches(tmp_path, project, cache):
+    paths = []
+    for index in range(450):
+        path = project / f"module_{index}.py"
+        path.write_text(f"{'bad' if index % 100 == 0 else 'ok'} {index}\n")
+        paths.append(str(path))
+    command = [sys.executable, str(tmp_path / "linter.py"), str(tmp_path / "calls.log")]
+
+    run = lint_files(command, paths, project)
+    assert invocations(tmp_path) == [200, 200, 50]
+    assert (run.problems, run.cached, run.failed) == (5, 0, False)
+    assert "module_100.py:1:1: E999 bad" in run.output
+
+    (project / "module_1.py").write_text("bad 1\n")
+    run = lint_files(command, paths, project)
+    assert invocations(tmp_path)[3:] == [1]
+    assert (run.problems, run.cached) == (6, 449)
+
+
+def test_format_files_records_only_successful_chunks(tmp_path, project, cache):
+    paths = []
+    for index in range(250):
+        path = project / f"module_{index}.py"
+        path.write_text(f"{'bad' if index == 220 else 'ok'} {index}\n")
+        paths.append(str(path))
+    command = [sys.executable, str(tmp_path / "linter.py"), str(tmp_path / "calls.log")]
+
+    run = format_files(command, paths, project)
+    assert invocations(tmp_path) == [200, 50]
+    assert (run.problems, run.failed) == (50, True)
+    run = format_files(command, paths, project)
+    assert invocations(tmp_path)[2:] == [50]
+    assert run.cached == 200
@@ -0,0 +1,42 @@
+"""Workspace index: ranged reads follow files rewritten behind the cache"""
+from tools import workspace_index
+from tools.file_operations import read_file
+from tools.workspace_index import get_workspace_index
+
+
+NEW_TEXT = "import os\nx = 1\ny = 2\nz = 3\nw = 4\n"
+
+
+def test_read_lines_after_external_rewrite(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("a\nb\n")
+    entry = get_workspace_index(path).get(path)
+    assert entry.read_lines() == ("a\nb\n", 2)
+
+    path.write_text(NEW_TEXT)
+    assert entry.read_lines(2, 2) == ("x = 1\ny = 2\n", 2)
+    assert entry.line_count == 5
+    assert entry.size == len(NEW_TEXT)
+
+
+def test_read_file_after_external_rewrite(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("a\nb\n")
+    assert read_file.func(str(path)).endswith("a\nb\n")
+
+    path.write_text(NEW_TEXT)
+    output = read_file.func(str(path))
+    assert f"Size: {len(NEW_TEXT):.2f} B | Lines: 5" in output
+    assert output.endswith(NEW_TEXT)
+
+
+def test_get_restats_while_watched(tmp_path, monkeypatch):
+    # Watcher events arrive asynchronously: a lookup for reading must not wait for them
+    monkeypatch.setattr(workspace_index, "is_watched", lambda *args, **kwargs: True)
+    path = tmp_path / "a.py"
+    path.write_text("a\nb\n")
+    index = get_workspace_index(path)
+    assert index.get(path).size == 4
+
+    path.write_text(NEW_TEXT)
+    assert index.get(path).size == len(NEW_TEXT)
@@ -1,14 +1,19 @@
 """Tools module"""
 from .file_operations import (
     write_file,
+    write_files,
+    apply_patch,
     read_file,
+    read_files,
     create_directory,
     list_directory
 )
 from .code_execution import (
     execute_code,
     validate_syntax,
+    validate_project_syntax,
     install_dependencies,
+    list_toolchains,
     execute_command
 )
 from .github_tools import (
@@ -28,8 +33,8 @@ from .testing_tools import (
 )
 
 __all__ = [
-    'write_file', 'read_file', 'create_directory', 'list_directory',
-    'execute_code', 'validate_syntax', 'install_dependencies', 'execute_command',
+    'write_file', 'write_files', 'apply_patch', 'read_file', 'read_files', 'create_directory', 'list_directory',
+    'execute_code', 'validate_syntax', 'validate_project_syntax', 'install_dependencies', 'list_toolchains', 'execute_command',
     'create_github_repo', 'init_git', 'commit_changes', 'push_to_remote', 'deploy_to_github',
     'run_tests', 'format_code', 'lint_code', 'generate_test_file',
     'clone_repository', 'get_repo_status'
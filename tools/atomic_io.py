@@ -0,0 +1,198 @@
+"""
+Crash-safe file writes shared by the file tools.
+
+Content is written to a temp file in the target's directory and renamed over
+the target, so a crash or timeout leaves either the old or the new file, never
+a truncated one. FILE_FSYNC_POLICY picks the durability (power loss) guarantee:
+
+- none: rename only (fastest; safe against process crashes)
+- file: fsync the temp file before the rename
+- dir:  also fsync the directory after the rename, so the rename itself is durable
+
+A symlink is followed, so the file it points to is replaced and the link
+kept. A file with other hardlinks, or whose owner could not be kept on the new
+file, is written in place instead, so every link keeps seeing the same file.
+Otherwise writes never modify the target's inode, so a backup can be a
+hardlink of the old file; reflinks (copy-on-write clones) are tried first.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+from config import FILE_FSYNC_POLICY
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+FSYNC_POLICIES = ('none', 'file', 'dir')
+
+# ioctl(dest_fd, FICLONE, src_fd) clones a file on btrfs, XFS and other CoW filesystems (Linux)
+FICLONE = 0x40049409
+
+_new_file_mode: Optional[int] = None
+_umask_lock = threading.Lock()
+
+
+def new_file_mode() -> int:
+    """Mode open() would give a new file (mkstemp creates them 0600), read once"""
+    global _new_file_mode
+    if _new_file_mode is None:
+        with _umask_lock:
+            if _new_file_mode is None:
+                umask = None
+                try:
+                    # Linux reports it without changing it
+                    with open('/proc/self/status', 'r') as f:
+                        for line in f:
+                            if line.startswith('Umask:'):
+                                umask = int(line.split()[1], 8)
+                except (OSError, ValueError, IndexError):
+                    pass
+                if umask is None:
+                    umask = os.umask(0o022)
+                    os.umask(umask)
+                _new_file_mode = 0o666 & ~umask
+    return _new_file_mode
+
+
+def _policy(fsync: Optional[str]) -> str:
+    policy = (fsync or FILE_FSYNC_POLICY).lower()
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy '{policy}' (expected one of {', '.join(FSYNC_POLICIES)})")
+    return policy
+
+
+def fsync_directory(directory: Path) -> None:
+    """Make renames in a directory durable (no-op where directories cannot be opened)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_in_place(path: Path, data, encoding: str, newline: Optional[str], policy: str) -> int:
+    """Overwrite the file itself (its inode, so every hardlink sees the new content)"""
+    if isinstance(data, str):
+        f = open(path, 'w', encoding=encoding, newline=newline)
+    else:
+        f = open(path, 'wb')
+    with f:
+        f.write(data)
+        f.flush()
+        if policy != 'none':
+            os.fsync(f.fileno())
+        return os.fstat(f.fileno()).st_size
+
+
+def atomic_write(path: Path, data, encoding: str = 'utf-8', newline: Optional[str] = None,
+                 fsync: Optional[str] = None, sync_directory: bool = True, keep_links: bool = True) -> int:
+    """
+    Replace path with data (str or bytes) via temp file and rename; returns the
+    number of bytes written. An existing file keeps its permissions and owner,
+    symlinks are followed, and a file with other hardlinks is written in place
+    (keep_links=False replaces it anyway, e.g. when a hardlink is a backup).
+
+    sync_directory=False skips the directory fsync of the 'dir' policy, for
+    callers that write many files and call fsync_directories() once at the end.
+    """
+    path = Path(os.path.realpath(path))
+    policy = _policy(fsync)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        stat = None
+    if stat is not None and keep_links and stat.st_nlink > 1:
+        return _write_in_place(path, data, encoding, newline, policy)
+    fd, temp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        if stat is not None and os.name == 'posix' and (stat.st_uid, stat.st_gid) != (os.getuid(), os.getgid()):
+            try:
+                os.chown(temp, stat.st_uid, stat.st_gid)
+            except OSError:
+                # Only the owner's own file can carry its ownership: write that one
+                os.close(fd)
+                os.unlink(temp)
+                return _write_in_place(path, data, encoding, newline, policy)
+        if isinstance(data, str):
+            f = open(fd, 'w', encoding=encoding, newline=newline)
+        else:
+            f = open(fd, 'wb')
+        with f:
+            f.write(data)
+            f.flush()
+            if policy != 'none':
+                os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+        os.chmod(temp, stat.st_mode & 0o7777 if stat is not None else new_file_mode())
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        raise
+    if policy == 'dir' and sync_directory:
+        fsync_directory(path.parent)
+    return size
+
+
+def fsync_directories(paths: Iterable[Path], fsync: Optional[str] = None) -> None:
+    """Directory fsync of the 'dir' policy, once per distinct parent of paths"""
+    if _policy(fsync) != 'dir':
+        return
+    for directory in {Path(path).parent for path in paths}:
+        fsync_directory(directory)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+
+
+def snapshot(path: Path, backup: Path, hardlink: bool = True) -> str:
+    """
+    Preserve the current contents of path at backup; returns the method used
+    ('reflink', 'hardlink' or 'copy'). Only pass hardlink=True when path will
+    be replaced with atomic_write(keep_links=False) after a 'hardlink' backup
+    (an in-place write would change the backup too).
+    """
+    path, backup = Path(path), Path(backup)
+    temp = backup.with_name(f".{backup.name}.tmp")
+    try:
+        os.unlink(temp)
+    except FileNotFoundError:
+        pass
+    if _reflink(path, temp):
+        method = 'reflink'
+    else:
+        method = 'copy'
+        # A file that already has other links is written in place by atomic_write
+        if hardlink and os.stat(path).st_nlink == 1:
+            try:
+                os.link(path, temp)
+                method = 'hardlink'
+            except OSError:
+                pass
+        if method == 'copy':
+            shutil.copy2(path, temp)
+    os.replace(temp, backup)
+    return method
@@ -1,9 +1,18 @@
+import os
+import json
 import subprocess
 import sys
-import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from crewai.tools import tool
+from tracing import traced_tool, traced_run
+from config import SYNTAX_CHECK_WORKERS
+from .workspace_index import get_workspace_index
+from .result_cache import config_hash, format_files, lint_files, run_cached, tool_version
+from .toolchains import get_toolchains, path_state, which
+from .python_pool import project_python, run_python, warm_pool_available
+from .process_runner import run_process
 
 
 # Language configuration mapping
@@ -32,6 +41,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.ts', '.tsx'],
         'run_command': lambda file: ['ts-node', file],
         'syntax_check': lambda file: ['tsc', '--noEmit', file],
+        'batch_syntax_check': lambda files: ['tsc', '--noEmit'] + files,
         'dependency_install': lambda file: ['npm', 'install'],
         'test_command': lambda: ['npm', 'test'],
         'format_command': lambda files: ['prettier', '--write'] + files,
@@ -43,6 +53,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.html', '.htm'],
         'run_command': lambda file: ['open', file] if sys.platform == 'darwin' else ['xdg-open', file] if sys.platform == 'linux' else ['start', file],
         'syntax_check': lambda file: ['html5validator', file],
+        'batch_syntax_check': lambda files: ['html5validator'] + files,
         'format_command': lambda files: ['prettier', '--write'] + files,
         'lint_command': lambda files: ['htmlhint'] + files,
         'build_command': lambda: ['npm', 'run', 'build'] if Path('package.json').exists() else None
@@ -50,6 +61,7 @@ LANGUAGE_CONFIG = {
     'css': {
         'extensions': ['.css', '.scss', '.sass', '.less'],
         'syntax_check': lambda file: ['stylelint', file],
+        'batch_syntax_check': lambda files: ['stylelint'] + files,
         'format_command': lambda files: ['prettier', '--write'] + files,
         'lint_command': lambda files: ['stylelint'] + files,
         'build_command': lambda: ['sass', 'styles.scss', 'styles.css'] if Path('styles.scss').exists() else None
@@ -86,6 +98,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.go'],
         'run_command': lambda file: ['go', 'run', file],
         'syntax_check': lambda file: ['go', 'vet', file],
+        'batch_syntax_check': lambda files: ['go', 'vet', './...'],
         'dependency_install': lambda file: ['go', 'mod', 'download'],
         'test_command': lambda: ['go', 'test', './...', '-v'],
         'format_command': lambda files: ['go', 'fmt'] + files,
@@ -96,6 +109,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.rs'],
         'run_command': lambda file: ['cargo', 'run'],
         'syntax_check': lambda file: ['cargo', 'check'],
+        'batch_syntax_check': lambda files: ['cargo', 'check'],
         'dependency_install': lambda file: ['cargo', 'fetch'],
         'test_command': lambda: ['cargo', 'test'],
         'format_command': lambda files: ['cargo', 'fmt'],
@@ -106,6 +120,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.cs'],
         'run_command': lambda file: ['dotnet', 'run'],
         'syntax_check': lambda file: ['dotnet', 'build', '--no-incremental'],
+        'batch_syntax_check': lambda files: ['dotnet', 'build', '--no-incremental'],
         'dependency_install': lambda file: ['dotnet', 'restore'],
         'test_command': lambda: ['dotnet', 'test'],
         'format_command': lambda files: ['dotnet', 'format'],
@@ -152,6 +167,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.c', '.h'],
         'run_command': lambda file: ['gcc', file, '-o', 'output', '&&', './output'],
         'syntax_check': lambda file: ['gcc', '-fsyntax-only', file],
+        'batch_syntax_check': lambda files: ['gcc', '-fsyntax-only'] + files,
         'format_command': lambda files: ['clang-format', '-i'] + files,
         'lint_command': lambda files: ['clang-tidy'] + files,
         'build_command': lambda: ['make'] if Path('Makefile').exists() else ['cmake', '--build', '.']
@@ -160,6 +176,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.cpp', '.cc', '.cxx', '.hpp', '.hh', '.hxx'],
         'run_command': lambda file: ['g++', file, '-o', 'output', '&&', './output'],
         'syntax_check': lambda file: ['g++', '-fsyntax-only', file],
+        'batch_syntax_check': lambda files: ['g++', '-fsyntax-only'] + files,
         'format_command': lambda files: ['clang-format', '-i'] + files,
         'lint_command': lambda files: ['clang-tidy'] + files,
         'build_command': lambda: ['make'] if Path('Makefile').exists() else ['cmake', '--build', '.']
@@ -175,6 +192,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.scala'],
         'run_command': lambda file: ['scala', file],
         'syntax_check': lambda file: ['scalac', file],
+        'batch_syntax_check': lambda files: ['scalac'] + files,
         'dependency_install': lambda file: ['sbt', 'update'],
         'test_command': lambda: ['sbt', 'test'],
         'build_command': lambda: ['sbt', 'compile']
@@ -183,6 +201,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.dart'],
         'run_command': lambda file: ['dart', 'run', file],
         'syntax_check': lambda file: ['dart', 'analyze', file],
+        'batch_syntax_check': lambda files: ['dart', 'analyze'] + files,
         'dependency_install': lambda file: ['dart', 'pub', 'get'],
         'test_command': lambda: ['dart', 'test'],
         'format_command': lambda files: ['dart', 'format'] + files,
@@ -197,6 +216,7 @@ LANGUAGE_CONFIG = {
     'sql': {
         'extensions': ['.sql'],
         'syntax_check': lambda file: ['sqlfluff', 'lint', file],
+        'batch_syntax_check': lambda files: ['sqlfluff', 'lint'] + files,
         'format_command': lambda files: ['sqlfluff', 'fix'] + files,
         'lint_command': lambda files: ['sqlfluff', 'lint'] + files
     },
@@ -208,12 +228,14 @@ LANGUAGE_CONFIG = {
     'yaml': {
         'extensions': ['.yaml', '.yml'],
         'syntax_check': lambda file: ['yamllint', file],
+        'batch_syntax_check': lambda files: ['yamllint'] + files,
         'format_command': lambda files: ['prettier', '--write'] + files,
         'lint_command': lambda files: ['yamllint'] + files
     },
     'xml': {
         'extensions': ['.xml'],
         'syntax_check': lambda file: ['xmllint', '--noout', file],
+        'batch_syntax_check': lambda files: ['xmllint', '--noout'] + files,
         'format_command': lambda files: ['xmllint', '--format'] + files
     },
     'markdown': {
@@ -225,6 +247,7 @@ LANGUAGE_CONFIG = {
         'extensions': ['.lua'],
         'run_command': lambda file: ['lua', file],
         'syntax_check': lambda file: ['luac', '-p', file],
+        'batch_syntax_check': lambda files: ['luac', '-p'] + files,
         'lint_command': lambda files: ['luacheck'] + files
     },
     'perl': {
@@ -253,20 +276,18 @@ LANGUAGE_CONFIG = {
 
 def detect_language(file_path: str) -> Optional[str]:
     """Detect programming language from file extension"""
-    ext = Path(file_path).suffix.lower()
-    for lang, config in LANGUAGE_CONFIG.items():
-        if ext in config['extensions']:
-            return lang
-    return None
+    from .file_types import file_type
+    return file_type(file_path).language
 
 
 def check_tool_available(command: str) -> bool:
     """Check if a command-line tool is available"""
-    return shutil.which(command) is not None
+    return which(command) is not None
 
 
 @tool("Execute code file")
-def execute_code(file_path: str, args: str = "", timeout: int = 30) -> str:
+@traced_tool
+def execute_code(file_path: str, args: str = "", timeout: int = 30, stop_on: str = "") -> str:
     """
     Executes code from any supported programming language file.
     
@@ -276,6 +297,8 @@ def execute_code(file_path: str, args: str = "", timeout: int = 30) -> str:
         file_path: Path to the code file
         args: Additional command-line arguments
         timeout: Execution timeout in seconds (default: 30)
+        stop_on: Regex; stop the program shortly after its output first matches it
+                 (e.g. "Traceback" to stop at the first logged exception) (optional)
     
     Returns:
         Execution output including stdout, stderr, and return code
@@ -295,6 +318,9 @@ def execute_code(file_path: str, args: str = "", timeout: int = 30) -> str:
         
         # Build command
         command = config['run_command'](file_path)
+        if language == 'python':
+            # Run with the project's virtualenv when it has one
+            command[0] = project_python(Path(file_path).parent)
         if args:
             command.extend(args.split())
         
@@ -302,14 +328,16 @@ def execute_code(file_path: str, args: str = "", timeout: int = 30) -> str:
         if not check_tool_available(command[0]):
             return f"✗ Error: {command[0]} is not installed or not in PATH"
         
-        # Execute
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=Path(file_path).parent
-        )
+        # Execute (Python scripts are forked from a warm interpreter when possible)
+        result = None
+        if language == 'python' and not stop_on and warm_pool_available():
+            try:
+                result = run_python(file_path, command[2:], timeout, python=command[0])
+            except OSError:
+                # No warm interpreter (it failed to start or the project cannot be forked): run cold
+                result = None
+        if result is None:
+            result = run_process(command, cwd=Path(file_path).parent, timeout=timeout, stop_on=stop_on or None)
         
         output = f"Language: {language.capitalize()}\n"
         output += f"File: {file_path}\n"
@@ -320,6 +348,7 @@ def execute_code(file_path: str, args: str = "", timeout: int = 30) -> str:
             output += f"STDOUT:\n{result.stdout}\n"
         if result.stderr:
             output += f"STDERR:\n{result.stderr}\n"
+        output += result.notes()
         
         output += f"─" * 60 + "\n"
         output += f"Return Code: {result.returncode}\n"
@@ -338,6 +367,7 @@ def execute_code(file_path: str, args: str = "", timeout: int = 30) -> str:
 
 
 @tool("Validate code syntax")
+@traced_tool
 def validate_syntax(file_path: str) -> str:
     """
     Validates code syntax without executing for any supported language.
@@ -363,15 +393,15 @@ def validate_syntax(file_path: str) -> str:
         # Get language configuration
         config = LANGUAGE_CONFIG[language]
         
-        # Special handling for Python (can use built-in compile)
-        if language == 'python':
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    code = f.read()
-                compile(code, file_path, 'exec')
-                return f"✓ {language.capitalize()} syntax is valid: {file_path}"
-            except SyntaxError as e:
-                return f"✗ Syntax Error in {file_path}:\nLine {e.lineno}: {e.msg}\n{e.text}"
+        # Special handling for Python and JSON (checked in-process); results are
+        # cached per file content
+        if language in _IN_PROCESS_SYNTAX_CHECKS:
+            check = _IN_PROCESS_SYNTAX_CHECKS[language]
+            results, _ = run_cached(f"syntax:{language}", sys.version, "", [file_path],
+                                    lambda paths: dict(check(paths)))
+            if results.get(file_path):
+                return f"✗ Syntax Error in {file_path}:\n{results[file_path]}"
+            return f"✓ {language.capitalize()} syntax is valid: {file_path}"
         
         # For other languages, use their syntax checking tools
         if 'syntax_check' not in config:
@@ -383,26 +413,232 @@ def validate_syntax(file_path: str) -> str:
         if not check_tool_available(command[0]):
             return f"⚠ {command[0]} is not installed. Cannot validate syntax."
         
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=Path(file_path).parent
-        )
+        def check_file(paths):
+            passed, output = _run_checker(command, Path(file_path).parent)
+            return {file_path: None if passed else output or "(no output)"}
         
-        if result.returncode == 0:
+        template = [part for part in command if part != file_path]
+        results, _ = run_cached(f"syntax:{language}", tool_version(command[0]),
+                                config_hash(Path(file_path).parent, template), [file_path], check_file)
+        
+        if not results.get(file_path):
             return f"✓ {language.capitalize()} syntax is valid: {file_path}"
         else:
             output = f"✗ Syntax errors found in {file_path}:\n"
-            output += result.stderr if result.stderr else result.stdout
+            output += results[file_path]
             return output
             
     except Exception as e:
         return f"✗ Error validating syntax: {str(e)}"
 
 
+# Linters that print the file of every issue and formatters that take file
+# arguments; lint_code/format_code run them on changed files only
+CACHED_LINTERS = {'flake8', 'eslint'}
+CACHED_FORMATTERS = {'black', 'prettier'}
+# Python files per worker task; fewer than this are compiled in-process
+PYTHON_CHECK_CHUNK = 16
+# Syntax errors listed in a project report, and checker output lines kept per error
+MAX_REPORTED_SYNTAX_ERRORS = 30
+MAX_SYNTAX_ERROR_LINES = 12
+
+
+def find_source_files(project_dir: Path) -> List[Path]:
+    """Files in the project with a language known to validate_syntax (hidden and ignored paths skipped)"""
+    entries = get_workspace_index(project_dir).list(project_dir, include_hidden=False)
+    return [entry.path for _, entry in entries if not entry.is_dir and detect_language(entry.path.name)]
+
+
+def _language_files(path: Path, language: str) -> List[str]:
+    """The file itself, or the directory's source files in language"""
+    if path.is_file():
+        return [str(path)]
+    return [str(file) for file in find_source_files(path) if detect_language(file.name) == language]
+
+
+def _cached_summary(cached: int) -> str:
+    return f"({cached} unchanged file{'s' if cached != 1 else ''} answered from cache)\n" if cached else ""
+
+
+def _compile_python(paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """(path, error or None) per file, compiled without running it (called in pool workers)"""
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                compile(f.read(), path, 'exec', dont_inherit=True)
+            results.append((path, None))
+        except SyntaxError as e:
+            results.append((path, f"Line {e.lineno}: {e.msg}\n{(e.text or '').rstrip()}"))
+        except (ValueError, OSError) as e:
+            results.append((path, str(e)))
+    return results
+
+
+def _check_python(paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Compile Python files across SYNTAX_CHECK_WORKERS processes (in-process for small projects)"""
+    chunks = [paths[i:i + PYTHON_CHECK_CHUNK] for i in range(0, len(paths), PYTHON_CHECK_CHUNK)]
+    if len(chunks) < 2 or SYNTAX_CHECK_WORKERS < 2:
+        return _compile_python(paths)
+    try:
+        with ProcessPoolExecutor(max_workers=min(SYNTAX_CHECK_WORKERS, len(chunks))) as pool:
+            return [result for chunk in pool.map(_compile_python, chunks) for result in chunk]
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️  Syntax check workers unavailable ({e}); compiling in-process")
+        return _compile_python(paths)
+
+
+def _check_json(paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                json.load(f)
+            results.append((path, None))
+        except (ValueError, OSError) as e:
+            results.append((path, str(e)))
+    return results
+
+
+# Languages checked without a subprocess
+_IN_PROCESS_SYNTAX_CHECKS = {'python': _check_python, 'json': _check_json}
+
+
+def _run_checker(command: List[str], cwd: Path) -> Tuple[bool, str]:
+    """(passed, output) of one checker process"""
+    result = traced_run(command, capture_output=True, text=True, timeout=120, cwd=cwd)
+    return result.returncode == 0, (result.stderr or result.stdout or "").strip()
+
+
+def _check_external(language: str, paths: List[str], cwd: Path,
+                    threads: ThreadPoolExecutor) -> Tuple[List[Tuple[List[str], str]], Optional[str]]:
+    """
+    Run a language's checker: one process for all paths when it has a batch
+    command, else one per file on the thread pool. Returns ([(failing paths,
+    output)], reason nothing was checked).
+    """
+    config = LANGUAGE_CONFIG[language]
+    if 'batch_syntax_check' in config:
+        template = config['batch_syntax_check']([])
+        if not check_tool_available(template[0]):
+            return [], f"{template[0]} is not installed"
+        failures = []
+        
+        def check_batch(dirty: List[str]) -> Dict[str, Optional[str]]:
+            passed, output = _run_checker(config['batch_syntax_check'](dirty), cwd)
+            if passed:
+                return {path: None for path in dirty}
+            # Blame the files the checker names; a project-wide failure blames them all
+            named = [path for path in dirty if path in output or os.path.relpath(path, cwd) in output]
+            failures.append((named or dirty, output))
+            return {}
+        
+        if len(config['batch_syntax_check'](paths)) == len(template):
+            # Project-wide checker (go vet ./..., cargo check): its result is not per file
+            check_batch(paths)
+        else:
+            # Only files changed since they last passed are checked again
+            run_cached(f"syntax:{language}", tool_version(template[0]), config_hash(cwd, template),
+                       paths, check_batch, cache_problems=False)
+        return failures, None
+    if 'syntax_check' not in config:
+        return [], "no syntax checker"
+    commands = {path: config['syntax_check'](path) for path in paths}
+    template = [part for part in commands[paths[0]] if part != paths[0]]
+    if not check_tool_available(template[0]):
+        return [], f"{template[0]} is not installed"
+    
+    def check_each(dirty: List[str]) -> Dict[str, Optional[str]]:
+        outcomes = threads.map(lambda path: _run_checker(commands[path], cwd), dirty)
+        return {path: None if passed else output or "(no output)" for path, (passed, output) in zip(dirty, outcomes)}
+    
+    results, _ = run_cached(f"syntax:{language}", tool_version(template[0]), config_hash(cwd, template),
+                            paths, check_each)
+    return [([path], results[path]) for path in paths if results.get(path)], None
+
+
+@tool("Validate project syntax")
+@traced_tool
+def validate_project_syntax(project_dir: str = ".") -> str:
+    """
+    Validates the syntax of every source file in a project in one call.
+    
+    Python (compiled in parallel worker processes) and JSON are checked
+    in-process; checkers that accept many files (tsc, gcc, yamllint, ...) run
+    once for the whole project. Hidden and .gitignore'd paths are skipped.
+    
+    Args:
+        project_dir: Project directory (default: current directory)
+    
+    Returns:
+        One report: files checked per language, every syntax error found and
+        the languages that could not be checked
+    """
+    try:
+        root = Path(project_dir)
+        if not root.is_dir():
+            return f"✗ Error: Directory not found: {project_dir}"
+        
+        by_language: Dict[str, List[str]] = {}
+        for path in find_source_files(root):
+            by_language.setdefault(detect_language(path.name), []).append(str(path))
+        if not by_language:
+            return f"⚠ No source files found in {project_dir}"
+        
+        failures: List[Tuple[List[str], str]] = []
+        skipped: Dict[str, str] = {}
+        external_languages = [language for language in by_language if language not in _IN_PROCESS_SYNTAX_CHECKS]
+        # One thread per language, plus a shared pool for per-file checker processes
+        with ThreadPoolExecutor(max_workers=max(len(external_languages), 1)) as languages, \
+                ThreadPoolExecutor(max_workers=max(SYNTAX_CHECK_WORKERS, 1)) as threads:
+            external = {
+                language: languages.submit(_check_external, language, by_language[language], root, threads)
+                for language in external_languages
+            }
+            # In-process checks run while the external checkers do (unchanged files come from the cache)
+            for language, check in _IN_PROCESS_SYNTAX_CHECKS.items():
+                if language in by_language:
+                    results, _ = run_cached(f"syntax:{language}", sys.version, "", by_language[language],
+                                            lambda paths: dict(check(paths)))
+                    failures.extend(([path], error) for path, error in results.items() if error)
+            for language, future in external.items():
+                language_failures, reason = future.result()
+                failures.extend(language_failures)
+                if reason:
+                    skipped[language] = reason
+        
+        total = sum(len(paths) for paths in by_language.values())
+        unchecked = sum(len(by_language[language]) for language in skipped)
+        failed = {path for paths, _ in failures for path in paths}
+        counts = ", ".join(f"{language} {len(paths)}" for language, paths in sorted(by_language.items()))
+        
+        def relative(path: str) -> str:
+            return os.path.relpath(path, root)
+        
+        checked = total - unchecked
+        if failures:
+            output = f"✗ Syntax errors in {len(failed)}/{checked} checked files ({counts})\n"
+        else:
+            output = f"✓ Syntax valid: {checked}/{total} files ({counts})\n"
+        output += "═" * 70 + "\n"
+        for paths, error in failures[:MAX_REPORTED_SYNTAX_ERRORS]:
+            lines = error.replace(str(root) + os.sep, "").splitlines()
+            if len(lines) > MAX_SYNTAX_ERROR_LINES:
+                lines = lines[:MAX_SYNTAX_ERROR_LINES] + [f"... ({len(lines) - MAX_SYNTAX_ERROR_LINES} more lines)"]
+            label = relative(paths[0]) if len(paths) == 1 else f"{len(paths)} files: " + ", ".join(map(relative, paths[:5]))
+            output += f"✗ {label}\n" + "".join(f"  {line}\n" for line in lines)
+        if len(failures) > MAX_REPORTED_SYNTAX_ERRORS:
+            output += f"... and {len(failures) - MAX_REPORTED_SYNTAX_ERRORS} more files with errors\n"
+        for language, reason in sorted(skipped.items()):
+            output += f"⚠ Not checked: {len(by_language[language])} {language} files ({reason})\n"
+        return output
+        
+    except Exception as e:
+        return f"✗ Error validating project syntax: {str(e)}"
+
+
 @tool("Install project dependencies")
+@traced_tool
 def install_dependencies(project_dir: str = ".", language: str = None) -> str:
     """
     Installs dependencies for any supported language/framework.
@@ -474,13 +710,7 @@ def install_dependencies(project_dir: str = ".", language: str = None) -> str:
             return f"✗ Error: {command[0]} is not installed or not in PATH"
         
         # Execute installation
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd=project_path
-        )
+        result = run_process(command, cwd=project_path, timeout=300)
         
         output = f"Language: {language.capitalize()}\n"
         output += f"Command: {' '.join(command)}\n"
@@ -488,6 +718,8 @@ def install_dependencies(project_dir: str = ".", language: str = None) -> str:
         
         if result.returncode == 0:
             output += "✓ Successfully installed dependencies\n"
+            # Packages may have brought new executables (pytest, black, ...)
+            get_toolchains().invalidate()
             if result.stdout:
                 # Show last few lines of output
                 lines = result.stdout.strip().split('\n')
@@ -505,6 +737,7 @@ def install_dependencies(project_dir: str = ".", language: str = None) -> str:
 
 
 @tool("Run project tests")
+@traced_tool
 def run_tests(project_dir: str = ".", language: str = None, verbose: bool = True) -> str:
     """
     Runs tests for any supported language/framework.
@@ -556,13 +789,7 @@ def run_tests(project_dir: str = ".", language: str = None, verbose: bool = True
             return f"⚠ {command[0]} is not installed. Cannot run tests."
         
         # Execute tests
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            cwd=project_path
-        )
+        result = run_process(command, cwd=project_path, timeout=120)
         
         output = f"Language: {language.capitalize()}\n"
         output += f"Command: {' '.join(command)}\n"
@@ -572,6 +799,7 @@ def run_tests(project_dir: str = ".", language: str = None, verbose: bool = True
             output += result.stdout + "\n"
         if result.stderr:
             output += result.stderr + "\n"
+        output += result.notes()
         
         output += "─" * 60 + "\n"
         output += f"Return Code: {result.returncode}\n"
@@ -590,6 +818,7 @@ def run_tests(project_dir: str = ".", language: str = None, verbose: bool = True
 
 
 @tool("Format code")
+@traced_tool
 def format_code(file_or_dir: str, language: str = None) -> str:
     """
     Formats code according to language standards.
@@ -634,6 +863,16 @@ def format_code(file_or_dir: str, language: str = None) -> str:
         if 'format_command' not in config:
             return f"⚠ Code formatting not configured for {language}"
         
+        # Formatters taking file arguments only see files changed since they were last formatted
+        if config['format_command']([])[0] in CACHED_FORMATTERS:
+            command = config['format_command']([])
+            if not check_tool_available(command[0]):
+                return f"⚠ {command[0]} is not installed. Install it to format code."
+            run = format_files(command, _language_files(path, language), path if path.is_dir() else path.parent)
+            if run.failed:
+                return f"✗ Error formatting code:\n{run.output}"
+            return f"✓ Successfully formatted {language} code: {file_or_dir}\n" + _cached_summary(run.cached)
+        
         # Build format command
         if path.is_file():
             command = config['format_command']([str(path)])
@@ -645,7 +884,7 @@ def format_code(file_or_dir: str, language: str = None) -> str:
             return f"⚠ {command[0]} is not installed. Install it to format code."
         
         # Execute formatting
-        result = subprocess.run(
+        result = traced_run(
             command,
             capture_output=True,
             text=True,
@@ -663,6 +902,7 @@ def format_code(file_or_dir: str, language: str = None) -> str:
 
 
 @tool("Lint code")
+@traced_tool
 def lint_code(file_or_dir: str, language: str = None) -> str:
     """
     Lints code and reports style/quality issues.
@@ -707,6 +947,26 @@ def lint_code(file_or_dir: str, language: str = None) -> str:
         if 'lint_command' not in config:
             return f"⚠ Code linting not configured for {language}"
         
+        # Linters naming the file of each issue only see files changed since their last run
+        if config['lint_command']([])[0] in CACHED_LINTERS:
+            command = config['lint_command']([])
+            if not check_tool_available(command[0]):
+                return f"⚠ {command[0]} is not installed. Install it to lint code."
+            run = lint_files(command, _language_files(path, language), path if path.is_dir() else path.parent)
+            output = f"Language: {language.capitalize()}\n"
+            output += f"Command: {' '.join(command)}\n"
+            output += "─" * 60 + "\n"
+            if run.output:
+                output += run.output + "\n"
+            output += _cached_summary(run.cached)
+            if run.failed:
+                output += f"✗ {command[0]} failed (see above)"
+            elif run.problems:
+                output += f"⚠ Linting issues found in {run.problems} file(s) (see above)"
+            else:
+                output += "✓ No linting issues found"
+            return output
+        
         # Build lint command
         if path.is_file():
             command = config['lint_command']([str(path)])
@@ -718,7 +978,7 @@ def lint_code(file_or_dir: str, language: str = None) -> str:
             return f"⚠ {command[0]} is not installed. Install it to lint code."
         
         # Execute linting
-        result = subprocess.run(
+        result = traced_run(
             command,
             capture_output=True,
             text=True,
@@ -747,6 +1007,7 @@ def lint_code(file_or_dir: str, language: str = None) -> str:
 
 
 @tool("Build project")
+@traced_tool
 def build_project(project_dir: str = ".", language: str = None, release: bool = False) -> str:
     """
     Builds/compiles the project for languages that require compilation.
@@ -795,13 +1056,7 @@ def build_project(project_dir: str = ".", language: str = None, release: bool =
             return f"✗ Error: {command[0]} is not installed or not in PATH"
         
         # Execute build
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd=project_path
-        )
+        result = run_process(command, cwd=project_path, timeout=300)
         
         output = f"Language: {language.capitalize()}\n"
         output += f"Command: {' '.join(command)}\n"
@@ -815,6 +1070,7 @@ def build_project(project_dir: str = ".", language: str = None, release: bool =
         
         if result.stderr:
             output += result.stderr + "\n"
+        output += result.notes()
         
         output += "─" * 60 + "\n"
         
@@ -831,8 +1087,31 @@ def build_project(project_dir: str = ".", language: str = None, release: bool =
         return f"✗ Error building project: {str(e)}"
 
 
+@tool("List available toolchains")
+@traced_tool
+def list_toolchains(refresh: bool = False) -> str:
+    """
+    Lists which languages can be run, syntax-checked, linted, formatted, tested
+    and built on this machine, the missing tools behind the rest, and tool versions.
+    Check this before relying on a tool instead of trying tools that are not installed.
+    
+    Args:
+        refresh: Look every tool up again instead of using the saved results (default: False)
+    
+    Returns:
+        Available toolchains per language
+    """
+    try:
+        if refresh:
+            get_toolchains().invalidate()
+        return get_toolchains().summary()
+    except Exception as e:
+        return f"✗ Error listing toolchains: {str(e)}"
+
+
 @tool("Execute shell command")
-def execute_command(command: str, working_dir: str = ".", timeout: int = 60) -> str:
+@traced_tool
+def execute_command(command: str, working_dir: str = ".", timeout: int = 60, stop_on: str = "") -> str:
     """
     Executes arbitrary shell commands in the project directory.
     
@@ -842,19 +1121,17 @@ def execute_command(command: str, working_dir: str = ".", timeout: int = 60) ->
         command: Shell command to execute
         working_dir: Working directory (default: current directory)
         timeout: Command timeout in seconds (default: 60)
+        stop_on: Regex; stop the command shortly after its output first matches it (optional)
     
     Returns:
         Command output including stdout, stderr, and return code
     """
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=working_dir
-        )
+        tools_before = path_state()
+        result = run_process(command, cwd=working_dir, timeout=timeout, shell=True, stop_on=stop_on or None)
+        if path_state() != tools_before:
+            # The command installed or removed tools
+            get_toolchains().invalidate()
         
         output = f"Command: {command}\n"
         output += f"Working Directory: {working_dir}\n"
@@ -864,6 +1141,7 @@ def execute_command(command: str, working_dir: str = ".", timeout: int = 60) ->
             output += f"STDOUT:\n{result.stdout}\n"
         if result.stderr:
             output += f"STDERR:\n{result.stderr}\n"
+        output += result.notes()
         
         output += "─" * 60 + "\n"
         output += f"Return Code: {result.returncode}\n"
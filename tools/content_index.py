@@ -0,0 +1,274 @@
+"""
+Trigram index of file contents used by search_files.
+
+Each indexed file stores the set of (lower-case, ASCII) trigrams in its text
+and its line-start offsets. A query only reads the files that contain every
+trigram of the search term (or of the literal runs a regex requires), and
+match offsets are turned into line numbers with the stored offset table.
+
+Generated projects keep their index in <project>/.agent_state/content_index.sqlite3
+so it survives restarts; other directories get an in-memory index. Files are
+reindexed when their mtime or size changes, and the file tools update the
+index directly when they write, move or delete files.
+"""
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from config import OUTPUT_DIR
+from .workspace_index import FileEntry, WorkspaceIndex, get_workspace_index
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+# Same directory as the checkpoint log (pipeline.checkpoints.STATE_DIR_NAME)
+STATE_DIR_NAME = ".agent_state"
+
+# Larger files are not indexed; they are always searched directly
+MAX_INDEXED_FILE_BYTES = 2 * 1024 * 1024
+
+_GRAM = re.compile('...', re.DOTALL)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Lower-case ASCII trigrams of a text"""
+    lowered = text.lower()
+    return {gram for gram in map(''.join, zip(lowered, lowered[1:], lowered[2:])) if gram.isascii()}
+
+
+def line_offsets(text: str) -> array:
+    """Offset of the first character of every line"""
+    offsets = array('I', [0])
+    offsets.extend(match.end() for match in re.finditer('\n', text))
+    return offsets
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Literal runs every match of a regex must contain (top-level sequence only;
+    alternations, optional parts and classes end a run)
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []
+
+    runs, current = [], []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    def walk(items):
+        for op, arg in items:
+            if op is sre_constants.LITERAL:
+                current.append(chr(arg))
+            elif op is sre_constants.SUBPATTERN:
+                walk(arg[-1])
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and arg[0] >= 1:
+                # x+ / x{2,}: the first repetition is required, but the run ends after it
+                walk(arg[2])
+                flush()
+            elif op is sre_constants.AT:
+                continue
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+    return runs
+
+
+def query_trigrams(term: str, regex: bool) -> Set[str]:
+    """Trigrams every file containing a match must have (empty set = no pruning possible)"""
+    literals = required_literals(term) if regex else [term]
+    grams: Set[str] = set()
+    for literal in literals:
+        grams |= trigrams(literal)
+    return grams
+
+
+class ContentIndex:
+    """
+    Trigram sets and line offsets of the text files under one workspace index
+    root, held in memory and mirrored to SQLite (one row per file)
+    """
+
+    def __init__(self, workspace: WorkspaceIndex, db_path: Optional[Path] = None):
+        self.workspace = workspace
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            ignore = db_path.parent / ".gitignore"
+            if not ignore.exists():
+                ignore.write_text("*\n", encoding='utf-8')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path) if db_path else ":memory:", timeout=30,
+                                     check_same_thread=False)
+        if db_path is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                   path TEXT PRIMARY KEY,
+                   mtime_ns INTEGER NOT NULL,
+                   size INTEGER NOT NULL,
+                   trigrams TEXT NOT NULL,
+                   offsets BLOB NOT NULL
+               )"""
+        )
+        # Relative path -> (mtime_ns, size, trigrams, line offsets)
+        self._files: Dict[str, Tuple[int, int, FrozenSet[str], array]] = {}
+        for path, mtime_ns, size, grams, blob in self._conn.execute("SELECT * FROM files"):
+            offsets = array('I')
+            offsets.frombytes(blob)
+            self._files[path] = (mtime_ns, size, frozenset(_GRAM.findall(grams)), offsets)
+        self.indexed = 0
+
+    def _index(self, entry: FileEntry) -> Optional[tuple]:
+        """Row for one file (None if it cannot be read as text)"""
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        self.indexed += 1
+        return entry.stat.st_mtime_ns, entry.size, frozenset(trigrams(text)), line_offsets(text)
+
+    def _store(self, rows: Dict[str, tuple]) -> None:
+        """Save freshly indexed files (None rows are removed); caller holds the lock"""
+        if not rows:
+            return
+        with self._conn:
+            for relative, row in rows.items():
+                if row is None:
+                    self._files.pop(relative, None)
+                    self._conn.execute("DELETE FROM files WHERE path = ?", (relative,))
+                    continue
+                self._files[relative] = row
+                mtime_ns, size, grams, offsets = row
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, trigrams, offsets) VALUES (?, ?, ?, ?, ?)",
+                    (relative, mtime_ns, size, "".join(grams), offsets.tobytes())
+                )
+
+    def _is_current(self, entry: FileEntry) -> bool:
+        row = self._files.get(entry.relative)
+        return row is not None and row[0] == entry.stat.st_mtime_ns and row[1] == entry.size
+
+    def update(self, path: Path) -> None:
+        """Reindex a written file, reindex a moved-in directory or drop a deleted path"""
+        try:
+            relative = self.workspace._relative(path)
+        except ValueError:
+            return
+        from .file_operations import is_binary_file
+        with self._lock:
+            prefix = relative + os.sep if relative else ""
+            rows = {path: None for path in self._files if path == relative or path.startswith(prefix)}
+            entry = self.workspace.get(path)
+            if entry is not None:
+                entries = [entry] if not entry.is_dir else \
+                    [e for _, e in self.workspace.list(path, include_hidden=False) if not e.is_dir]
+                for item in entries:
+                    if item.size <= MAX_INDEXED_FILE_BYTES and not is_binary_file(item.relative):
+                        rows[item.relative] = self._index(item)
+            self._store(rows)
+
+    def candidates(self, entries: List[FileEntry], grams: Set[str]) -> List[Tuple[FileEntry, Optional[array]]]:
+        """
+        (entry, line offsets) for the entries that may contain a match, indexing
+        any that changed since last time (offsets are None for unindexed files)
+        """
+        with self._lock:
+            self._store({entry.relative: self._index(entry) for entry in entries
+                         if entry.size <= MAX_INDEXED_FILE_BYTES and not self._is_current(entry)})
+            results = []
+            for entry in entries:
+                row = self._files.get(entry.relative)
+                if row is None:
+                    if entry.size > MAX_INDEXED_FILE_BYTES:
+                        results.append((entry, None))
+                elif grams <= row[2]:
+                    results.append((entry, row[3]))
+            return results
+
+    def search(self, entries: List[FileEntry], term: str, regex: bool = False,
+               case_sensitive: bool = False) -> List[Tuple[FileEntry, List[Tuple[int, str]]]]:
+        """
+        Files among entries containing term, with (line number, line) for every
+        matching line, in the order of entries
+
+        Raises:
+            re.error: If regex is True and term is not a valid regular expression
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        matcher = re.compile(term if regex else re.escape(term), flags | re.MULTILINE)
+        # Plain terms are located with str.find (on lower-cased text unless case_sensitive)
+        needle = None if regex else term if case_sensitive else term.lower()
+        results = []
+        for entry, offsets in self.candidates(entries, query_trigrams(term, regex)):
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if needle is not None:
+                haystack = text if case_sensitive else text.lower()
+                if len(haystack) != len(text):
+                    haystack, needle = None, None
+            if needle is not None:
+                starts, start = [], haystack.find(needle)
+                while start != -1:
+                    starts.append(start)
+                    start = haystack.find(needle, start + 1)
+            else:
+                starts = [match.start() for match in matcher.finditer(text)]
+            if not starts:
+                continue
+            if offsets is None or offsets[-1] > len(text):
+                offsets = line_offsets(text)
+            lines, seen = [], set()
+            for start in starts:
+                line = bisect_right(offsets, start)
+                if line in seen:
+                    continue
+                seen.add(line)
+                end = offsets[line] - 1 if line < len(offsets) else len(text)
+                lines.append((line, text[offsets[line - 1]:end].strip()))
+            results.append((entry, lines))
+        return results
+
+
+_indexes: Dict[str, ContentIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_content_index(path: Path) -> ContentIndex:
+    """Content index of the project containing path (persistent for projects under OUTPUT_DIR)"""
+    workspace = get_workspace_index(path)
+    key = str(workspace.root)
+    with _indexes_lock:
+        if key not in _indexes:
+            output_dir = Path(os.path.abspath(OUTPUT_DIR))
+            persistent = output_dir in Path(os.path.abspath(workspace.root)).parents
+            db_path = workspace.root / STATE_DIR_NAME / "content_index.sqlite3" if persistent else None
+            _indexes[key] = ContentIndex(workspace, db_path)
+        return _indexes[key]
+
+
+def update_content_index(path: Path) -> None:
+    """Bring open content indexes up to date after a file tool changed path"""
+    path = Path(os.path.abspath(path))
+    with _indexes_lock:
+        indexes = [index for root, index in _indexes.items() if Path(root) == path or Path(root) in path.parents]
+    for index in indexes:
+        index.update(path)
@@ -1,81 +1,37 @@
 import os
+import re
 import json
 import shutil
 import mimetypes
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from crewai.tools import tool
-
-
-# File type categorization
-FILE_CATEGORIES = {
-    'source_code': {
-        'python': ['.py', '.pyw', '.pyx'],
-        'javascript': ['.js', '.mjs', '.cjs'],
-        'typescript': ['.ts', '.tsx'],
-        'java': ['.java'],
-        'csharp': ['.cs', '.cshtml', '.razor'],
-        'go': ['.go'],
-        'rust': ['.rs'],
-        'cpp': ['.cpp', '.cc', '.cxx', '.h', '.hpp'],
-        'c': ['.c', '.h'],
-        'ruby': ['.rb'],
-        'php': ['.php'],
-        'swift': ['.swift'],
-        'kotlin': ['.kt', '.kts'],
-        'scala': ['.scala'],
-        'r': ['.r', '.R'],
-        'matlab': ['.m'],
-        'shell': ['.sh', '.bash', '.zsh', '.fish'],
-        'powershell': ['.ps1', '.psm1'],
-    },
-    'markup': ['.html', '.htm', '.xml', '.svg'],
-    'styling': ['.css', '.scss', '.sass', '.less', '.styl'],
-    'data': ['.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf'],
-    'documentation': ['.md', '.rst', '.txt', '.adoc', '.tex'],
-    'database': ['.sql', '.db', '.sqlite', '.sqlite3'],
-    'config': ['.env', '.gitignore', '.dockerignore', '.editorconfig'],
-    'build': ['Makefile', 'Dockerfile', 'docker-compose.yml', '.gitlab-ci.yml'],
-    'package': ['package.json', 'requirements.txt', 'Cargo.toml', 'go.mod', 'pom.xml', 'build.gradle'],
-}
-
-# Binary file extensions that should not be read as text
-BINARY_EXTENSIONS = {
-    '.pyc', '.pyo', '.so', '.dll', '.exe', '.bin', '.dat',
-    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg',
-    '.mp3', '.mp4', '.avi', '.mov', '.wav',
-    '.zip', '.tar', '.gz', '.bz2', '.7z', '.rar',
-    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-    '.class', '.jar', '.war', '.ear',
-    '.wasm', '.o', '.a', '.lib'
-}
+from tracing import traced_tool, add_to_span
+from config import FILE_IO_WORKERS
+from .workspace_index import get_workspace_index
+from .watcher import publish
+from .content_index import get_content_index, update_content_index
+from .atomic_io import atomic_write, fsync_directories, snapshot
+from .tool_output import PagedOutput
+from .file_types import file_type
 
 
 def get_file_category(file_path: str) -> str:
     """Determine the category of a file"""
-    path = Path(file_path)
-    ext = path.suffix.lower()
-    name = path.name
-    
-    # Check source code
-    for lang, extensions in FILE_CATEGORIES['source_code'].items():
-        if ext in extensions:
-            return f'source_code/{lang}'
-    
-    # Check other categories
-    for category, extensions in FILE_CATEGORIES.items():
-        if category != 'source_code':
-            if ext in extensions or name in extensions:
-                return category
-    
-    return 'other'
+    return file_type(file_path).category
 
 
 def is_binary_file(file_path: str) -> bool:
     """Check if a file is binary"""
-    ext = Path(file_path).suffix.lower()
-    return ext in BINARY_EXTENSIONS
+    return file_type(file_path).binary
+
+
+def _path_changed(path: Path) -> None:
+    """Publish a change event for path (refreshes the workspace index) and update the content index"""
+    publish(path)
+    update_content_index(path)
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -87,7 +43,216 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_bytes:.2f} TB"
 
 
+def _read_lines(path: Path, encoding: str = 'utf-8', start_line: int = 1,
+                max_lines: Optional[int] = None) -> tuple:
+    """
+    (content, lines shown, total lines, size) of a text file; ranged reads come from
+    the cached line-offset table when the encoding writes '\n' as a single byte
+    """
+    entry = get_workspace_index(path).get(path)
+    if entry is not None and not entry.is_dir and '\n'.encode(encoding) == b'\n':
+        content, shown = entry.read_lines(start_line, max_lines, encoding)
+        return content, shown, entry.line_count, entry.size
+    with open(path, 'r', encoding=encoding) as f:
+        lines = f.readlines()
+    total_lines = len(lines)
+    if start_line > 1:
+        lines = lines[start_line - 1:]
+    if max_lines:
+        lines = lines[:max_lines]
+    return ''.join(lines), len(lines), total_lines, path.stat().st_size
+
+
+# Patch parsing and application (used by apply_patch)
+_HUNK_HEADER = re.compile(r'^@@+\s*(?:-(\d+)(?:,(\d+))?\s+\+(\d+)(?:,(\d+))?)?.*$')
+_SEARCH_MARKER = re.compile(r'^<{5,9} SEARCH\s*$')
+_DIVIDER_MARKER = re.compile(r'^={5,9}\s*$')
+_REPLACE_MARKER = re.compile(r'^>{5,9} REPLACE\s*$')
+
+
+class _Hunk:
+    """One change: (op, line) pairs with op ' ' (context), '-' (remove) or '+' (add)"""
+
+    def __init__(self, ops: List[tuple], start: Optional[int] = None):
+        self.ops = ops
+        self.start = start  # 1-indexed line in the original file, if known
+
+    def trimmed(self, fuzz: int) -> tuple:
+        """(leading lines dropped, ops) without up to fuzz leading and trailing context lines"""
+        ops = self.ops
+        lead = 0
+        while lead < fuzz and lead < len(ops) and ops[lead][0] == ' ':
+            lead += 1
+        trail = 0
+        while trail < fuzz and trail < len(ops) - lead and ops[len(ops) - 1 - trail][0] == ' ':
+            trail += 1
+        return lead, ops[lead:len(ops) - trail]
+
+
+def _patch_path(header: str) -> Optional[str]:
+    """File path of a '--- ' / '+++ ' header line (None for /dev/null)"""
+    name = header[4:].split('\t')[0].strip()
+    if name == '/dev/null':
+        return None
+    return name
+
+
+def _split_lines(text: str) -> tuple:
+    """
+    (lines, newline) of a file split on '\n' only, so form feeds and the other
+    characters str.splitlines() breaks on stay inside their line; the newline is
+    '\r\n' when every line ends with it (other '\r' are kept as line content)
+    """
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    if '\n' in text and text.count('\r\n') == text.count('\n'):
+        ended = len(lines) if text.endswith('\n') else len(lines) - 1
+        return [line[:-1] for line in lines[:ended]] + lines[ended:], '\r\n'
+    return lines, '\n'
+
+
+def _patch_lines(patch: str) -> List[str]:
+    """Lines of a patch, whatever newline it was written with"""
+    lines = [line[:-1] if line.endswith('\r') else line for line in patch.split('\n')]
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def _parse_unified_diff(patch: str) -> List[tuple]:
+    """[(old path, new path, [hunks])] from a unified diff"""
+    files = []
+    lines = _patch_lines(patch)
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith('--- ') and i + 1 < len(lines) and lines[i + 1].startswith('+++ '):
+            old, new = _patch_path(line), _patch_path(lines[i + 1])
+            # git diff prefixes
+            if (old is None or old.startswith('a/')) and (new is None or new.startswith('b/')) and (old or new):
+                old, new = old and old[2:], new and new[2:]
+            files.append((old, new, []))
+            i += 2
+            continue
+        header = _HUNK_HEADER.match(line)
+        if header and files:
+            old_count = int(header.group(2) or 1) if header.group(1) else None
+            new_count = int(header.group(4) or 1) if header.group(3) else None
+            ops = []
+            i += 1
+            while i < len(lines):
+                line = lines[i]
+                if old_count is not None and old_count <= 0 and new_count <= 0:
+                    break
+                if old_count is None and (_HUNK_HEADER.match(line) or line.startswith(('--- ', 'diff '))):
+                    break
+                if line.startswith('\\'):
+                    i += 1
+                    continue
+                op, text = (line[0], line[1:]) if line and line[0] in ' -+' else (' ', line)
+                ops.append((op, text))
+                if old_count is not None:
+                    old_count -= op != '+'
+                    new_count -= op != '-'
+                i += 1
+            start = int(header.group(1)) if header.group(1) else None
+            if start is not None and header.group(2) == '0':
+                start += 1  # pure insertion: the header names the line before it
+            files[-1][2].append(_Hunk(ops, start))
+            continue
+        i += 1
+    return files
+
+
+def _parse_search_replace(patch: str) -> List[tuple]:
+    """[(path, path, [hunks])] from SEARCH/REPLACE blocks, each preceded by its file path"""
+    files = []
+    lines = _patch_lines(patch)
+    path = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if _SEARCH_MARKER.match(line):
+            search, replace = [], []
+            i += 1
+            while i < len(lines) and not _DIVIDER_MARKER.match(lines[i]):
+                search.append(lines[i])
+                i += 1
+            i += 1
+            while i < len(lines) and not _REPLACE_MARKER.match(lines[i]):
+                replace.append(lines[i])
+                i += 1
+            if path is None:
+                raise ValueError("SEARCH/REPLACE block without a file path line before it")
+            if not files or files[-1][1] != path:
+                files.append((path, path, []))
+            files[-1][2].append(_Hunk([('-', text) for text in search] + [('+', text) for text in replace]))
+        elif line.strip() and not line.strip().startswith('```'):
+            path = line.strip().strip('`*').strip()
+        i += 1
+    return files
+
+
+def _find_block(lines: List[str], block: List[str], hint: int) -> Optional[int]:
+    """Index where block occurs in lines, nearest to hint (None if absent)"""
+    if not block:
+        return min(max(hint, 0), len(lines))
+    size = len(block)
+    last = len(lines) - size
+    hint = min(max(hint, 0), max(last, 0))
+    first = block[0]
+    for distance in range(max(hint, last - hint) + 1):
+        for position in (hint - distance, hint + distance) if distance else (hint,):
+            if 0 <= position <= last and lines[position] == first and lines[position:position + size] == block:
+                return position
+    return None
+
+
+def _apply_hunk(lines: List[str], hunk: _Hunk, hint: int, fuzz: int) -> Optional[tuple]:
+    """
+    Apply one hunk to lines in place, tolerating moved code (nearest match to
+    hint), up to fuzz unmatched context lines and trailing-whitespace changes.
+    Returns (position, fuzz used, whitespace-tolerant) or None.
+    """
+    stripped = None
+    for used in range(fuzz + 1):
+        lead, ops = hunk.trimmed(used)
+        old = [text for op, text in ops if op != '+']
+        for loose in (False, True):
+            if loose:
+                if stripped is None:
+                    stripped = [line.rstrip() for line in lines]
+                position = _find_block(stripped, [text.rstrip() for text in old], hint + lead)
+            else:
+                position = _find_block(lines, old, hint + lead)
+            if position is None:
+                continue
+            # Unchanged lines keep the file's version; removed/added lines come from the hunk
+            replacement, cursor = [], position
+            for op, text in ops:
+                if op == ' ':
+                    replacement.append(lines[cursor])
+                if op != '+':
+                    cursor += 1
+                if op == '+':
+                    replacement.append(text)
+            lines[position:cursor] = replacement
+            return position - lead, used, loose
+        if not any(op == ' ' for op, _ in hunk.ops):
+            break
+    return None
+
+
+def _resolve_patch_path(name: str, base_dir: str) -> Path:
+    """Path of a patched file (relative names are resolved against base_dir)"""
+    if os.path.isabs(name) or not base_dir:
+        return Path(name)
+    return Path(base_dir) / name
+
+
 @tool("Write content to a file")
+@traced_tool
 def write_file(file_path: str, content: str, mode: str = 'w', encoding: str = 'utf-8', 
                create_backup: bool = False) -> str:
     """
@@ -106,17 +271,24 @@ def write_file(file_path: str, content: str, mode: str = 'w', encoding: str = 'u
     try:
         path = Path(file_path)
         
-        # Create backup if requested and file exists
+        # Create backup if requested and file exists (a reflink or hardlink when possible;
+        # overwrites replace the file rather than modify it, so a hardlink keeps the old content)
+        backup_method = None
         if create_backup and path.exists():
             backup_path = path.with_suffix(path.suffix + '.backup')
-            shutil.copy2(path, backup_path)
+            backup_method = snapshot(path, backup_path, hardlink=mode != 'a')
         
         # Create parent directories
         path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write file
-        with open(path, mode, encoding=encoding) as f:
-            f.write(content)
+        # Write file (appends go in place; everything else via temp file and rename)
+        if mode == 'a':
+            with open(path, mode, encoding=encoding) as f:
+                f.write(content)
+        else:
+            # The backup hardlink must stay on the old file
+            atomic_write(path, content, encoding, keep_links=backup_method != 'hardlink')
+        _path_changed(path)
         
         # Get file info
         size = path.stat().st_size
@@ -129,7 +301,7 @@ def write_file(file_path: str, content: str, mode: str = 'w', encoding: str = 'u
         result += f"  Lines: {len(content.splitlines())}"
         
         if create_backup:
-            result += f"\n  Backup created: {backup_path}"
+            result += f"\n  Backup created: {backup_path} ({backup_method})"
         
         return result
         
@@ -138,6 +310,7 @@ def write_file(file_path: str, content: str, mode: str = 'w', encoding: str = 'u
 
 
 @tool("Read content from a file")
+@traced_tool
 def read_file(file_path: str, encoding: str = 'utf-8', max_lines: Optional[int] = None,
               start_line: int = 1) -> str:
     """
@@ -163,22 +336,9 @@ def read_file(file_path: str, encoding: str = 'utf-8', max_lines: Optional[int]
             size = path.stat().st_size
             return f"⚠ Binary file detected: {file_path}\nSize: {format_file_size(size)}\nUse binary read operations for this file."
         
-        # Read file
-        with open(path, 'r', encoding=encoding) as f:
-            lines = f.readlines()
-        
-        # Apply line filtering
-        if start_line > 1:
-            lines = lines[start_line - 1:]
-        
-        if max_lines:
-            lines = lines[:max_lines]
-        
-        content = ''.join(lines)
+        content, shown, total_lines, size = _read_lines(path, encoding, start_line, max_lines)
         
         # Add file info header
-        total_lines = len(Path(file_path).read_text(encoding=encoding).splitlines())
-        size = path.stat().st_size
         category = get_file_category(file_path)
         
         header = f"File: {file_path}\n"
@@ -186,7 +346,7 @@ def read_file(file_path: str, encoding: str = 'utf-8', max_lines: Optional[int]
         header += "─" * 60 + "\n"
         
         if max_lines or start_line > 1:
-            header += f"Showing lines {start_line}-{start_line + len(lines) - 1}\n"
+            header += f"Showing lines {start_line}-{start_line + shown - 1}\n"
             header += "─" * 60 + "\n"
         
         return header + content
@@ -197,7 +357,112 @@ def read_file(file_path: str, encoding: str = 'utf-8', max_lines: Optional[int]
         return f"✗ Error reading file {file_path}: {str(e)}"
 
 
+@tool("Write multiple files")
+@traced_tool
+def write_files(files: Dict[str, str], base_dir: str = "", encoding: str = 'utf-8') -> str:
+    """
+    Writes many files in one call (e.g. to scaffold a project). Prefer this over
+    calling "Write content to a file" once per file.
+    
+    Args:
+        files: Mapping of file path to full file content
+        base_dir: Directory relative paths are resolved against (default: current directory)
+        encoding: File encoding (default: 'utf-8')
+    
+    Returns:
+        One summary line per file (size and line count) and any errors
+    """
+    try:
+        if not files:
+            return "✗ Error: No files given"
+        paths = {name: Path(name) if os.path.isabs(name) or not base_dir else Path(base_dir) / name
+                 for name in files}
+        
+        # Create every parent directory once
+        directories = {path.parent for path in paths.values()}
+        directory_errors = {}
+        for directory in sorted(directories, key=lambda d: len(d.parts)):
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                directory_errors[directory] = e
+        
+        def write(name: str) -> int:
+            if paths[name].parent in directory_errors:
+                raise directory_errors[paths[name].parent]
+            return atomic_write(paths[name], files[name], encoding, sync_directory=False)
+        
+        written, failed = {}, {}
+        with ThreadPoolExecutor(max_workers=min(FILE_IO_WORKERS, len(files))) as pool:
+            futures = {name: pool.submit(write, name) for name in files}
+            for name, future in futures.items():
+                try:
+                    written[name] = future.result()
+                except Exception as e:
+                    failed[name] = str(e)
+        fsync_directories(paths[name] for name in written)
+        for name in written:
+            _path_changed(paths[name])
+        add_to_span(bytes_written=sum(written.values()))
+        
+        result = f"{'✓' if not failed else '⚠'} Wrote {len(written)} of {len(files)} files " \
+                 f"({format_file_size(sum(written.values()))}) in {len(directories)} directories\n"
+        for name, size in written.items():
+            result += f"  {name} ({format_file_size(size)}, {len(files[name].splitlines())} lines)\n"
+        for name, error in failed.items():
+            result += f"  ✗ {name}: {error}\n"
+        return result.rstrip()
+        
+    except Exception as e:
+        return f"✗ Error writing files: {str(e)}"
+
+
+@tool("Read multiple files")
+@traced_tool
+def read_files(file_paths: List[str], max_lines_per_file: Optional[int] = None,
+               encoding: str = 'utf-8') -> str:
+    """
+    Reads many files in one call. Prefer this over calling "Read content from a file"
+    once per file.
+    
+    Args:
+        file_paths: Paths of the files to read
+        max_lines_per_file: Maximum number of lines to return per file (None for all)
+        encoding: File encoding (default: 'utf-8')
+    
+    Returns:
+        Each file's content under a header with its size and line count
+    """
+    try:
+        if not file_paths:
+            return "✗ Error: No files given"
+        
+        def read(name: str) -> str:
+            path = Path(name)
+            if not path.is_file():
+                return f"═══ {name} ═══\n✗ Error: File does not exist\n"
+            if is_binary_file(name):
+                return f"═══ {name} ═══\n⚠ Binary file ({format_file_size(path.stat().st_size)}), not shown\n"
+            try:
+                content, shown, total_lines, size = _read_lines(path, encoding, 1, max_lines_per_file)
+            except UnicodeDecodeError:
+                return f"═══ {name} ═══\n✗ Error: Cannot decode file as text with {encoding} encoding\n"
+            header = f"═══ {name} ({format_file_size(size)}, {total_lines} lines"
+            header += f", showing 1-{shown}) ═══\n" if shown < total_lines else ") ═══\n"
+            return header + content + ("" if content.endswith('\n') or not content else "\n")
+        
+        with ThreadPoolExecutor(max_workers=min(FILE_IO_WORKERS, len(file_paths))) as pool:
+            sections = list(pool.map(read, file_paths))
+        add_to_span(bytes_read=sum(len(section) for section in sections))
+        
+        return f"Read {len(file_paths)} files\n\n" + "\n".join(sections)
+        
+    except Exception as e:
+        return f"✗ Error reading files: {str(e)}"
+
+
 @tool("Append content to a file")
+@traced_tool
 def append_to_file(file_path: str, content: str, add_newline: bool = True) -> str:
     """
     Appends content to an existing file or creates a new one.
@@ -220,6 +485,7 @@ def append_to_file(file_path: str, content: str, add_newline: bool = True) -> st
         
         with open(path, 'a', encoding='utf-8') as f:
             f.write(content)
+        _path_changed(path)
         
         size = path.stat().st_size
         return f"✓ Successfully appended to: {file_path}\n  New size: {format_file_size(size)}"
@@ -228,7 +494,136 @@ def append_to_file(file_path: str, content: str, add_newline: bool = True) -> st
         return f"✗ Error appending to file {file_path}: {str(e)}"
 
 
+@tool("Apply patch")
+@traced_tool
+def apply_patch(patch: str, base_dir: str = "", fuzz: int = 2) -> str:
+    """
+    Edits existing files by applying a patch instead of rewriting them. Prefer this
+    over "Write content to a file" for changes to existing files.
+    
+    Two formats are accepted, covering any number of files:
+    - Unified diff (diff -u / git diff): '--- a/path', '+++ b/path', '@@ -l,n +l,n @@' hunks
+      ('--- /dev/null' creates a file, '+++ /dev/null' deletes it)
+    - SEARCH/REPLACE blocks, each preceded by a line with the file path:
+        src/app.py
+        <<<<<<< SEARCH
+        exact lines to find
+        =======
+        replacement lines
+        >>>>>>> REPLACE
+      (an empty SEARCH section creates a new file)
+    
+    Either every hunk applies or no file is changed. Hunks are matched near their
+    line numbers, may be found elsewhere in the file, and tolerate up to `fuzz`
+    mismatched context lines and trailing-whitespace differences.
+    
+    Args:
+        patch: Unified diff or SEARCH/REPLACE blocks
+        base_dir: Directory relative paths are resolved against (default: current directory)
+        fuzz: Context lines per hunk end that may be ignored when matching (default: 2)
+    
+    Returns:
+        Per-hunk result (line applied at, offset, fuzz) or the hunks that failed
+    """
+    try:
+        if any(_SEARCH_MARKER.match(line) for line in _patch_lines(patch)):
+            files = _parse_search_replace(patch)
+        else:
+            files = _parse_unified_diff(patch)
+        if not files or not any(hunks for _, _, hunks in files):
+            return "✗ Error: No hunks found. Use a unified diff or SEARCH/REPLACE blocks."
+        
+        # Compute every new file content in memory first
+        changes = {}  # path -> (original text or None, new text or None for deletion)
+        report, failures = [], []
+        hunk_count = sum(len(hunks) for _, _, hunks in files)
+        for old_name, new_name, hunks in files:
+            path = _resolve_patch_path(new_name or old_name, base_dir)
+            if path in changes:
+                original, current = changes[path]
+            else:
+                original = None
+                if path.is_file():
+                    with open(path, 'r', encoding='utf-8', newline='') as f:
+                        original = f.read()
+                current = original
+            if old_name is not None and original is None and \
+                    any(op != '+' for hunk in hunks for op, _ in hunk.ops):
+                failures.append(f"  {path}: file does not exist")
+                continue
+            if old_name is None and current:
+                failures.append(f"  {path}: file already exists")
+                continue
+            
+            text = current or ""
+            lines, eol = _split_lines(text)
+            trailing_newline = text.endswith('\n') or not text
+            results, offset = [], 0
+            for number, hunk in enumerate(hunks, 1):
+                hint = hunk.start - 1 + offset if hunk.start else 0
+                before = len(lines)
+                applied = _apply_hunk(lines, hunk, hint, max(fuzz, 0))
+                if applied is None:
+                    expected = next((t for op, t in hunk.ops if op != '+'), "")
+                    failures.append(f"  {path} hunk {number}: context not found"
+                                    f"{f' near line {hunk.start}' if hunk.start else ''}"
+                                    f" (first line: {expected.strip()[:60]!r})")
+                    continue
+                position, used, loose = applied
+                offset += len(lines) - before
+                notes = []
+                if hunk.start and position != hint:
+                    notes.append(f"offset {position - hint:+d}")
+                if used:
+                    notes.append(f"fuzz {used}")
+                if loose:
+                    notes.append("whitespace")
+                results.append(f"#{number} line {position + 1}" + (f" ({', '.join(notes)})" if notes else ""))
+            
+            if new_name is None:
+                changes[path] = (original, None)
+                results.append("deleted")
+            else:
+                changes[path] = (original, eol.join(lines) + (eol if lines and trailing_newline else ""))
+                if original is None:
+                    results.append("created")
+            report.append(f"  {path}: " + ", ".join(results))
+        
+        if failures:
+            return f"✗ Patch not applied ({len(failures)} of {hunk_count} hunks could not be applied; no files changed)\n" + \
+                   "\n".join(failures) + "\nRe-read the file and resend the failed hunks with exact context lines."
+        
+        # Write all files atomically; restore the originals if any write fails
+        written = []
+        try:
+            for path, (original, new_text) in changes.items():
+                if new_text is None:
+                    path.unlink()
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    atomic_write(path, new_text, newline='', sync_directory=False)
+                written.append(path)
+            fsync_directories(changes)
+        except Exception:
+            for path in written:
+                original = changes[path][0]
+                if original is None:
+                    path.unlink(missing_ok=True)
+                else:
+                    atomic_write(path, original, newline='')
+            raise
+        finally:
+            for path in changes:
+                _path_changed(path)
+        
+        return f"✓ Applied {hunk_count} hunks to {len(changes)} files\n" + "\n".join(report)
+        
+    except Exception as e:
+        return f"✗ Error applying patch: {str(e)}"
+
+
 @tool("Create a directory")
+@traced_tool
 def create_directory(directory_path: str, with_init: bool = False, 
                     init_content: str = "") -> str:
     """
@@ -245,6 +640,7 @@ def create_directory(directory_path: str, with_init: bool = False,
     try:
         path = Path(directory_path)
         path.mkdir(parents=True, exist_ok=True)
+        _path_changed(path)
         
         result = f"✓ Successfully created directory: {directory_path}"
         
@@ -255,14 +651,14 @@ def create_directory(directory_path: str, with_init: bool = False,
             
             if parent_has_py or '__pycache__' in str(directory_path):
                 init_file = path / '__init__.py'
-                with open(init_file, 'w', encoding='utf-8') as f:
-                    f.write(init_content if init_content else '"""Package initialization."""\n')
+                atomic_write(init_file, init_content if init_content else '"""Package initialization."""\n')
+                _path_changed(init_file)
                 result += f"\n  Created: __init__.py"
             else:
                 # For other languages, create index file
                 init_file = path / 'index.js'  # Default to JS
-                with open(init_file, 'w', encoding='utf-8') as f:
-                    f.write(init_content if init_content else '// Module exports\n')
+                atomic_write(init_file, init_content if init_content else '// Module exports\n')
+                _path_changed(init_file)
                 result += f"\n  Created: index.js"
         
         return result
@@ -272,9 +668,11 @@ def create_directory(directory_path: str, with_init: bool = False,
 
 
 @tool("List files in a directory")
+@traced_tool
 def list_directory(directory_path: str = ".", pattern: str = "*", 
                    recursive: bool = True, show_hidden: bool = False,
-                   categorize: bool = True, show_size: bool = True) -> str:
+                   categorize: bool = True, show_size: bool = True, include_ignored: bool = False,
+                   offset: int = 0) -> str:
     """
     Lists files and directories with advanced filtering and organization.
     
@@ -285,9 +683,13 @@ def list_directory(directory_path: str = ".", pattern: str = "*",
         show_hidden: Show hidden files (starting with .) (default: False)
         categorize: Group files by category (default: True)
         show_size: Show file sizes (default: True)
+        include_ignored: Also list paths excluded by .gitignore and dependency/cache
+            directories such as node_modules and venv (default: False)
+        offset: Index of the first item to show, from the previous page's footer (default: 0)
     
     Returns:
-        Formatted directory listing with stats or error message
+        Formatted directory listing with stats or error message (long listings are
+        paged; the footer gives the offset of the next page)
     """
     try:
         path = Path(directory_path)
@@ -298,102 +700,64 @@ def list_directory(directory_path: str = ".", pattern: str = "*",
         if not path.is_dir():
             return f"✗ Error: Not a directory: {directory_path}"
         
-        # Collect files
-        if recursive:
-            items = list(path.rglob(pattern))
-        else:
-            items = list(path.glob(pattern))
-        
-        # Filter hidden files
-        if not show_hidden:
-            items = [item for item in items if not any(part.startswith('.') for part in item.parts)]
+        # Collect files from the workspace index (hidden and ignored directories are not entered)
+        items = get_workspace_index(path).list(path, pattern, recursive, include_hidden=show_hidden,
+                                               include_ignored=include_ignored)
         
         # Separate files and directories
-        files = [item for item in items if item.is_file()]
-        dirs = [item for item in items if item.is_dir()]
+        files = [(relative, entry) for relative, entry in items if not entry.is_dir]
+        dirs = [relative for relative, entry in items if entry.is_dir]
         
         if not files and not dirs:
             return f"No items found in {directory_path}"
         
-        # Build output
-        output = f"Directory: {directory_path}\n"
-        output += f"Pattern: {pattern} | Recursive: {recursive}\n"
-        output += "═" * 70 + "\n\n"
-        
-        # Show directories first
-        if dirs:
-            output += f"📁 Directories ({len(dirs)}):\n"
-            output += "─" * 70 + "\n"
-            for d in sorted(dirs):
-                relative = d.relative_to(path)
-                output += f"  {relative}/\n"
-            output += "\n"
-        
-        # Categorize and show files
+        offset = max(offset, 0)
+        # Rows of (section header, line): directories first, then files
+        rows = [(f"📁 Directories ({len(dirs)}):\n" + "─" * 70 + "\n", f"  {relative}/\n") for relative in dirs]
+        total_size = sum(f.size for _, f in files)
         if categorize:
             # Group by category
             categorized = {}
-            for f in files:
-                cat = get_file_category(str(f))
-                if cat not in categorized:
-                    categorized[cat] = []
-                categorized[cat].append(f)
-            
-            # Display by category
-            total_size = 0
+            for relative, f in files:
+                categorized.setdefault(f.category, []).append((relative, f))
+            sections = []
             for category in sorted(categorized.keys()):
                 files_in_cat = categorized[category]
-                cat_size = sum(f.stat().st_size for f in files_in_cat)
-                total_size += cat_size
-                
-                output += f"📄 {category.upper()} ({len(files_in_cat)} files"
+                header = f"📄 {category.upper()} ({len(files_in_cat)} files"
                 if show_size:
-                    output += f", {format_file_size(cat_size)}"
-                output += "):\n"
-                output += "─" * 70 + "\n"
-                
-                for f in sorted(files_in_cat):
-                    relative = f.relative_to(path)
-                    output += f"  {relative}"
-                    if show_size:
-                        size = f.stat().st_size
-                        output += f" ({format_file_size(size)})"
-                    output += "\n"
-                output += "\n"
-            
-            # Summary
-            output += "═" * 70 + "\n"
-            output += f"Summary: {len(files)} files, {len(dirs)} directories"
-            if show_size:
-                output += f", {format_file_size(total_size)} total"
-            output += "\n"
+                    header += f", {format_file_size(sum(f.size for _, f in files_in_cat))}"
+                sections.append((header + "):\n" + "─" * 70 + "\n", files_in_cat))
         else:
-            # Simple listing
-            output += f"📄 Files ({len(files)}):\n"
-            output += "─" * 70 + "\n"
-            total_size = 0
-            for f in sorted(files):
-                relative = f.relative_to(path)
-                size = f.stat().st_size
-                total_size += size
-                output += f"  {relative}"
-                if show_size:
-                    output += f" ({format_file_size(size)})"
-                output += "\n"
-            
-            output += "\n═" * 70 + "\n"
-            output += f"Summary: {len(files)} files"
-            if show_size:
-                output += f", {format_file_size(total_size)} total"
-            output += "\n"
-        
-        return output
+            sections = [(f"📄 Files ({len(files)}):\n" + "─" * 70 + "\n", files)] if files else []
+        for header, section_files in sections:
+            rows.extend(
+                (header, f"  {relative} ({format_file_size(f.size)})\n" if show_size else f"  {relative}\n")
+                for relative, f in section_files
+            )
+        
+        # Build output (one page of rows)
+        output = PagedOutput()
+        output.write(f"Directory: {directory_path}\n")
+        output.write(f"Pattern: {pattern} | Recursive: {recursive}\n")
+        output.write("═" * 70 + "\n\n")
+        shown = output.rows(rows, offset)
+        output.continuation(offset, shown, len(rows))
+        
+        # Summary
+        output.write("═" * 70 + "\n")
+        output.write(f"Summary: {len(files)} files, {len(dirs)} directories")
+        if show_size:
+            output.write(f", {format_file_size(total_size)} total")
+        output.write("\n")
+        
+        return output.getvalue()
         
     except Exception as e:
         return f"✗ Error listing directory {directory_path}: {str(e)}"
 
 
 @tool("Copy file or directory")
+@traced_tool
 def copy_item(source: str, destination: str, overwrite: bool = False) -> str:
     """
     Copies a file or directory to a new location.
@@ -421,10 +785,12 @@ def copy_item(source: str, destination: str, overwrite: bool = False) -> str:
         
         if src.is_file():
             shutil.copy2(src, dst)
+            _path_changed(dst)
             size = dst.stat().st_size
             return f"✓ Successfully copied file: {source} → {destination}\n  Size: {format_file_size(size)}"
         else:
             shutil.copytree(src, dst, dirs_exist_ok=overwrite)
+            _path_changed(dst)
             # Count files
             file_count = sum(1 for _ in dst.rglob('*') if _.is_file())
             return f"✓ Successfully copied directory: {source} → {destination}\n  Files: {file_count}"
@@ -434,6 +800,7 @@ def copy_item(source: str, destination: str, overwrite: bool = False) -> str:
 
 
 @tool("Move or rename file/directory")
+@traced_tool
 def move_item(source: str, destination: str, overwrite: bool = False) -> str:
     """
     Moves or renames a file or directory.
@@ -467,6 +834,8 @@ def move_item(source: str, destination: str, overwrite: bool = False) -> str:
                 shutil.rmtree(dst)
         
         shutil.move(str(src), str(dst))
+        _path_changed(src)
+        _path_changed(dst)
         
         return f"✓ Successfully moved: {source} → {destination}"
         
@@ -475,6 +844,7 @@ def move_item(source: str, destination: str, overwrite: bool = False) -> str:
 
 
 @tool("Delete file or directory")
+@traced_tool
 def delete_item(path: str, recursive: bool = False, confirm: bool = True) -> str:
     """
     Deletes a file or directory.
@@ -505,6 +875,7 @@ def delete_item(path: str, recursive: bool = False, confirm: bool = True) -> str
         if item.is_file():
             size = item.stat().st_size
             item.unlink()
+            _path_changed(item)
             return f"✓ Successfully deleted file: {path}\n  Size freed: {format_file_size(size)}"
         elif item.is_dir():
             if not recursive:
@@ -515,6 +886,7 @@ def delete_item(path: str, recursive: bool = False, confirm: bool = True) -> str
             total_size = sum(f.stat().st_size for f in item.rglob('*') if f.is_file())
             
             shutil.rmtree(item)
+            _path_changed(item)
             return f"✓ Successfully deleted directory: {path}\n" \
                    f"  Files deleted: {file_count}\n" \
                    f"  Space freed: {format_file_size(total_size)}"
@@ -524,6 +896,7 @@ def delete_item(path: str, recursive: bool = False, confirm: bool = True) -> str
 
 
 @tool("Get file information")
+@traced_tool
 def get_file_info(file_path: str, detailed: bool = True) -> str:
     """
     Gets detailed information about a file.
@@ -537,31 +910,27 @@ def get_file_info(file_path: str, detailed: bool = True) -> str:
     """
     try:
         path = Path(file_path)
+        entry = get_workspace_index(path).get(path)
         
-        if not path.exists():
+        if entry is None:
             return f"✗ Error: File does not exist: {file_path}"
         
-        stat = path.stat()
+        stat = entry.stat
         
         output = f"File Information: {file_path}\n"
         output += "═" * 70 + "\n"
         
         # Basic info
-        output += f"Type: {'Directory' if path.is_dir() else 'File'}\n"
+        output += f"Type: {'Directory' if entry.is_dir else 'File'}\n"
         output += f"Size: {format_file_size(stat.st_size)}\n"
         
-        if path.is_file():
-            output += f"Category: {get_file_category(file_path)}\n"
+        if not entry.is_dir:
+            output += f"Category: {entry.category}\n"
             output += f"Extension: {path.suffix or 'None'}\n"
             
-            # Line count for text files
-            if not is_binary_file(file_path):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        line_count = len(f.readlines())
-                    output += f"Lines: {line_count}\n"
-                except:
-                    pass
+            # Line count for text files (cached until the file changes)
+            if not is_binary_file(file_path) and entry.line_count is not None:
+                output += f"Lines: {entry.line_count}\n"
         
         if detailed:
             output += f"\n📅 Timestamps:\n"
@@ -586,8 +955,10 @@ def get_file_info(file_path: str, detailed: bool = True) -> str:
 
 
 @tool("Search for files")
+@traced_tool
 def search_files(directory: str = ".", pattern: str = "*", content: Optional[str] = None,
-                 case_sensitive: bool = False, max_results: int = 100) -> str:
+                 case_sensitive: bool = False, max_results: int = 100, regex: bool = False,
+                 include_ignored: bool = False, offset: int = 0) -> str:
     """
     Searches for files by name pattern or content.
     
@@ -596,10 +967,15 @@ def search_files(directory: str = ".", pattern: str = "*", content: Optional[str
         pattern: Filename pattern (e.g., '*.py', 'test_*') (default: '*')
         content: Search for this text in file contents (optional)
         case_sensitive: Case-sensitive search (default: False)
-        max_results: Maximum number of results to return (default: 100)
+        max_results: Maximum number of files per page of results (default: 100)
+        regex: Treat content as a regular expression (default: False)
+        include_ignored: Also search paths excluded by .gitignore and dependency/cache
+            directories such as node_modules and venv (default: False)
+        offset: Index of the first file to show, from the previous page's footer (default: 0)
     
     Returns:
-        Search results with file paths and matches or error message
+        Search results with file paths and matches or error message (long results are
+        paged; the footer gives the offset of the next page)
     """
     try:
         path = Path(directory)
@@ -607,93 +983,81 @@ def search_files(directory: str = ".", pattern: str = "*", content: Optional[str
         if not path.exists():
             return f"✗ Error: Directory does not exist: {directory}"
         
-        # Search by filename
-        matches = []
-        for item in path.rglob(pattern):
-            if item.is_file():
-                # Filter hidden files
-                if not any(part.startswith('.') for part in item.parts):
-                    matches.append(item)
+        offset = max(offset, 0)
         
-        # Filter by content if specified
+        # Search by filename (hidden and ignored files and directories are skipped)
+        matches = [
+            (relative, entry)
+            for relative, entry in get_workspace_index(path).list(path, pattern, include_hidden=False,
+                                                                   include_ignored=include_ignored)
+            if not entry.is_dir
+        ]
+        
+        # Filter by content if specified (every filename match is searched; the
+        # trigram index skips files that cannot contain the term)
         if content:
-            content_matches = []
-            search_term = content if case_sensitive else content.lower()
-            
-            for file in matches[:max_results]:
-                if is_binary_file(str(file)):
-                    continue
-                
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        if not case_sensitive:
-                            file_content = file_content.lower()
-                        
-                        if search_term in file_content:
-                            # Find line numbers
-                            lines = file_content.splitlines()
-                            matching_lines = [
-                                (i + 1, line.strip()) 
-                                for i, line in enumerate(lines) 
-                                if search_term in (line if case_sensitive else line.lower())
-                            ]
-                            content_matches.append((file, matching_lines))
-                except:
-                    continue
+            text_files = [entry for relative, entry in matches if not is_binary_file(relative)]
+            relatives = {id(entry): relative for relative, entry in matches}
+            try:
+                found = get_content_index(path).search(text_files, content, regex, case_sensitive)
+            except re.error as e:
+                return f"✗ Error: Invalid regular expression '{content}': {str(e)}"
+            content_matches = [(relatives[id(entry)], lines) for entry, lines in found]
             
             # Format output for content search
             if not content_matches:
                 return f"No files found containing '{content}' in {directory}"
             
-            output = f"Content Search Results: '{content}'\n"
-            output += f"Directory: {directory} | Pattern: {pattern}\n"
-            output += f"Found {len(content_matches)} files\n"
-            output += "═" * 70 + "\n\n"
+            output = PagedOutput()
+            output.write(f"Content Search Results: '{content}'\n")
+            output.write(f"Directory: {directory} | Pattern: {pattern}\n")
+            output.write(f"Found {len(content_matches)} files\n")
+            output.write("═" * 70 + "\n\n")
             
-            for file, matching_lines in content_matches[:max_results]:
-                relative = file.relative_to(path)
-                output += f"📄 {relative} ({len(matching_lines)} matches)\n"
+            shown = 0
+            for relative, matching_lines in content_matches[offset:offset + max_results]:
+                block = [f"📄 {relative} ({len(matching_lines)} matches)\n"]
                 for line_no, line in matching_lines[:5]:  # Show first 5 matches per file
-                    output += f"  Line {line_no}: {line[:70]}...\n" if len(line) > 70 else f"  Line {line_no}: {line}\n"
+                    block.append(f"  Line {line_no}: {line[:70]}...\n" if len(line) > 70 else f"  Line {line_no}: {line}\n")
                 if len(matching_lines) > 5:
-                    output += f"  ... and {len(matching_lines) - 5} more matches\n"
-                output += "\n"
-            
-            if len(content_matches) > max_results:
-                output += f"... and {len(content_matches) - max_results} more files\n"
+                    block.append(f"  ... and {len(matching_lines) - 5} more matches\n")
+                block.append("\n")
+                if not output.item("".join(block)):
+                    break
+                shown += 1
+            output.continuation(offset, shown, len(content_matches), "files")
             
-            return output
+            return output.getvalue()
         
         # Format output for filename search
         if not matches:
             return f"No files found matching '{pattern}' in {directory}"
         
-        output = f"File Search Results: '{pattern}'\n"
-        output += f"Directory: {directory}\n"
-        output += f"Found {len(matches)} files\n"
-        output += "═" * 70 + "\n\n"
+        output = PagedOutput()
+        output.write(f"File Search Results: '{pattern}'\n")
+        output.write(f"Directory: {directory}\n")
+        output.write(f"Found {len(matches)} files\n")
+        output.write("═" * 70 + "\n\n")
         
-        total_size = 0
-        for file in matches[:max_results]:
-            relative = file.relative_to(path)
-            size = file.stat().st_size
-            total_size += size
-            category = get_file_category(str(file))
-            output += f"📄 {relative} ({format_file_size(size)}, {category})\n"
+        shown = 0
+        for relative, file in matches[offset:offset + max_results]:
+            if not output.item(f"📄 {relative} ({format_file_size(file.size)}, {file.category})\n"):
+                break
+            shown += 1
+        if offset + shown < len(matches):
+            output.write("\n")
+        output.continuation(offset, shown, len(matches), "files")
         
-        if len(matches) > max_results:
-            output += f"\n... and {len(matches) - max_results} more files\n"
+        output.write(f"\nTotal size: {format_file_size(sum(file.size for _, file in matches))}\n")
         
-        output += f"\nTotal size: {format_file_size(total_size)}\n"
-        
-        return output
+        return output.getvalue()
         
     except Exception as e:
         return f"✗ Error searching files: {str(e)}"
 
 
 @tool("Create file from template")
+@traced_tool
 def create_from_template(template_path: str, output_path: str, 
                         replacements: Dict[str, str] = None) -> str:
     """
@@ -724,8 +1088,8 @@ def create_from_template(template_path: str, output_path: str,
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output, 'w', encoding='utf-8') as f:
-            f.write(content)
+        atomic_write(output, content)
+        _path_changed(output)
         
         size = output.stat().st_size
         return f"✓ Successfully created file from template\n" \
@@ -0,0 +1,120 @@
+"""
+File type lookup shared by the file tools and code execution.
+
+FILE_CATEGORIES, BINARY_EXTENSIONS and the extensions in LANGUAGE_CONFIG are
+compiled once at import into frozen tables, so classifying a file (category,
+language, binary or not) is a suffix split and one dict lookup instead of a
+scan over every category and language. _category() is the scan the tables are
+built from; `python -m tools.file_types_benchmark` times both on a 100k-file tree.
+"""
+import os
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from .code_execution import LANGUAGE_CONFIG
+
+
+# File type categorization
+FILE_CATEGORIES = {
+    'source_code': {
+        'python': ['.py', '.pyw', '.pyx'],
+        'javascript': ['.js', '.mjs', '.cjs'],
+        'typescript': ['.ts', '.tsx'],
+        'java': ['.java'],
+        'csharp': ['.cs', '.cshtml', '.razor'],
+        'go': ['.go'],
+        'rust': ['.rs'],
+        'cpp': ['.cpp', '.cc', '.cxx', '.h', '.hpp'],
+        'c': ['.c', '.h'],
+        'ruby': ['.rb'],
+        'php': ['.php'],
+        'swift': ['.swift'],
+        'kotlin': ['.kt', '.kts'],
+        'scala': ['.scala'],
+        'r': ['.r', '.R'],
+        'matlab': ['.m'],
+        'shell': ['.sh', '.bash', '.zsh', '.fish'],
+        'powershell': ['.ps1', '.psm1'],
+    },
+    'markup': ['.html', '.htm', '.xml', '.svg'],
+    'styling': ['.css', '.scss', '.sass', '.less', '.styl'],
+    'data': ['.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf'],
+    'documentation': ['.md', '.rst', '.txt', '.adoc', '.tex'],
+    'database': ['.sql', '.db', '.sqlite', '.sqlite3'],
+    'config': ['.env', '.gitignore', '.dockerignore', '.editorconfig'],
+    'build': ['Makefile', 'Dockerfile', 'docker-compose.yml', '.gitlab-ci.yml'],
+    'package': ['package.json', 'requirements.txt', 'Cargo.toml', 'go.mod', 'pom.xml', 'build.gradle'],
+}
+
+# Binary file extensions that should not be read as text
+BINARY_EXTENSIONS = {
+    '.pyc', '.pyo', '.so', '.dll', '.exe', '.bin', '.dat',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg',
+    '.mp3', '.mp4', '.avi', '.mov', '.wav',
+    '.zip', '.tar', '.gz', '.bz2', '.7z', '.rar',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.class', '.jar', '.war', '.ear',
+    '.wasm', '.o', '.a', '.lib'
+}
+
+
+class FileType(NamedTuple):
+    category: str
+    # LANGUAGE_CONFIG key (None when code_execution has no tooling for it)
+    language: Optional[str]
+    binary: bool
+
+
+def _suffix(name: str) -> str:
+    """Path(name).suffix without building a Path"""
+    i = name.rfind('.')
+    return name[i:] if 0 < i < len(name) - 1 else ''
+
+
+def _category(ext: str, name: Optional[str] = None) -> str:
+    """First category in FILE_CATEGORIES order matching ext (source code) or ext/name (the rest)"""
+    for lang, extensions in FILE_CATEGORIES['source_code'].items():
+        if ext in extensions:
+            return f'source_code/{lang}'
+    for category, extensions in FILE_CATEGORIES.items():
+        if category != 'source_code':
+            if ext in extensions or name in extensions:
+                return category
+    return 'other'
+
+
+def _language(ext: str) -> Optional[str]:
+    for lang, config in LANGUAGE_CONFIG.items():
+        if ext in config['extensions']:
+            return lang
+    return None
+
+
+def _file_type(ext: str, name: Optional[str] = None) -> FileType:
+    return FileType(_category(ext, name), _language(ext), ext in BINARY_EXTENSIONS)
+
+
+def _build_tables():
+    listed = [entry for extensions in FILE_CATEGORIES['source_code'].values() for entry in extensions]
+    named = [entry for category, entries in FILE_CATEGORIES.items() if category != 'source_code' for entry in entries]
+    listed += named + list(BINARY_EXTENSIONS)
+    listed += [ext for config in LANGUAGE_CONFIG.values() for ext in config['extensions']]
+    # Suffixes are lowercased before lookup, so only lowercase keys can match
+    by_ext = {ext: _file_type(ext) for ext in {entry.lower() for entry in listed if entry.startswith('.')}}
+    # Names listed in a non-source category match the whole file name (Makefile, package.json, .env)
+    by_name = {name: _file_type(_suffix(name).lower(), name) for name in named}
+    return MappingProxyType(by_ext), MappingProxyType(by_name)
+
+
+# Lowercased extension -> type, and exact file name -> type (checked first)
+FILE_TYPES, FILE_NAME_TYPES = _build_tables()
+UNKNOWN_FILE_TYPE = FileType('other', None, False)
+
+
+def file_type(file_path) -> FileType:
+    """Category, language and binary flag of a file, from its name"""
+    name = os.path.basename(os.fspath(file_path).rstrip('/\\'))
+    by_name = FILE_NAME_TYPES.get(name)
+    if by_name is not None:
+        return by_name
+    return FILE_TYPES.get(_suffix(name).lower(), UNKNOWN_FILE_TYPE)
+
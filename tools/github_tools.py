@@ -4,7 +4,9 @@ from pathlib import Path
 from typing import List
 from datetime import datetime
 from crewai.tools import tool
+from tracing import traced_tool
 from config import GITHUB_TOKEN, GITHUB_USERNAME
+from .workspace_index import get_workspace_index
 
 
 # Comprehensive .gitignore templates by language/framework
@@ -389,6 +391,7 @@ temp/
 
 
 @tool("Create GitHub repository")
+@traced_tool
 def create_github_repo(repo_name: str, description: str = "", private: bool = False,
                        has_issues: bool = True, has_wiki: bool = False,
                        has_projects: bool = False, auto_init: bool = False,
@@ -448,6 +451,7 @@ def create_github_repo(repo_name: str, description: str = "", private: bool = Fa
 
 
 @tool("Initialize Git repository")
+@traced_tool
 def init_git(directory: str, initial_branch: str = "main",
              create_gitignore: bool = False, project_type: str = None) -> str:
     """
@@ -524,6 +528,7 @@ def init_git(directory: str, initial_branch: str = "main",
 
 
 @tool("Add and commit changes")
+@traced_tool
 def commit_changes(directory: str, message: str, add_all: bool = True,
                   files: List[str] = None) -> str:
     """
@@ -642,6 +647,7 @@ def commit_changes(directory: str, message: str, add_all: bool = True,
 
 # Also update the deploy_to_github function with better error handling:
 @tool("Complete GitHub deployment")
+@traced_tool
 def deploy_to_github(directory: str, repo_name: str, description: str = "",
                     commit_message: str = "Initial commit", private: bool = False,
                     branch: str = "main", create_readme: bool = False,
@@ -853,6 +859,7 @@ def deploy_to_github(directory: str, repo_name: str, description: str = "",
 
 
 @tool("Push to remote repository")
+@traced_tool
 def push_to_remote(directory: str, remote: str = "origin", branch: str = None,
                   force: bool = False, set_upstream: bool = True) -> str:
     """
@@ -919,6 +926,7 @@ def push_to_remote(directory: str, remote: str = "origin", branch: str = None,
 
 
 @tool("Add remote repository")
+@traced_tool
 def add_remote(directory: str, name: str, url: str, fetch: bool = False) -> str:
     """
     Adds a remote repository.
@@ -960,6 +968,7 @@ def add_remote(directory: str, name: str, url: str, fetch: bool = False) -> str:
 
 
 @tool("Create and push tag")
+@traced_tool
 def create_tag(directory: str, tag_name: str, message: str = None,
               push: bool = True, remote: str = "origin") -> str:
     """
@@ -1007,6 +1016,7 @@ def create_tag(directory: str, tag_name: str, message: str = None,
 
 
 @tool("Get repository status")
+@traced_tool
 def get_repo_status(directory: str, verbose: bool = True) -> str:
     """
     Gets the status of a Git repository.
@@ -1111,6 +1121,7 @@ def get_repo_status(directory: str, verbose: bool = True) -> str:
         return f"✗ Error getting repository status: {str(e)}"
 
 @tool("Clone GitHub repository")
+@traced_tool
 def clone_repository(repo_url: str, local_path: str, branch: str = "main") -> str:
     """
     Clones a GitHub repository to local directory.
@@ -1148,9 +1159,8 @@ def clone_repository(repo_url: str, local_path: str, branch: str = "main") -> st
         output += f"Branch: {branch}\n"
         output += f"Remote: {repo.remote().url}\n"
         
-        # List files
-        files = list(local_path.rglob("*"))
-        file_count = len([f for f in files if f.is_file()])
+        # Count files (.git and ignored paths are skipped)
+        file_count = sum(1 for _, entry in get_workspace_index(local_path).list(local_path) if not entry.is_dir)
         output += f"Files: {file_count}\n"
         
         return output
@@ -0,0 +1,146 @@
+"""
+.gitignore matching for the tools that enumerate project files.
+
+The workspace index prunes ignored directories while it walks, so generated
+trees (node_modules, virtualenvs, build output, coverage reports) are never
+listed, searched or indexed. Rules come from every .gitignore between the
+project root and the listed directory; a project without a .gitignore of its
+own uses the template deploy_to_github would write for it
+(GITIGNORE_TEMPLATES). HEAVY_DIRS are skipped whatever the rules say.
+"""
+import os
+import re
+import functools
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+# Directories never walked into, with or without a .gitignore
+HEAVY_DIRS = frozenset({
+    '.git', '.hg', '.svn', '.agent_state', 'node_modules', 'bower_components', '__pycache__',
+    '.venv', 'venv', '.tox', '.nox', '.eggs', '.pytest_cache', '.mypy_cache', '.ruff_cache',
+    'htmlcov', '.gradle', '.next', '.nuxt', '.terraform',
+})
+
+GITIGNORE_NAME = '.gitignore'
+
+
+def _translate(pattern: str) -> str:
+    """Regex for one gitignore glob ('*' and '?' stop at '/', '**' crosses directories)"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i) and i + 2 == n and (i == 0 or pattern[i - 1] == '/'):
+            out.append('.*')
+            break
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def _compile_rule(line: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+    """(regex, negated, directories only) for one .gitignore line (None for blanks and comments)"""
+    if not line.endswith('\\ '):
+        line = line.rstrip()
+    if not line or line.startswith('#'):
+        return None
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the .gitignore's directory
+    anchored = '/' in line
+    body = _translate(line.lstrip('/'))
+    return re.compile(('' if anchored else '(?:.*/)?') + body + '$'), negate, dir_only
+
+
+class GitIgnore:
+    """Patterns of one .gitignore, matched against '/'-separated paths relative to its directory"""
+
+    def __init__(self, text: str):
+        self.rules = [rule for rule in map(_compile_rule, text.splitlines()) if rule is not None]
+        self.negations = any(negate for _, negate, _ in self.rules)
+        # Without '!' patterns the last match cannot be undone, so one combined regex decides
+        self._any = self._combine(lambda dir_only: True)
+        self._any_file = self._combine(lambda dir_only: not dir_only)
+
+    def _combine(self, applies):
+        patterns = [regex.pattern for regex, negate, dir_only in self.rules if not negate and applies(dir_only)]
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)) if patterns else None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a '!' pattern, None if no pattern applies"""
+        if not self.negations:
+            combined = self._any if is_dir else self._any_file
+            return True if combined is not None and combined.match(path) else None
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if (is_dir or not dir_only) and regex.match(path):
+                result = not negate
+        return result
+
+
+@functools.lru_cache(maxsize=64)
+def parse_gitignore(text: str) -> GitIgnore:
+    return GitIgnore(text)
+
+
+@functools.lru_cache(maxsize=256)
+def load_gitignore(path: str, mtime_ns: int, size: int) -> Optional[GitIgnore]:
+    """Rules of a .gitignore file (cached per file version; None if unreadable)"""
+    try:
+        return parse_gitignore(Path(path).read_text(encoding='utf-8', errors='replace'))
+    except OSError:
+        return None
+
+
+def template_gitignore(root: Path) -> GitIgnore:
+    """Rules of the .gitignore template for the project type detected at root"""
+    from .github_tools import detect_project_type, generate_gitignore
+    return parse_gitignore(generate_gitignore(detect_project_type(str(root))))
+
+
+# Rules in effect for a directory: (directory relative to the index root, rules), outermost first
+RuleStack = Tuple[Tuple[str, GitIgnore], ...]
+
+
+def is_ignored(rules: RuleStack, relative: str, name: str, is_dir: bool) -> bool:
+    """Whether a path (relative to the index root, os.sep-separated) is excluded by rules or HEAVY_DIRS"""
+    if is_dir and name in HEAVY_DIRS:
+        return True
+    ignored = False
+    for base, gitignore in rules:
+        path = relative[len(base) + 1:] if base else relative
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        verdict = gitignore.match(path, is_dir)
+        if verdict is not None:
+            ignored = verdict
+    return ignored
+
@@ -0,0 +1,209 @@
+"""
+Subprocess runner with bounded output.
+
+subprocess.run(capture_output=True) keeps everything a program prints, so a
+chatty program could hold hundreds of MB in memory and hand all of it to the
+LLM. run_process reads stdout and stderr while the program runs and keeps
+only the first PROCESS_OUTPUT_HEAD_BYTES and the last PROCESS_OUTPUT_TAIL_BYTES
+of each (where errors and test summaries are), counting what was dropped. It
+can also stop the program early once its output matches a pattern (the first
+traceback, a failing test), after a short grace period so the match is
+printed in full.
+"""
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+from config import PROCESS_OUTPUT_HEAD_BYTES, PROCESS_OUTPUT_TAIL_BYTES
+from tracing import subprocess_span
+
+
+# Bytes per read from a pipe
+READ_CHUNK = 64 * 1024
+# Seconds the program keeps running after stop_on matched (so a traceback finishes printing)
+STOP_GRACE_SECONDS = 0.5
+# Seconds to wait for output after the program exits (background children may keep the pipes open)
+DRAIN_SECONDS = 2.0
+# Output kept around a chunk boundary so stop_on can match text split across reads
+STOP_WINDOW_BYTES = 4096
+
+
+class OutputBuffer:
+    """First head_bytes and last tail_bytes of a stream, and its total size"""
+
+    def __init__(self, head_bytes: int = PROCESS_OUTPUT_HEAD_BYTES, tail_bytes: int = PROCESS_OUTPUT_TAIL_BYTES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_bytes:
+            self.tail += data
+            # Trimmed in batches, so each byte is moved a bounded number of times
+            if len(self.tail) > 2 * self.tail_bytes:
+                del self.tail[:-self.tail_bytes]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - min(len(self.tail), self.tail_bytes)
+
+    def text(self) -> str:
+        """Kept output, with a marker where bytes were dropped"""
+        head = bytes(self.head)
+        tail = bytes(self.tail[-self.tail_bytes:]) if self.tail_bytes else b''
+        if not self.omitted:
+            return (head + tail).decode('utf-8', errors='replace').replace('\r\n', '\n')
+        # Cut at whole UTF-8 characters, so a character split by the cut is dropped, not shown as U+FFFD
+        kept_head, kept_tail = _whole_chars_head(head), _whole_chars_tail(tail)
+        omitted = self.omitted + len(head) - len(kept_head) + len(tail) - len(kept_tail)
+        return (kept_head.decode('utf-8', errors='replace') + f"\n... [{omitted:,} bytes omitted] ...\n"
+                + kept_tail.decode('utf-8', errors='replace')).replace('\r\n', '\n')
+
+
+def _whole_chars_head(data: bytes) -> bytes:
+    """data without a UTF-8 sequence left incomplete at its end"""
+    start = len(data) - 1
+    while start >= max(len(data) - 4, 0) and 0x80 <= data[start] < 0xC0:
+        start -= 1
+    if start < 0 or data[start] < 0xC0:
+        return data
+    length = 2 if data[start] < 0xE0 else 3 if data[start] < 0xF0 else 4
+    return data[:start] if len(data) - start < length else data
+
+
+def _whole_chars_tail(data: bytes) -> bytes:
+    """data without the continuation bytes of a UTF-8 sequence begun before it"""
+    start = 0
+    while start < min(len(data), 3) and 0x80 <= data[start] < 0xC0:
+        start += 1
+    return data[start:]
+
+
+def read_bounded(path: str) -> OutputBuffer:
+    """A file's content through an OutputBuffer"""
+    buffer = OutputBuffer()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            buffer.feed(chunk)
+    return buffer
+
+
+class ProcessResult(subprocess.CompletedProcess):
+    """CompletedProcess with the size of each stream and why the program was stopped"""
+
+    def __init__(self, args: Any, returncode: int, stdout: OutputBuffer, stderr: OutputBuffer,
+                 stopped_on: Optional[str] = None):
+        super().__init__(args, returncode, stdout.text(), stderr.text())
+        self.stdout_bytes = stdout.total
+        self.stderr_bytes = stderr.total
+        self.omitted_bytes = stdout.omitted + stderr.omitted
+        # Output that matched stop_on (the program was killed after it)
+        self.stopped_on = stopped_on
+
+    def notes(self) -> str:
+        """Lines telling the reader the output is partial ("" when it is not)"""
+        output = ""
+        if self.stopped_on is not None:
+            output += f"⚠ Stopped early: output matched {self.stopped_on!r}\n"
+        if self.omitted_bytes:
+            output += (f"⚠ Output truncated: {self.omitted_bytes:,} of {self.stdout_bytes + self.stderr_bytes:,} "
+                       f"bytes omitted (first and last part of each stream kept)\n")
+        return output
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """Kill the program and, on POSIX, everything it started"""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        try:
+            process.kill()
+        except OSError:
+            pass
+
+
+def _reader(stream, buffer: OutputBuffer, pattern: Optional['re.Pattern'], matched: List[Tuple[float, str]]) -> None:
+    window = b''
+    for chunk in iter(lambda: stream.read1(READ_CHUNK), b''):
+        buffer.feed(chunk)
+        if pattern is not None and not matched:
+            window = window[-STOP_WINDOW_BYTES:] + chunk
+            match = pattern.search(window)
+            if match:
+                matched.append((time.monotonic(), match.group(0).decode('utf-8', errors='replace')))
+                window = b''
+    stream.close()
+
+
+def run_process(args: Any, cwd=None, timeout: Optional[float] = None, shell: bool = False,
+                env: Optional[dict] = None, stop_on: Optional[str] = None) -> ProcessResult:
+    """
+    Run a program like subprocess.run(args, capture_output=True, text=True),
+    keeping bounded output. stdin is empty. Raises subprocess.TimeoutExpired
+    (after killing the program) like subprocess.run.
+
+    Args:
+        stop_on: Regular expression; the program is killed STOP_GRACE_SECONDS
+                 after its stdout or stderr first matches it
+    """
+    pattern = re.compile(stop_on.encode('utf-8'), re.MULTILINE) if stop_on else None
+    with subprocess_span(args) as s:
+        process = subprocess.Popen(
+            args, cwd=cwd, shell=shell, env=env, stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=(os.name == 'posix')
+        )
+        buffers = (OutputBuffer(), OutputBuffer())
+        matched: List[Tuple[float, str]] = []
+        readers = [threading.Thread(target=_reader, args=(stream, buffer, pattern, matched), daemon=True)
+                   for stream, buffer in zip((process.stdout, process.stderr), buffers)]
+        for reader in readers:
+            reader.start()
+
+        deadline = time.monotonic() + timeout if timeout else None
+        stopped_on = None
+        while True:
+            try:
+                process.wait(timeout=0.05)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if matched and now >= matched[0][0] + STOP_GRACE_SECONDS:
+                stopped_on = matched[0][1]
+                _kill(process)
+                process.wait()
+                break
+            if deadline is not None and now >= deadline:
+                _kill(process)
+                process.wait()
+                for reader in readers:
+                    reader.join(DRAIN_SECONDS)
+                raise subprocess.TimeoutExpired(args, timeout, output=buffers[0].text(), stderr=buffers[1].text())
+
+        drain_until = time.monotonic() + DRAIN_SECONDS
+        for reader in readers:
+            reader.join(max(drain_until - time.monotonic(), 0))
+        if any(reader.is_alive() for reader in readers):
+            # Background children still hold the pipes: stop them and keep what was read
+            _kill(process)
+
+        result = ProcessResult(args, process.returncode, *buffers, stopped_on=stopped_on)
+        s.set(returncode=result.returncode)
+        if result.stdout_bytes or result.stderr_bytes:
+            s.add(output_bytes=result.stdout_bytes + result.stderr_bytes)
+        if result.omitted_bytes:
+            s.add(omitted_bytes=result.omitted_bytes)
+        return result
@@ -0,0 +1,295 @@
+"""
+Warm interpreters for running Python scripts.
+
+execute_code used to pay interpreter startup plus the project's imports on
+every run. A pool keeps warm_python_server.py processes running per (project
+interpreter, project root), with the third-party modules the project imports
+already loaded. Each run is forked from one of them, so the script still
+gets a fresh process (its own sys.modules, globals and exit) but starts in
+milliseconds. Servers are restarted when the interpreter, its site-packages
+or the project's dependency files change. Only available where os.fork is;
+a server that cannot finish its preload within the run's timeout, or a project
+importing a library that is unsafe to fork, makes the caller run the script in
+a new process until the dependencies change.
+"""
+import ast
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from config import PYTHON_WARM_POOL_ENABLED, PYTHON_WARM_POOL_SIZE
+from tracing import subprocess_span
+from .process_runner import ProcessResult, read_bounded
+from .workspace_index import get_workspace_index, project_root
+
+
+SERVER_SCRIPT = Path(__file__).with_name('warm_python_server.py')
+
+# Files whose change means the project's dependencies (and so the preload) changed
+DEPENDENCY_FILES = ('requirements.txt', 'pyproject.toml', 'setup.py', 'setup.cfg', 'Pipfile.lock', 'poetry.lock')
+
+# Virtualenv directory names checked at the project root
+VENV_DIRS = ('.venv', 'venv', 'env')
+
+# Seconds a server may take to import the preload list (at most the run's own timeout)
+WARM_START_TIMEOUT = 120
+
+# Modules whose threads make a forked child hang or crash: projects importing them run cold
+FORK_UNSAFE_MODULES = frozenset({'torch', 'tensorflow', 'jax', 'grpc'})
+# Largest file parsed for imports, and most modules preloaded
+MAX_SCANNED_FILE_BYTES = 1024 * 1024
+MAX_PRELOAD_MODULES = 200
+
+
+def project_python(path) -> str:
+    """The interpreter of the project's virtualenv, else the one running the agent"""
+    root = project_root(Path(os.path.abspath(path)))
+    for name in VENV_DIRS:
+        for candidate in (root / name / 'bin' / 'python', root / name / 'Scripts' / 'python.exe'):
+            if candidate.is_file():
+                return str(candidate)
+    return sys.executable
+
+
+def preload_modules(root: Path) -> List[str]:
+    """Top-level modules the project's Python files import, minus the project's own"""
+    local: Set[str] = set()
+    imported: Set[str] = set()
+    for _, entry in get_workspace_index(root).list(root, include_hidden=False):
+        if entry.is_dir:
+            local.add(entry.path.name)
+            continue
+        if entry.path.suffix != '.py':
+            continue
+        local.add(entry.path.stem)
+        try:
+            if entry.path.stat().st_size > MAX_SCANNED_FILE_BYTES:
+                continue
+            tree = ast.parse(entry.path.read_bytes())
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                imported.add(node.module.split('.')[0])
+    imported -= local | {'__future__', '__main__'}
+    return sorted(imported)[:MAX_PRELOAD_MODULES]
+
+
+def _signature(paths: List[Path]) -> Tuple[int, ...]:
+    stamps = []
+    for path in paths:
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamps.append(0)
+    return tuple(stamps)
+
+
+class WarmStartError(OSError):
+    """No warm interpreter can run the script: callers run it in a new process instead"""
+
+
+class WarmInterpreter:
+    """One warm_python_server.py process; runs one script at a time"""
+
+    def __init__(self, python: str, root: Path, modules: List[str], start_timeout: float = WARM_START_TIMEOUT):
+        self.python = python
+        self.process = subprocess.Popen(
+            [python, str(SERVER_SCRIPT)], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, cwd=root, bufsize=0
+        )
+        try:
+            self._send(preload=modules)
+            self.site_dirs = [Path(path) for path in self._receive(start_timeout).get('site', [])]
+        except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+            self.process.kill()
+            raise WarmStartError(f"warm interpreter did not start: {e}") from e
+        except BaseException:
+            self.process.kill()
+            raise
+
+    def _send(self, **message) -> None:
+        self.process.stdin.write((json.dumps(message) + "\n").encode('utf-8'))
+
+    def _receive(self, timeout: Optional[float] = None) -> dict:
+        if timeout is not None:
+            ready, _, _ = select.select([self.process.stdout], [], [], max(timeout, 0))
+            if not ready:
+                raise subprocess.TimeoutExpired(SERVER_SCRIPT.name, timeout)
+        line = self.process.stdout.readline()
+        if not line:
+            raise OSError("warm interpreter exited")
+        return json.loads(line)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, script: str, args: List[str], cwd: Path, timeout: float) -> ProcessResult:
+        """Run script in a child forked from this interpreter (killed after timeout)"""
+        outputs = []
+        try:
+            for _ in range(2):
+                fd, path = tempfile.mkstemp(prefix='warm_python_', suffix='.out')
+                os.close(fd)
+                outputs.append(path)
+            self._send(script=script, args=args, cwd=str(cwd), stdout=outputs[0], stderr=outputs[1])
+            pid = self._receive(WARM_START_TIMEOUT)['pid']
+            try:
+                returncode = self._receive(timeout)['returncode']
+            except subprocess.TimeoutExpired:
+                # The child leads its own process group: take its children with it
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                self._receive(WARM_START_TIMEOUT)
+                raise subprocess.TimeoutExpired([self.python, script] + args, timeout)
+            return ProcessResult([self.python, script] + args, returncode, *(read_bounded(path) for path in outputs))
+        finally:
+            for path in outputs:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+
+class WarmPool:
+    """Up to PYTHON_WARM_POOL_SIZE warm interpreters for one project interpreter"""
+
+    def __init__(self, python: str, root: Path, size: int = PYTHON_WARM_POOL_SIZE):
+        self.python = python
+        self.root = root
+        self.size = max(size, 1)
+        self._idle: List[WarmInterpreter] = []
+        self._started = 0
+        self._signature: Optional[Tuple[int, ...]] = None
+        self._watched: List[Path] = []
+        # Signature of the dependencies a server failed to start with (cold runs until it changes)
+        self._failed: Optional[Tuple[int, ...]] = None
+        self._condition = threading.Condition()
+
+    def _current_signature(self) -> Tuple[int, ...]:
+        return _signature([Path(self.python)] + [self.root / name for name in DEPENDENCY_FILES] + self._watched)
+
+    def _acquire(self, start_timeout: float) -> WarmInterpreter:
+        with self._condition:
+            if self._signature is not None and self._current_signature() != self._signature:
+                # Dependencies changed: idle servers hold stale imports
+                self._discard_idle()
+                self._signature = None
+            if self._failed is not None:
+                if self._failed == self._current_signature():
+                    raise WarmStartError("warm interpreter unavailable for this project")
+                self._failed = None
+            while not self._idle and self._started >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            modules = preload_modules(self.root)
+            unsafe = FORK_UNSAFE_MODULES.intersection(modules)
+            if unsafe:
+                raise WarmStartError(f"{', '.join(sorted(unsafe))} cannot be used from a forked interpreter")
+            interpreter = WarmInterpreter(self.python, self.root, modules, min(start_timeout, WARM_START_TIMEOUT))
+        except BaseException as e:
+            with self._condition:
+                self._started -= 1
+                if isinstance(e, WarmStartError):
+                    self._failed = self._current_signature()
+                self._condition.notify()
+            raise
+        with self._condition:
+            if self._signature is None:
+                self._watched = interpreter.site_dirs
+                self._signature = self._current_signature()
+        return interpreter
+
+    def _release(self, interpreter: WarmInterpreter, reuse: bool) -> None:
+        with self._condition:
+            if reuse and interpreter.alive() and self._signature == self._current_signature():
+                self._idle.append(interpreter)
+            else:
+                self._started -= 1
+                interpreter.close()
+            self._condition.notify()
+
+    def _discard_idle(self) -> None:
+        for interpreter in self._idle:
+            self._started -= 1
+            interpreter.close()
+        self._idle = []
+
+    def run(self, script: str, args: List[str], cwd: Path, timeout: float) -> ProcessResult:
+        interpreter = self._acquire(timeout)
+        reuse = False
+        try:
+            result = interpreter.run(script, args, cwd, timeout)
+            reuse = True
+            return result
+        except subprocess.TimeoutExpired:
+            reuse = True
+            raise
+        finally:
+            self._release(interpreter, reuse)
+
+    def close(self) -> None:
+        with self._condition:
+            self._discard_idle()
+
+
+_pools: Dict[Tuple[str, Path], WarmPool] = {}
+_pools_lock = threading.Lock()
+
+
+def warm_pool_available() -> bool:
+    return PYTHON_WARM_POOL_ENABLED and hasattr(os, 'fork')
+
+
+def run_python(script: str, args: List[str], timeout: float, python: Optional[str] = None) -> ProcessResult:
+    """
+    Run a Python script like `python script args` from its directory, forked
+    from a warm interpreter of its project (python defaults to project_python).
+    Output is bounded like run_process; raises subprocess.TimeoutExpired like
+    subprocess.run, and WarmStartError when no warm interpreter can be started
+    (the script has not run: run it in a new process).
+    """
+    script = os.path.abspath(script)
+    cwd = Path(script).parent
+    python = python or project_python(cwd)
+    root = project_root(cwd)
+    with _pools_lock:
+        pool = _pools.get((python, root))
+        if pool is None:
+            pool = _pools[(python, root)] = WarmPool(python, root)
+    with subprocess_span([python, script] + args, warm=True) as s:
+        result = pool.run(script, args, cwd, timeout)
+        s.set(returncode=result.returncode)
+        if result.stdout_bytes or result.stderr_bytes:
+            s.add(output_bytes=result.stdout_bytes + result.stderr_bytes)
+        if result.omitted_bytes:
+            s.add(omitted_bytes=result.omitted_bytes)
+        return result
+
+
+def close_pools() -> None:
+    """Stop every warm interpreter (they also exit with the agent, when their stdin closes)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,375 @@
+"""
+Content-addressed cache of per-file checker results (syntax, lint, formatting).
+
+A result is keyed by (tool, tool version, config hash, SHA-256 of the file), so
+it stays valid for as long as the file, the checker binary, its command line
+and the project's checker config files (CONFIG_FILES) are unchanged, in this
+run or a later one. run_cached() hands only the files without a cached result
+to the checker; lint_files() and format_files() wrap it for linters and
+formatters that take file arguments. Results are None for a clean file or the
+problem text; the file's path in stored text is replaced by a placeholder, so a
+result also applies to identical content at another path.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from config import TOOL_RESULT_CACHE_ENABLED, TOOL_RESULT_CACHE_DIR, TOOL_RESULT_CACHE_MAX_ENTRIES
+from tracing import traced_run
+from .toolchains import get_toolchains
+from .workspace_index import project_root
+
+
+# Files that change how a checker treats source files, looked up from the checked
+# directory up to the project root
+CONFIG_FILES = (
+    'setup.cfg', 'tox.ini', '.flake8', 'pyproject.toml', '.pylintrc', 'mypy.ini',
+    'package.json', 'tsconfig.json', '.editorconfig',
+    '.eslintrc', '.eslintrc.js', '.eslintrc.cjs', '.eslintrc.json', '.eslintrc.yml', '.eslintrc.yaml',
+    'eslint.config.js', 'eslint.config.mjs', 'eslint.config.cjs',
+    '.prettierrc', '.prettierrc.json', '.prettierrc.js', '.prettierrc.yml', 'prettier.config.js',
+    '.rubocop.yml', '.stylelintrc', '.stylelintrc.json', '.yamllint', '.shellcheckrc', '.markdownlint.json',
+)
+
+PATH_PLACEHOLDER = "\x00path\x00"
+
+# Keys per SELECT (below SQLite's bound-parameter limit)
+_QUERY_CHUNK = 500
+
+# Paths per checker invocation, and bytes of path arguments (well below ARG_MAX
+# and the 32K-character Windows command line)
+ARGUMENT_CHUNK_FILES = 200
+ARGUMENT_CHUNK_BYTES = 24 * 1024
+
+
+class ResultCache:
+    """(tool, version, config, content hash) -> JSON result, in SQLite with LRU eviction"""
+
+    def __init__(self, cache_dir: Path, max_entries: int):
+        self.path = Path(cache_dir) / "results.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                   key TEXT PRIMARY KEY,
+                   tool TEXT,
+                   value TEXT NOT NULL,
+                   last_used REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(tool: str, version: str, config: str, content_hash: str) -> str:
+        return hashlib.sha256(f"{tool}\0{version}\0{config}\0{content_hash}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Cached values of the keys that have one (refreshing their LRU position)"""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = list(keys[i:i + _QUERY_CHUNK])
+                marks = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, value FROM results WHERE key IN ({marks})", chunk
+                ).fetchall())
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE results SET last_used = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def put_many(self, values: Dict[str, Any], tool: str = "") -> None:
+        """Store JSON-serializable values and evict least recently used entries over max_entries"""
+        if not values:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, tool, value, last_used) VALUES (?, ?, ?, ?)",
+                [(key, tool, json.dumps(value, ensure_ascii=False), now) for key, value in values.items()]
+            )
+            self.stores += len(values)
+            count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                # Evict down to 90% so eviction does not run on every store
+                self._conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used ASC LIMIT ?)",
+                    (count - int(self.max_entries * 0.9),)
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached result"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the number of stored results"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'stores': self.stores,
+            'entries': entries,
+        }
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the process-wide result cache, or None when it is disabled"""
+    global _cache
+    if not TOOL_RESULT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(TOOL_RESULT_CACHE_DIR, TOOL_RESULT_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+# Path -> (mtime_ns, size, inode, digest): files are re-hashed only when their stat changes
+_hashes: Dict[str, Tuple[int, int, int, str]] = {}
+
+
+def content_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's bytes (None if unreadable)"""
+    try:
+        stat = os.stat(path)
+        cached = _hashes.get(path)
+        if cached and cached[:3] == (stat.st_mtime_ns, stat.st_size, stat.st_ino):
+            return cached[3]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    _hashes[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino, digest.hexdigest())
+    return _hashes[path][3]
+
+
+# (resolved executable, mtime_ns) -> version string
+_versions: Dict[Tuple[str, int], str] = {}
+
+
+def tool_version(executable: str) -> str:
+    """First line of `executable --version` (its path and mtime when that fails), per installed binary"""
+    toolchain = get_toolchains().get(executable)
+    resolved = toolchain.path or executable
+    try:
+        mtime = os.stat(resolved).st_mtime_ns
+    except OSError:
+        mtime = 0
+    if toolchain.version and toolchain.mtime_ns == mtime:
+        return toolchain.version
+    key = (resolved, mtime)
+    if key not in _versions:
+        version = f"{resolved}@{mtime}"
+        try:
+            result = traced_run([resolved, '--version'], capture_output=True, text=True, timeout=15)
+            lines = (result.stdout or result.stderr).strip().splitlines()
+            if result.returncode == 0 and lines:
+                version = lines[0]
+        except (OSError, subprocess.SubprocessError):
+            pass
+        _versions[key] = version
+    return _versions[key]
+
+
+def config_hash(directory: Path, command: Sequence[str]) -> str:
+    """Hash of a checker's command line and the CONFIG_FILES from directory up to its project root"""
+    directory = Path(os.path.abspath(directory))
+    root = project_root(directory)
+    digest = hashlib.sha256(json.dumps(list(command)).encode('utf-8'))
+    for folder in [directory] + [parent for parent in directory.parents if root == parent or root in parent.parents]:
+        for name in CONFIG_FILES:
+            file_hash = content_hash(str(folder / name))
+            if file_hash:
+                digest.update(f"{folder}/{name}:{file_hash}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _store(value: Any, shown: str) -> Any:
+    return value.replace(shown, PATH_PLACEHOLDER) if isinstance(value, str) and shown else value
+
+
+def _restore(value: Any, shown: str) -> Any:
+    return value.replace(PATH_PLACEHOLDER, shown) if isinstance(value, str) else value
+
+
+def run_cached(tool: str, version: str, config: str, paths: List[str],
+               run: Callable[[List[str]], Dict[str, Any]], shown: Optional[Dict[str, str]] = None,
+               cache_problems: bool = True) -> Tuple[Dict[str, Any], int]:
+    """
+    Result per path: from the cache where the file is unchanged, else from
+    run(dirty paths), which returns {path: None or problem text} for the paths
+    it could judge (only those are stored; problems only with cache_problems).
+    Files are hashed again after run, so formatters store results for what
+    they wrote. shown maps a path to how it appears in result text.
+
+    Returns:
+        (results, number of paths answered from the cache)
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return run(paths), 0
+    shown = shown or {}
+    keys = {}
+    for path in paths:
+        digest = content_hash(path)
+        if digest:
+            keys[path] = ResultCache.make_key(tool, version, config, digest)
+    cached = cache.get_many(list(set(keys.values())))
+    results = {path: _restore(cached[keys[path]], shown.get(path, path))
+               for path in paths if keys.get(path) in cached}
+    dirty = [path for path in paths if path not in results]
+    if dirty:
+        fresh = run(dirty)
+        results.update(fresh)
+        stored = {}
+        for path in dirty:
+            if path in fresh and (fresh[path] is None or cache_problems):
+                digest = content_hash(path)
+                if digest:
+                    stored[ResultCache.make_key(tool, version, config, digest)] = _store(fresh[path], shown.get(path, path))
+        cache.put_many(stored, tool)
+    return results, len(paths) - len(dirty)
+
+
+class CachedRun(NamedTuple):
+    # Problems of every file (cached and fresh), then tool output not tied to a file
+    output: str
+    # Files with problems
+    problems: int
+    # Files answered from the cache
+    cached: int
+    # The tool failed without per-file results (its output is in output)
+    failed: bool
+
+
+def split_by_path(output: str, names: Dict[str, str]) -> Tuple[Dict[str, str], str]:
+    """
+    Linter output grouped per file, and the text not tied to one. names maps
+    every way a file is printed (relative, absolute) to its key. Handles one
+    "name:line:col: message" line per issue (flake8, most linters) and a
+    name line followed by indented issues (eslint's default format).
+    """
+    per_path: Dict[str, List[str]] = {}
+    rest = []
+    current = None
+    for line in output.splitlines():
+        key = names.get(line.split(':', 1)[0]) or names.get(line.strip())
+        if key is not None:
+            per_path.setdefault(key, []).append(line)
+            current = key if line.strip() in names else None
+        elif current is not None and line[:1].isspace() and line.strip():
+            per_path[current].append(line)
+        else:
+            current = None
+            if line.strip():
+                rest.append(line)
+    return {path: "\n".join(lines) for path, lines in per_path.items()}, "\n".join(rest)
+
+
+def _relative(paths: List[str], cwd: Path) -> Dict[str, str]:
+    return {path: os.path.relpath(path, cwd) for path in paths}
+
+
+def argument_chunks(paths: List[str], arguments: Dict[str, str]) -> Iterator[List[str]]:
+    """paths in groups whose arguments fit one command line (ARGUMENT_CHUNK_FILES / _BYTES)"""
+    chunk: List[str] = []
+    size = 0
+    for path in paths:
+        length = len(arguments[path].encode('utf-8')) + 1
+        if chunk and (len(chunk) >= ARGUMENT_CHUNK_FILES or size + length > ARGUMENT_CHUNK_BYTES):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(path)
+        size += length
+    if chunk:
+        yield chunk
+
+
+def lint_files(command: List[str], paths: List[str], cwd: Path, timeout: int = 120) -> CachedRun:
+    """
+    Lint paths with a linter that takes file arguments and names the file of
+    every issue (see split_by_path); only files without a cached result are
+    passed to it, relative to cwd.
+    """
+    relative = _relative(paths, cwd)
+    extra: List[str] = []
+    failed = []
+
+    def run_chunk(dirty: List[str]) -> Dict[str, Any]:
+        result = traced_run(command + [relative[path] for path in dirty], capture_output=True,
+                            text=True, timeout=timeout, cwd=cwd)
+        names = {relative[path]: path for path in dirty}
+        names.update({path: path for path in dirty})
+        by_path, rest = split_by_path(result.stdout, names)
+        if result.returncode != 0 and not by_path:
+            failed.append(True)
+            extra.append((result.stderr or result.stdout).strip())
+            return {}
+        extra.extend(text for text in (rest, result.stderr.strip()) if text)
+        return {path: by_path.get(path) for path in dirty}
+
+    def run(dirty: List[str]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for chunk in argument_chunks(dirty, relative):
+            results.update(run_chunk(chunk))
+        return results
+
+    results, cached = run_cached(f"lint:{command[0]}", tool_version(command[0]), config_hash(cwd, command),
+                                 paths, run, shown=relative)
+    problems = [results[path] for path in paths if results.get(path)]
+    return CachedRun("\n".join(problems + extra), len(problems), cached, bool(failed))
+
+
+def format_files(command: List[str], paths: List[str], cwd: Path, timeout: int = 60) -> CachedRun:
+    """
+    Run a formatter (write or check mode) on the paths not already known to be
+    formatted; a successful run records them as formatted. Both modes share one
+    record per file, keyed on the formatter and its config (not the mode flags).
+    """
+    relative = _relative(paths, cwd)
+    outputs: List[str] = []
+    failed = []
+
+    def run(dirty: List[str]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for chunk in argument_chunks(dirty, relative):
+            result = traced_run(command + [relative[path] for path in chunk], capture_output=True,
+                                text=True, timeout=timeout, cwd=cwd)
+            outputs.extend(text.strip() for text in (result.stdout, result.stderr) if text.strip())
+            if result.returncode != 0:
+                # Only the files of a run that succeeded are known to be formatted
+                failed.append(True)
+                continue
+            results.update((path, None) for path in chunk)
+        return results
+
+    results, cached = run_cached(f"format:{command[0]}", tool_version(command[0]), config_hash(cwd, command[:1]),
+                                 paths, run, cache_problems=False)
+    return CachedRun("\n".join(outputs), sum(path not in results for path in paths), cached, bool(failed))
@@ -1,10 +1,21 @@
 import subprocess
 import sys
-import shutil
 import re
+import os
+import fnmatch
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Set
 from crewai.tools import tool
+from tracing import traced_tool, traced_run
+from .atomic_io import atomic_write
+from .watcher import WATCH_SKIP_DIRS, ChangeEvent, is_watched, subscribe
+from .workspace_index import get_workspace_index
+from .content_index import get_content_index
+from .code_execution import CACHED_FORMATTERS, CACHED_LINTERS, LANGUAGE_CONFIG
+from .file_types import file_type
+from .result_cache import format_files, lint_files
+from .toolchains import which
+from .process_runner import run_process
 
 
 # Testing framework configuration by language
@@ -112,14 +123,63 @@ TEST_FRAMEWORKS = {
 }
 
 
+# Files whose presence or content decides the detected language / test framework
+DETECTION_FILES = {
+    'requirements.txt', 'setup.py', 'pyproject.toml', 'pytest.ini', 'package.json', 'tsconfig.json',
+    'pom.xml', 'build.gradle', 'build.gradle.kts', 'go.mod', 'Cargo.toml', 'Gemfile', 'composer.json',
+    'Package.swift'
+}
+
+# Python files that affect every test (a change to one reruns the whole suite)
+SHARED_TEST_FILES = {'conftest.py', 'setup.cfg', 'tox.ini', 'pytest.ini', 'pyproject.toml', 'setup.py'}
+
+# Detection results per project, kept only while a watcher reports changes to the project
+_detected: Dict[tuple, Optional[str]] = {}
+
+# Paths changed since the last passing run_tests(changed_only=True), per test directory
+_changed_since_run: Dict[str, Set[Path]] = {}
+
+
+def _contains(root: str, path: Path) -> bool:
+    return str(path) == root or str(path).startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _on_change(event: ChangeEvent) -> None:
+    """Drop detection results the change may affect and record it for test selection"""
+    if event.kind != 'modified' or event.path.name in DETECTION_FILES:
+        for key in [key for key in _detected if _contains(key[0], event.path)]:
+            _detected.pop(key, None)
+    if event.path.name.startswith('.') or WATCH_SKIP_DIRS.intersection(event.path.parts):
+        return  # temp files of atomic writes, caches and tool state
+    for root, changed in list(_changed_since_run.items()):
+        if _contains(root, event.path):
+            changed.add(event.path)
+
+
+subscribe(_on_change)
+
+
+def _memoized(key: tuple, detect: Callable[[], Optional[str]]) -> Optional[str]:
+    if not is_watched(key[0]):
+        return detect()
+    if key not in _detected:
+        _detected[key] = detect()
+    return _detected[key]
+
+
 def detect_test_framework(project_dir: str, language: str) -> Optional[str]:
-    """Detect which test framework is being used"""
+    """Detect which test framework is being used (memoized while the project is watched)"""
+    return _memoized((os.path.abspath(project_dir), 'framework', language),
+                     lambda: _detect_test_framework(project_dir, language))
+
+
+def _detect_test_framework(project_dir: str, language: str) -> Optional[str]:
     path = Path(project_dir)
     
     if language == 'python':
         if (path / 'pytest.ini').exists() or (path / 'pyproject.toml').exists():
             return 'pytest'
-        elif any(path.rglob('test_*.py')):
+        elif get_workspace_index(path).list(path, 'test_*.py'):
             return 'pytest'
         else:
             return 'unittest'
@@ -172,7 +232,11 @@ def detect_test_framework(project_dir: str, language: str) -> Optional[str]:
 
 
 def detect_project_language(project_dir: str) -> Optional[str]:
-    """Detect programming language from project structure"""
+    """Detect programming language from project structure (memoized while the project is watched)"""
+    return _memoized((os.path.abspath(project_dir), 'language'), lambda: _detect_project_language(project_dir))
+
+
+def _detect_project_language(project_dir: str) -> Optional[str]:
     path = Path(project_dir)
     
     if (path / 'requirements.txt').exists() or (path / 'setup.py').exists():
@@ -199,9 +263,54 @@ def detect_project_language(project_dir: str) -> Optional[str]:
     return None
 
 
+def select_changed_tests(directory: str, language: str, framework: str) -> Optional[List[str]]:
+    """
+    Python test files (relative to directory) affected by the files changed since
+    the last passing changed-only run: changed test files, plus test files that
+    mention a changed module's name. None means run everything (no baseline yet,
+    no watcher, a non-pytest project, or a change to shared test configuration).
+    """
+    key = os.path.abspath(directory)
+    if language != 'python' or framework != 'pytest' or not is_watched(key) or key not in _changed_since_run:
+        return None
+    changed = set(_changed_since_run[key])
+    if any(path.name in SHARED_TEST_FILES or path.name in DETECTION_FILES for path in changed):
+        return None
+    path = Path(directory)
+    tests = {Path(os.path.abspath(entry.path)): (relative, entry)
+             for relative, entry in get_workspace_index(path).list(path, '*.py', include_hidden=False)
+             if is_test_file(entry.path.name)}
+    selected = {tests[p][0] for p in changed if p in tests}
+    modules = {p.stem for p in changed if p.suffix == '.py' and p not in tests and p.stem != '__init__'}
+    if modules:
+        term = r'\b(?:' + '|'.join(re.escape(m) for m in sorted(modules)) + r')\b'
+        found = get_content_index(path).search([entry for _, entry in tests.values()], term,
+                                               regex=True, case_sensitive=True)
+        relatives = {id(entry): relative for relative, entry in tests.values()}
+        selected.update(relatives[id(entry)] for entry, _ in found)
+    return sorted(selected)
+
+
+def is_test_file(name: str) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in TEST_FRAMEWORKS['python']['test_patterns'])
+
+
+def record_test_run(directory: str, passed: bool, changed: Set[Path]) -> None:
+    """Start (or advance) the changed-since baseline of directory after a passing run"""
+    key = os.path.abspath(directory)
+    if not passed:
+        return
+    if key in _changed_since_run:
+        _changed_since_run[key] -= changed
+    elif is_watched(key):
+        _changed_since_run[key] = set()
+
+
 @tool("Run tests")
+@traced_tool
 def run_tests(directory: str = ".", language: str = None, framework: str = None,
-              pattern: str = None, verbose: bool = True, timeout: int = 300) -> str:
+              pattern: str = None, verbose: bool = True, timeout: int = 300,
+              changed_only: bool = False) -> str:
     """
     Runs tests for any programming language with auto-detection.
     
@@ -223,6 +332,8 @@ def run_tests(directory: str = ".", language: str = None, framework: str = None,
         pattern: Test file pattern (uses language defaults if not provided)
         verbose: Verbose output (default: True)
         timeout: Test timeout in seconds (default: 300)
+        changed_only: Python/pytest only - run just the tests affected by files changed since
+                      the last passing changed_only run (the first run is a full run) (default: False)
     
     Returns:
         Test results with pass/fail status and details
@@ -256,25 +367,35 @@ def run_tests(directory: str = ".", language: str = None, framework: str = None,
         if pattern:
             command.append(pattern)
         
+        # Restrict to the tests affected by recent changes
+        selected, changed = None, set()
+        if changed_only:
+            changed = set(_changed_since_run.get(os.path.abspath(directory), ()))
+            selected = select_changed_tests(directory, language, framework)
+            if selected == []:
+                record_test_run(directory, True, changed)
+                return f"✓ No tests affected by the {len(changed)} files changed since the last passing run"
+            if selected:
+                command.extend(selected)
+        
         # Check if test tool is available
-        if not shutil.which(command[0]):
+        if not which(command[0]):
             return f"✗ Error: {command[0]} is not installed or not in PATH.\n" \
                    f"Install it first to run tests."
         
         # Run tests
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=directory
-        )
+        result = run_process(command, cwd=directory, timeout=timeout)
+        
+        if changed_only:
+            record_test_run(directory, result.returncode == 0, changed)
         
         # Format output
         output = f"Test Results - {language.capitalize()} ({framework})\n"
         output += "═" * 70 + "\n"
         output += f"Command: {' '.join(command)}\n"
         output += f"Directory: {directory}\n"
+        if selected:
+            output += f"Selected: {len(selected)} test files affected by {len(changed)} changed files\n"
         output += "─" * 70 + "\n\n"
         
         if result.stdout:
@@ -283,6 +404,7 @@ def run_tests(directory: str = ".", language: str = None, framework: str = None,
         if result.stderr and verbose:
             output += "\nStderr:\n"
             output += result.stderr + "\n"
+        output += result.notes()
         
         output += "\n" + "═" * 70 + "\n"
         
@@ -313,6 +435,7 @@ def run_tests(directory: str = ".", language: str = None, framework: str = None,
 
 
 @tool("Run tests with coverage")
+@traced_tool
 def run_tests_with_coverage(directory: str = ".", language: str = None,
                             coverage_threshold: float = 80.0) -> str:
     """
@@ -352,18 +475,12 @@ def run_tests_with_coverage(directory: str = ".", language: str = None,
             return f"⚠ Coverage reporting not configured for {language}"
         
         # Check if coverage tool is available
-        if not shutil.which(command[0]):
+        if not which(command[0]):
             return f"✗ Error: {command[0]} is not installed.\n" \
                    f"Install coverage tools first."
         
         # Run tests with coverage
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd=directory
-        )
+        result = run_process(command, cwd=directory, timeout=300)
         
         output = f"Coverage Report - {language.capitalize()}\n"
         output += "═" * 70 + "\n"
@@ -376,6 +493,7 @@ def run_tests_with_coverage(directory: str = ".", language: str = None,
         if result.stderr:
             output += "\nAdditional Info:\n"
             output += result.stderr + "\n"
+        output += result.notes()
         
         # Extract coverage percentage
         coverage_pct = extract_coverage_percentage(result.stdout + result.stderr, language)
@@ -420,7 +538,20 @@ def run_tests_with_coverage(directory: str = ".", language: str = None,
         return f"✗ Error running coverage: {str(e)}"
 
 
+def _project_files(directory: str, languages: Set[str]) -> List[str]:
+    """Files of the given languages in the project (hidden and ignored paths skipped)"""
+    path = Path(directory)
+    return [str(entry.path) for _, entry in get_workspace_index(path).list(path, include_hidden=False)
+            if not entry.is_dir and file_type(entry.path.name).language in languages]
+
+
+def _formatter_languages(formatter: str) -> Set[str]:
+    return {language for language, config in LANGUAGE_CONFIG.items()
+            if 'format_command' in config and config['format_command']([])[0] == formatter}
+
+
 @tool("Format code")
+@traced_tool
 def format_code(directory: str = ".", language: str = None, 
                 check_only: bool = False) -> str:
     """
@@ -472,12 +603,32 @@ def format_code(directory: str = ".", language: str = None,
         command = [c for c in format_commands[language] if c]  # Remove empty strings
         
         # Check if formatter is available
-        if not shutil.which(command[0]):
+        if not which(command[0]):
             return f"✗ Error: {command[0]} is not installed.\n" \
                    f"Install it to format {language} code."
         
+        output = f"Code Formatting - {language.capitalize()}\n"
+        output += "═" * 70 + "\n"
+        output += f"Tool: {command[0]}\n"
+        output += f"Mode: {'Check Only' if check_only else 'Format'}\n"
+        output += "─" * 70 + "\n\n"
+        
+        if command[0] in CACHED_FORMATTERS:
+            # Only files changed since they were last found formatted are passed on
+            # (the trailing directory argument is replaced by those files)
+            languages = {language} if command[0] == 'black' else _formatter_languages(command[0])
+            run = format_files(command[:-1], _project_files(directory, languages), Path(directory))
+            if run.cached:
+                output += f"{run.cached} unchanged files answered from cache\n"
+            if not run.failed:
+                output += "✓ Code is properly formatted\n" if check_only else "✓ Code formatted successfully\n"
+            else:
+                output += "⚠ Formatting issues found:\n" if check_only else "✗ Formatting errors:\n"
+                output += run.output
+            return output
+        
         # Run formatter
-        result = subprocess.run(
+        result = traced_run(
             command,
             capture_output=True,
             text=True,
@@ -485,12 +636,6 @@ def format_code(directory: str = ".", language: str = None,
             cwd=directory
         )
         
-        output = f"Code Formatting - {language.capitalize()}\n"
-        output += "═" * 70 + "\n"
-        output += f"Tool: {command[0]}\n"
-        output += f"Mode: {'Check Only' if check_only else 'Format'}\n"
-        output += "─" * 70 + "\n\n"
-        
         if result.stdout:
             output += result.stdout + "\n"
         
@@ -516,6 +661,7 @@ def format_code(directory: str = ".", language: str = None,
 
 
 @tool("Lint code")
+@traced_tool
 def lint_code(directory: str = ".", language: str = None, 
               strict: bool = False, fix: bool = False) -> str:
     """
@@ -568,12 +714,41 @@ def lint_code(directory: str = ".", language: str = None,
         command = [c for c in lint_commands[language] if c]
         
         # Check if linter is available
-        if not shutil.which(command[0]):
+        if not which(command[0]):
             return f"✗ Error: {command[0]} is not installed.\n" \
                    f"Install it to lint {language} code."
         
+        output = f"Code Linting - {language.capitalize()}\n"
+        output += "═" * 70 + "\n"
+        output += f"Tool: {command[0]}\n"
+        output += f"Strict Mode: {strict}\n"
+        output += f"Auto-fix: {fix}\n"
+        output += "─" * 70 + "\n\n"
+        
+        if command[0] in CACHED_LINTERS:
+            # Only files changed since their last lint are passed on (the trailing
+            # directory argument is replaced by those files)
+            languages = {language} if language == 'python' else {'javascript', 'typescript'}
+            run = lint_files(command[:-1], _project_files(directory, languages), Path(directory))
+            if run.output:
+                output += run.output + "\n"
+            output += "\n" + "═" * 70 + "\n"
+            if run.cached:
+                output += f"{run.cached} unchanged files answered from cache\n"
+            if run.failed:
+                output += f"✗ {command[0]} failed (see above)\n"
+            elif not run.problems:
+                output += "✓ No linting issues found\n"
+            else:
+                issue_count = count_lint_issues(run.output, language)
+                output += f"⚠ Linting issues found in {run.problems} files"
+                if issue_count:
+                    output += f": {issue_count} issues"
+                output += "\n"
+            return output
+        
         # Run linter
-        result = subprocess.run(
+        result = traced_run(
             command,
             capture_output=True,
             text=True,
@@ -581,13 +756,6 @@ def lint_code(directory: str = ".", language: str = None,
             cwd=directory
         )
         
-        output = f"Code Linting - {language.capitalize()}\n"
-        output += "═" * 70 + "\n"
-        output += f"Tool: {command[0]}\n"
-        output += f"Strict Mode: {strict}\n"
-        output += f"Auto-fix: {fix}\n"
-        output += "─" * 70 + "\n\n"
-        
         if result.stdout:
             output += result.stdout + "\n"
         
@@ -614,6 +782,7 @@ def lint_code(directory: str = ".", language: str = None,
 
 
 @tool("Generate test file")
+@traced_tool
 def generate_test_file(file_path: str, module_name: str, language: str = None,
                        framework: str = None, include_examples: bool = True) -> str:
     """
@@ -670,8 +839,7 @@ def generate_test_file(file_path: str, module_name: str, language: str = None,
         path = Path(file_path)
         path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        atomic_write(path, content)
         
         return f"✓ Test file created: {file_path}\n" \
                f"  Language: {language}\n" \
@@ -0,0 +1,72 @@
+"""
+Size-capped, pageable reports for tools that return long listings.
+
+Text is collected in a list and joined once. Each listed item (a file, a
+search hit) is added as one block; once TOOL_OUTPUT_MAX_CHARS would be exceeded
+the page ends, and the report closes with the offset to pass back to the tool
+for the next page. Every page therefore costs a bounded number of tokens however
+large the tree is.
+"""
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+from config import TOOL_OUTPUT_MAX_CHARS
+
+
+class PagedOutput:
+    """Report text with a character budget for its items"""
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars or TOOL_OUTPUT_MAX_CHARS
+        self.parts: List[str] = []
+        self.size = 0
+        self.items = 0
+        self.full = False
+
+    def write(self, text: str) -> None:
+        """Add text that is not an item (headers, summaries); it is never dropped"""
+        self.parts.append(text)
+        self.size += len(text)
+
+    def item(self, text: str) -> bool:
+        """Add one item's text; False (nothing added) once the page is full"""
+        if self.full:
+            return False
+        if self.size + len(text) > self.max_chars:
+            if self.items:
+                self.full = True
+                return False
+            # A single oversized item still makes progress, cut to the budget
+            text = text[:max(self.max_chars - self.size, 0)] + "...\n"
+        self.parts.append(text)
+        self.size += len(text)
+        self.items += 1
+        return True
+
+    def rows(self, rows: Iterable[Tuple[str, str]], offset: int = 0) -> int:
+        """
+        Add (section header, text) rows from offset until the page is full;
+        returns how many were added. A section's header is written before its
+        first row on the page.
+        """
+        added = 0
+        section = None
+        for header, text in islice(rows, offset, None):
+            block = text if header == section else ("\n" if section is not None else "") + header + text
+            if not self.item(block):
+                break
+            section = header
+            added += 1
+        if added:
+            self.write("\n")
+        return added
+
+    def continuation(self, offset: int, shown: int, total: int, unit: str = "items") -> None:
+        """Say which part of total the page shows and how to get the rest"""
+        if offset + shown < total:
+            self.write(f"... showing {unit} {offset + 1}-{offset + shown} of {total}; "
+                       f"call again with offset={offset + shown} for the next page\n")
+        elif offset and not shown:
+            self.write(f"No {unit} at offset {offset} (there are {total})\n")
+
+    def getvalue(self) -> str:
+        return "".join(self.parts)
@@ -0,0 +1,274 @@
+"""
+Registry of the executables the tools run.
+
+Every executable named by LANGUAGE_CONFIG and TEST_FRAMEWORKS is looked up on
+PATH once, with its version and the language roles it serves (run, syntax,
+lint, test, ...). The result is kept for the process and saved to
+TOOLCHAIN_CACHE_FILE, which later processes reuse for TOOLCHAIN_CACHE_TTL_HOURS
+while PATH and its directories are unchanged; executables missing at the first
+probe are looked up again once a PATH directory changes. Tool availability checks are a
+dict lookup instead of a PATH scan, and agents get one summary of what is
+installed instead of discovering missing tools by running them.
+"""
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from config import TOOLCHAIN_CACHE_FILE, TOOLCHAIN_CACHE_TTL_HOURS
+from tracing import traced_run
+from .atomic_io import atomic_write
+
+
+# LANGUAGE_CONFIG key -> role shown in the summary
+ROLES = {
+    'run_command': 'run',
+    'syntax_check': 'syntax',
+    'batch_syntax_check': 'syntax',
+    'dependency_install': 'install',
+    'test_command': 'test',
+    'format_command': 'format',
+    'lint_command': 'lint',
+    'type_check': 'type_check',
+    'build_command': 'build',
+}
+
+# Executables that do not answer --version
+VERSION_ARGS = {
+    'go': ['version'],
+    'java': ['-version'],
+    'javac': ['-version'],
+    'kotlinc': ['-version'],
+    'scala': ['-version'],
+    'scalac': ['-version'],
+    'lua': ['-v'],
+    'luac': ['-v'],
+}
+
+# Version probes run at once when the registry is built
+PROBE_WORKERS = 8
+
+
+class Toolchain(NamedTuple):
+    executable: str
+    # Resolved path (None when not installed)
+    path: Optional[str]
+    # First line of its version output
+    version: Optional[str]
+    mtime_ns: int
+    # "language:role" entries that run this executable
+    capabilities: Tuple[str, ...]
+
+
+def _call(factory):
+    """Command list a LANGUAGE_CONFIG lambda builds, with placeholder arguments"""
+    code = factory.__code__
+    args = [['FILE'] if name == 'files' else 'FILE' for name in code.co_varnames[:code.co_argcount]]
+    try:
+        return factory(*args)
+    except Exception:
+        return None
+
+
+def referenced_executables() -> Dict[str, Set[str]]:
+    """Executable -> "language:role" entries, from LANGUAGE_CONFIG and TEST_FRAMEWORKS"""
+    from .code_execution import LANGUAGE_CONFIG
+    from .testing_tools import TEST_FRAMEWORKS
+    found: Dict[str, Set[str]] = {}
+
+    def add(command, capability):
+        # Commands inside the project (./vendor/bin/phpunit) are not toolchains
+        if command and (os.path.isabs(command[0]) or '/' not in command[0]):
+            found.setdefault(command[0], set()).add(capability)
+
+    for language, config in LANGUAGE_CONFIG.items():
+        for key, role in ROLES.items():
+            if key in config:
+                add(_call(config[key]), f"{language}:{role}")
+    for language, config in TEST_FRAMEWORKS.items():
+        for command in config['commands'].values():
+            add(command, f"{language}:test")
+        add(config.get('coverage'), f"{language}:coverage")
+    return found
+
+
+def _version(path: str, executable: str) -> Optional[str]:
+    args = VERSION_ARGS.get(os.path.basename(executable), ['--version'])
+    try:
+        result = traced_run([path] + args, capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    lines = [line.strip() for line in (result.stdout + "\n" + result.stderr).splitlines() if line.strip()]
+    return lines[0] if lines else None
+
+
+def _mtime(path: Optional[str]) -> int:
+    try:
+        return os.stat(path).st_mtime_ns if path else 0
+    except OSError:
+        return 0
+
+
+def probe(executable: str, capabilities=()) -> Toolchain:
+    """Look an executable up on PATH and ask for its version"""
+    path = shutil.which(executable)
+    return Toolchain(executable, path, _version(path, executable) if path else None,
+                     _mtime(path), tuple(sorted(capabilities)))
+
+
+def path_state() -> List[Tuple[str, int]]:
+    """PATH directories and their mtimes (installing or removing a tool changes one)"""
+    return [(folder, _mtime(folder)) for folder in os.environ.get('PATH', '').split(os.pathsep) if folder]
+
+
+class ToolchainRegistry:
+    """Toolchains by executable name, built once per process (or loaded from disk)"""
+
+    def __init__(self, cache_file=TOOLCHAIN_CACHE_FILE, ttl_hours: float = TOOLCHAIN_CACHE_TTL_HOURS):
+        self.cache_file = cache_file
+        self.ttl_hours = ttl_hours
+        self._lock = threading.Lock()
+        self._toolchains: Optional[Dict[str, Toolchain]] = None
+        # PATH state the missing entries were probed against
+        self._path_state: Optional[List[Tuple[str, int]]] = None
+
+    def _load(self, referenced: Dict[str, Set[str]]) -> Optional[Dict[str, Toolchain]]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (time.time() - saved.get('created', 0) > self.ttl_hours * 3600
+                or saved.get('path_state') != [list(entry) for entry in path_state()]):
+            return None
+        toolchains = {name: Toolchain(*entry[:4], tuple(entry[4])) for name, entry in saved.get('toolchains', {}).items()}
+        # Saved before LANGUAGE_CONFIG / TEST_FRAMEWORKS changed
+        if any(name not in toolchains or set(toolchains[name].capabilities) != capabilities
+               for name, capabilities in referenced.items()):
+            return None
+        return toolchains
+
+    def _save(self, toolchains: Dict[str, Toolchain]) -> None:
+        data = {
+            'created': time.time(),
+            'path_state': path_state(),
+            'toolchains': {name: list(toolchain) for name, toolchain in toolchains.items()},
+        }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.cache_file, json.dumps(data, indent=1))
+        except OSError:
+            pass
+
+    def toolchains(self) -> Dict[str, Toolchain]:
+        """All referenced toolchains (probed in parallel on first use unless saved ones are fresh)"""
+        if self._toolchains is None:
+            with self._lock:
+                if self._toolchains is None:
+                    referenced = referenced_executables()
+                    self._path_state = path_state()
+                    toolchains = self._load(referenced)
+                    if toolchains is None:
+                        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+                            probed = pool.map(lambda item: probe(*item), referenced.items())
+                            toolchains = {toolchain.executable: toolchain for toolchain in probed}
+                        self._save(toolchains)
+                    self._toolchains = toolchains
+        return self._toolchains
+
+    def get(self, executable: str) -> Toolchain:
+        """The registered toolchain, probing (and remembering) executables not referenced by the configs"""
+        toolchains = self.toolchains()
+        toolchain = toolchains.get(executable)
+        if toolchain is None:
+            toolchain = toolchains[executable] = probe(executable)
+        elif toolchain.path and not os.access(toolchain.path, os.X_OK):
+            # Uninstalled since it was probed
+            toolchain = toolchains[executable] = probe(executable, toolchain.capabilities)
+        elif toolchain.path is None and self._reprobe_missing():
+            toolchain = toolchains[executable]
+        return toolchain
+
+    def _reprobe_missing(self) -> bool:
+        """Look missing executables up again if a PATH directory changed since they were probed"""
+        current = path_state()
+        with self._lock:
+            toolchains = self._toolchains
+            if toolchains is None or current == self._path_state:
+                return False
+            self._path_state = current
+            for name, toolchain in list(toolchains.items()):
+                if toolchain.path is None:
+                    toolchains[name] = probe(name, toolchain.capabilities)
+        self._save(toolchains)
+        return True
+
+    def which(self, executable: str) -> Optional[str]:
+        return self.get(executable).path
+
+    def invalidate(self) -> None:
+        """Probe everything again on next use (after installing tools)"""
+        with self._lock:
+            self._toolchains = None
+        try:
+            os.remove(self.cache_file)
+        except OSError:
+            pass
+
+    def summary(self, versions: bool = True) -> str:
+        """Roles each language can use on this machine, and the missing executables behind the rest"""
+        available: Dict[str, Set[str]] = {}
+        missing: Dict[str, Dict[str, Set[str]]] = {}
+        for toolchain in self.toolchains().values():
+            for capability in toolchain.capabilities:
+                language, role = capability.split(':', 1)
+                if toolchain.path:
+                    available.setdefault(language, set()).add(role)
+                else:
+                    missing.setdefault(language, {}).setdefault(role, set()).add(toolchain.executable)
+        output = "Available toolchains\n"
+        output += "═" * 70 + "\n"
+        unavailable = []
+        for language in sorted(set(available) | set(missing)):
+            roles = available.get(language, set())
+            if not roles:
+                unavailable.append(language)
+                continue
+            output += f"✓ {language}: {', '.join(sorted(roles))}"
+            # A role is missing only if no executable provides it
+            gaps = {role: names for role, names in missing.get(language, {}).items() if role not in roles}
+            if gaps:
+                output += " | missing: " + ", ".join(f"{role} ({'/'.join(sorted(names))})"
+                                                     for role, names in sorted(gaps.items()))
+            output += "\n"
+        if unavailable:
+            output += f"✗ Not installed: {', '.join(unavailable)}\n"
+        if versions:
+            found = [f"{toolchain.executable} {toolchain.version}" for toolchain in self.toolchains().values()
+                     if toolchain.path and toolchain.version]
+            output += "Versions: " + "; ".join(sorted(found)) + "\n"
+        return output
+
+
+_registry: Optional[ToolchainRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_toolchains() -> ToolchainRegistry:
+    """Process-wide registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ToolchainRegistry()
+    return _registry
+
+
+def which(executable: str) -> Optional[str]:
+    """shutil.which answered from the registry"""
+    return get_toolchains().which(executable)
@@ -0,0 +1,116 @@
+"""
+Pre-warmed Python interpreter used by tools/python_pool.py.
+
+Started with the project's interpreter (its virtualenv python when it has
+one), so it only uses the standard library and runs as a plain script. The
+first request line lists modules to import up front; every following line is
+a script to run, which is executed in a forked child so each run starts from
+the same warmed state and cannot affect the next one.
+
+Protocol (one JSON object per line): stdin receives {"preload": [...]} and then
+{"script", "args", "cwd", "stdout", "stderr"}; stdout answers {"ready", "site"}
+once, then {"pid"} when a child starts and {"returncode"} when it exits.
+"""
+import json
+import os
+import sys
+
+
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _run_child(request):
+    """Body of the forked child: never returns"""
+    code = 1
+    try:
+        os.setsid()
+        os.chdir(request['cwd'])
+        stdin = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(stdin, 0)
+        for fd, path in ((1, request['stdout']), (2, request['stderr'])):
+            target = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.dup2(target, fd)
+            os.close(target)
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', closefd=False)
+        sys.stderr = open(2, 'w', closefd=False)
+
+        import atexit
+        import importlib
+        import runpy
+        script = os.path.abspath(request['script'])
+        # Same sys.argv / sys.path[0] as `python script args`; files may have changed since the fork
+        sys.argv = [script] + list(request['args'])
+        sys.path[0] = os.path.dirname(script)
+        importlib.invalidate_caches()
+        try:
+            runpy.run_path(script, run_name='__main__')
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        try:
+            atexit._run_exitfuncs()
+        except BaseException:
+            pass
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            pass
+        os._exit(code)
+
+
+def main():
+    # Answers go to a private copy of stdout; anything the preloaded modules
+    # print goes to stderr instead of into the protocol
+    channel = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    # Started in the project directory: imports resolve as for a script there
+    sys.path[0] = os.getcwd()
+
+    def answer(**message):
+        channel.write(json.dumps(message) + "\n")
+        channel.flush()
+
+    requests = iter(sys.stdin.readline, '')
+    for name in json.loads(next(requests)).get('preload', []):
+        try:
+            __import__(name)
+        except BaseException:
+            pass
+    import site
+    try:
+        site_dirs = site.getsitepackages() + [site.getusersitepackages()]
+    except AttributeError:
+        site_dirs = []
+    answer(ready=True, site=site_dirs)
+
+    for line in requests:
+        request = json.loads(line)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            channel.close()
+            _run_child(request)
+        answer(pid=pid)
+        _, status = os.waitpid(pid, 0)
+        answer(returncode=_exit_code(status))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+Change events for project directories.
+
+Consumers subscribe() to a process-wide event stream; the file tools publish()
+their own writes, and watch() starts a background watcher on a project so
+changes made by anything else (shell commands, test runs, formatters) are
+published too. The watcher uses Linux inotify (through ctypes, no extra
+dependency) and falls back to polling mtimes every WATCHER_POLL_SECONDS where
+inotify is unavailable or out of watches.
+
+Consumers: the workspace index (drops stale listings; under inotify it trusts
+its cache without revalidating), project language / test framework detection
+(memoized while watched) and run_tests(changed_only=True).
+"""
+import os
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from config import FILE_WATCHER_ENABLED, WATCHER_POLL_SECONDS
+from .ignore_rules import HEAVY_DIRS
+
+
+# Directories never watched (generated or tool-owned trees with heavy churn)
+WATCH_SKIP_DIRS = HEAVY_DIRS | {'target', 'dist', 'build'}
+
+
+class ChangeEvent(NamedTuple):
+    path: Path
+    # 'created', 'modified', 'deleted', or 'changed' (published by a tool; may be any of them)
+    kind: str
+
+
+_subscribers: List[Callable[[ChangeEvent], None]] = []
+
+
+def subscribe(callback: Callable[[ChangeEvent], None]) -> None:
+    """Call callback for every change event (from the publishing thread)"""
+    _subscribers.append(callback)
+
+
+def publish(path: Path, kind: str = 'changed') -> None:
+    """Send a change event to every subscriber"""
+    event = ChangeEvent(Path(os.path.abspath(path)), kind)
+    for callback in list(_subscribers):
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"⚠️  Change event handler failed for {event.path}: {e}")
+
+
+# inotify constants (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    if not hasattr(os, 'uname') or os.uname().sysname != 'Linux':
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch  # noqa: B018 - raises AttributeError if missing
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class _InotifyBackend:
+    """One inotify watch per directory; new directories are watched as they appear"""
+
+    name = 'inotify'
+
+    def __init__(self, root: Path, libc):
+        self.root = root
+        self.libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, Path] = {}
+        self.add_tree(root)
+
+    def add_tree(self, directory: Path) -> List[Path]:
+        """Watch directory and its subdirectories; returns the paths found below it"""
+        found = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == 28:  # ENOSPC: out of inotify watches
+                    raise OSError(error, "inotify watch limit reached")
+                continue
+            self.watches[wd] = current
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        path = Path(entry.path)
+                        found.append(path)
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in WATCH_SKIP_DIRS:
+                            stack.append(path)
+            except OSError:
+                continue
+        return found
+
+    def read(self, timeout: float) -> List[Tuple[Path, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append((self.root, 'changed'))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                events.append((path, 'created'))
+                if mask & IN_ISDIR and path.name not in WATCH_SKIP_DIRS:
+                    # Files can appear before the new directory's watch exists
+                    events.extend((child, 'created') for child in self.add_tree(path))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, 'deleted'))
+            elif mask & IN_DELETE_SELF and directory == self.root:
+                events.append((path, 'deleted'))
+            elif mask & IN_CLOSE_WRITE:
+                events.append((path, 'modified'))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """Compares (mtime, size) snapshots of the tree"""
+
+    name = 'polling'
+
+    def __init__(self, root: Path, interval: float):
+        self.root = root
+        self.interval = interval
+        self.stop = threading.Event()
+        self.state = self.scan()
+
+    def scan(self) -> Dict[str, Tuple[int, int, bool]]:
+        state = {}
+        stack = [str(self.root)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        state[entry.path] = (stat.st_mtime_ns, stat.st_size, is_dir)
+                        if is_dir and entry.name not in WATCH_SKIP_DIRS:
+                            stack.append(entry.path)
+            except OSError:
+                continue
+        return state
+
+    def read(self, timeout: float) -> List[Tuple[Path, str]]:
+        if self.stop.wait(self.interval):
+            return []
+        previous, self.state = self.state, self.scan()
+        events = [(Path(path), 'deleted') for path in previous if path not in self.state]
+        for path, current in self.state.items():
+            before = previous.get(path)
+            if before is None:
+                events.append((Path(path), 'created'))
+            elif before != current and not current[2]:
+                events.append((Path(path), 'modified'))
+        return events
+
+    def close(self) -> None:
+        self.stop.set()
+
+
+class ProjectWatcher:
+    """Background thread publishing change events for one directory tree"""
+
+    def __init__(self, root: Path):
+        self.root = Path(os.path.abspath(root))
+        self.backend = None
+        libc = _load_libc()
+        if libc is not None:
+            try:
+                self.backend = _InotifyBackend(self.root, libc)
+            except OSError as e:
+                print(f"⚠️  inotify unavailable for {self.root} ({e}); polling for changes instead")
+        if self.backend is None:
+            self.backend = _PollingBackend(self.root, WATCHER_POLL_SECONDS)
+        self.events = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"watcher:{self.root.name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def event_driven(self) -> bool:
+        """True when changes are reported as they happen (inotify) rather than by polling"""
+        return isinstance(self.backend, _InotifyBackend)
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                events = self.backend.read(0.5)
+            except OSError as e:
+                if not self._running:
+                    break
+                print(f"⚠️  Watcher for {self.root} failed ({e}); polling for changes instead")
+                self.backend = _PollingBackend(self.root, WATCHER_POLL_SECONDS)
+                publish(self.root)
+                continue
+            for path, kind in events:
+                self.events += 1
+                publish(path, kind)
+
+    def stop(self) -> None:
+        self._running = False
+        if not self.event_driven:
+            self.backend.close()
+        self._thread.join(timeout=2)
+        if self.event_driven:
+            self.backend.close()
+
+
+_watchers: Dict[str, ProjectWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def watch(path: Path) -> Optional[ProjectWatcher]:
+    """Start watching a directory tree (None when FILE_WATCHER_ENABLED is off or path is missing)"""
+    root = Path(os.path.abspath(path))
+    if not FILE_WATCHER_ENABLED or not root.is_dir():
+        return None
+    with _watchers_lock:
+        if str(root) not in _watchers:
+            _watchers[str(root)] = ProjectWatcher(root)
+            # Caches built before the watcher started may already be stale
+            publish(root)
+        return _watchers[str(root)]
+
+
+def unwatch(path: Path) -> None:
+    """Stop the watcher started for path, if any"""
+    with _watchers_lock:
+        watcher = _watchers.pop(str(Path(os.path.abspath(path))), None)
+    if watcher is not None:
+        watcher.stop()
+
+
+def watcher_for(path: Path) -> Optional[ProjectWatcher]:
+    """Watcher covering path (None if it is not watched)"""
+    path = Path(os.path.abspath(path))
+    with _watchers_lock:
+        for root, watcher in _watchers.items():
+            if Path(root) == path or Path(root) in path.parents:
+                return watcher
+    return None
+
+
+def is_watched(path: Path, event_driven: bool = False) -> bool:
+    """Whether changes under path are published (event_driven: as they happen, not by polling)"""
+    watcher = watcher_for(path)
+    return watcher is not None and (watcher.event_driven or not event_driven)
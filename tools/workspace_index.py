@@ -0,0 +1,419 @@
+"""
+In-process index of project files shared by the file tools.
+
+Listings, stats, categories and line counts are cached per project directory
+and revalidated by mtime: a directory is re-listed (os.scandir) only when its
+mtime changes, a file's metadata is rebuilt only when its mtime or size
+changes, and anything listed within REVALIDATE_SECONDS is served from memory
+(single-file lookups for reading, get(), always re-stat).
+Line-start offsets are built once per file version over an mmap, so ranged
+reads (FileEntry.read_lines) cost O(range) after the first call.
+The file tools publish their writes as change events (tools.watcher), which
+call invalidate_path(), so their own changes are seen immediately; changes made
+by other processes are picked up on the next revalidation. While an inotify
+watcher covers the project, its events invalidate the cache and listings are
+not revalidated.
+Walks skip what the project's .gitignore files exclude (tools.ignore_rules):
+ignored directories are pruned, never listed.
+"""
+import os
+import re
+import mmap
+import fnmatch
+import functools
+import threading
+import time
+from array import array
+from pathlib import Path, PurePath
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import OUTPUT_DIR
+from .ignore_rules import GITIGNORE_NAME, RuleStack, is_ignored, load_gitignore, template_gitignore
+from .watcher import ChangeEvent, is_watched, subscribe
+
+
+# Cached listings and stats younger than this are trusted without touching the disk
+REVALIDATE_SECONDS = 1.0
+
+# Bytes read at a time when counting lines
+LINE_COUNT_CHUNK = 1024 * 1024
+
+
+class FileEntry:
+    """Cached metadata of one file or directory"""
+
+    __slots__ = ('path', 'relative', 'is_dir', 'stat', '_category', '_line_count', '_line_starts')
+
+    def __init__(self, path: Path, relative: str, stat: os.stat_result, is_dir: bool):
+        self.path = path
+        self.relative = relative
+        self.is_dir = is_dir
+        self.stat = stat
+        self._category: Optional[str] = None
+        self._line_count: Optional[int] = None
+        self._line_starts: Optional[array] = None
+
+    def refresh(self, stat: os.stat_result) -> None:
+        """Drop what was derived from an older version of the file"""
+        self.stat = stat
+        self._line_count = None
+        self._line_starts = None
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+
+    @property
+    def mtime(self) -> float:
+        return self.stat.st_mtime
+
+    @property
+    def category(self) -> str:
+        if self._category is None:
+            from .file_operations import get_file_category
+            self._category = 'directory' if self.is_dir else get_file_category(self.path.name)
+        return self._category
+
+    @property
+    def line_count(self) -> Optional[int]:
+        """Number of lines (None for directories and unreadable files)"""
+        if self.is_dir:
+            return None
+        if self._line_count is None and self._line_starts is not None:
+            starts = self._line_starts
+            self._line_count = len(starts) - (starts[-1] == self.size)
+        if self._line_count is None:
+            try:
+                count, last = 0, b'\n'
+                with open(self.path, 'rb') as f:
+                    while True:
+                        chunk = f.read(LINE_COUNT_CHUNK)
+                        if not chunk:
+                            break
+                        count += chunk.count(b'\n')
+                        last = chunk[-1:]
+                self._line_count = count + (last != b'\n')
+            except OSError:
+                return None
+        return self._line_count
+
+    @property
+    def line_starts(self) -> Optional[array]:
+        """
+        Byte offset of the start of every line, plus the file size when the file
+        ends with a newline (None for directories and unreadable files)
+        """
+        if self.is_dir:
+            return None
+        if self._line_starts is None:
+            starts = array('Q', [0])
+            try:
+                if self.size:
+                    with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        find, position = mm.find, mm.find(b'\n')
+                        while position != -1:
+                            starts.append(position + 1)
+                            position = find(b'\n', position + 1)
+            except (OSError, ValueError):
+                return None
+            self._line_starts = starts
+        return self._line_starts
+
+    def read_lines(self, start_line: int = 1, max_lines: Optional[int] = None,
+                   encoding: str = 'utf-8') -> Tuple[str, int]:
+        """
+        Text of max_lines lines (all when None) from start_line (1-indexed) and the
+        number of lines returned; only that byte range of the file is read. The
+        encoding must write '\n' as a single byte (utf-8, latin-1, cp125x, ...).
+        Newlines are translated like text-mode reads.
+        """
+        # The cached offsets are only valid for the version they were built from:
+        # the file may have been rewritten by another process since it was stat'ed
+        stat = os.stat(self.path)
+        if not _same_file(stat, self.stat):
+            self.refresh(stat)
+        starts = self.line_starts
+        if starts is None:
+            raise OSError(f"Cannot read lines of {self.path}")
+        total = self.line_count or 0
+        first = min(max(start_line, 1), total + 1) - 1
+        last = total if not max_lines else min(total, first + max_lines)
+        if first >= last:
+            return "", 0
+        begin = starts[first]
+        end = starts[last] if last < len(starts) else self.size
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[begin:end].decode(encoding)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text, last - first
+
+
+@functools.lru_cache(maxsize=256)
+def _name_matcher(pattern: str):
+    flags = re.IGNORECASE if os.name == 'nt' else 0
+    return re.compile(fnmatch.translate(pattern), flags).match
+
+
+def matches_pattern(relative: str, pattern: str, recursive: bool) -> bool:
+    """
+    Path.rglob (recursive) or Path.glob semantics of pattern for a path
+    relative to the listed directory
+    """
+    depth = relative.count(os.sep) + 1
+    if pattern in ('*', '**', '**/*'):
+        return recursive or depth == 1
+    if '/' in pattern or os.sep in pattern:
+        path = PurePath(relative)
+        return path.match(pattern) if recursive else \
+            depth == len(PurePath(pattern).parts) and path.match(pattern)
+    if not recursive and depth != 1:
+        return False
+    return _name_matcher(pattern)(relative.rsplit(os.sep, 1)[-1]) is not None
+
+
+def _same_file(stat: os.stat_result, cached: os.stat_result) -> bool:
+    return stat.st_mtime_ns == cached.st_mtime_ns and stat.st_size == cached.st_size
+
+
+class WorkspaceIndex:
+    """Cached view of the files under one project directory"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # Relative directory -> (mtime_ns, [(name, is_dir)], checked at)
+        self._dirs: Dict[str, Tuple[int, List[Tuple[str, bool]], float]] = {}
+        self._entries: Dict[str, FileEntry] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        # (root listing it was detected from, rules) for a root without a .gitignore
+        self._template: Optional[Tuple[List[Tuple[str, bool]], RuleStack]] = None
+        self.watched = False
+        self.scans = 0
+        self.hits = 0
+
+    def _relative(self, path: Path) -> str:
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        if relative == os.curdir:
+            return ""
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            raise ValueError(f"{path} is outside {self.root}")
+        return relative
+
+    def invalidate(self, path: Optional[Path] = None, structure: bool = True) -> None:
+        """
+        Forget cached state for a path, everything below it and its parent's listing
+        (everything when path is None or the root); structure=False only re-stats
+        the path, for content changes
+        """
+        with self._lock:
+            relative = self._relative(path) if path is not None else ""
+            if not relative:
+                self._checked.clear()
+                self._dirs.clear()
+                return
+            if not structure:
+                self._checked.pop(relative, None)
+                return
+            self._checked.pop(relative, None)
+            self._dirs.pop(os.path.dirname(relative), None)
+            prefix = relative + os.sep
+            for cache in (self._dirs, self._checked):
+                for key in [key for key in cache if key == relative or key.startswith(prefix)]:
+                    del cache[key]
+
+    def _listing(self, relative: str, now: float) -> Optional[List[Tuple[str, bool]]]:
+        cached = self._dirs.get(relative)
+        if cached and (self.watched or now - cached[2] < REVALIDATE_SECONDS):
+            self.hits += 1
+            return cached[1]
+        directory = self.root / relative if relative else self.root
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._dirs.pop(relative, None)
+            return None
+        if cached and cached[0] == mtime:
+            self._dirs[relative] = (mtime, cached[1], now)
+            return cached[1]
+        self.scans += 1
+        try:
+            with os.scandir(directory) as it:
+                children = [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in it]
+        except OSError:
+            self._dirs.pop(relative, None)
+            return None
+        if cached:
+            names = {name for name, _ in children}
+            for name, _ in cached[1]:
+                if name not in names:
+                    self._forget(relative + os.sep + name if relative else name)
+        self._dirs[relative] = (mtime, children, now)
+        return children
+
+    def _forget(self, relative: str) -> None:
+        """Drop a removed path and everything cached below it"""
+        prefix = relative + os.sep
+        for cache in (self._dirs, self._entries, self._checked):
+            for key in [key for key in cache if key == relative or key.startswith(prefix)]:
+                del cache[key]
+
+    def _entry(self, relative: str, is_dir: bool, now: float, trust: bool = True) -> Optional[FileEntry]:
+        cached = self._entries.get(relative)
+        if trust and cached is not None and relative in self._checked and \
+                (self.watched or now - self._checked[relative] < REVALIDATE_SECONDS):
+            return cached
+        path = self.root / relative
+        try:
+            stat = os.stat(path, follow_symlinks=not is_dir)
+        except OSError:
+            self._entries.pop(relative, None)
+            self._checked.pop(relative, None)
+            return None
+        if cached is None or cached.is_dir != is_dir or not _same_file(stat, cached.stat):
+            cached = FileEntry(path, relative, stat, is_dir)
+            self._entries[relative] = cached
+        else:
+            cached.stat = stat
+        self._checked[relative] = now
+        return cached
+
+    def _own_rules(self, relative: str, children: List[Tuple[str, bool]], now: float) -> RuleStack:
+        """Rules a directory adds for everything below it: its .gitignore (the template at a bare root)"""
+        if (GITIGNORE_NAME, False) in children:
+            entry = self._entry(relative + os.sep + GITIGNORE_NAME if relative else GITIGNORE_NAME, False, now)
+            gitignore = entry and load_gitignore(str(entry.path), entry.stat.st_mtime_ns, entry.size)
+            return ((relative, gitignore),) if gitignore else ()
+        if relative:
+            return ()
+        # The project type (and so the template) can only change when the root listing does
+        if self._template is None or self._template[0] is not children:
+            self._template = (children, (("", template_gitignore(self.root)),))
+        return self._template[1]
+
+    def _inherited_rules(self, relative: str, now: float) -> RuleStack:
+        """Rules of the directories above relative, outermost first"""
+        rules = ()
+        parts = relative.split(os.sep) if relative else []
+        for depth in range(len(parts)):
+            current = os.sep.join(parts[:depth])
+            children = self._listing(current, now)
+            if children is not None:
+                rules += self._own_rules(current, children, now)
+        return rules
+
+    def walk(self, directory: Path, recursive: bool = True, include_hidden: bool = True,
+             include_ignored: bool = False) -> Iterator[FileEntry]:
+        """
+        Entries below directory (not including it); Entry.relative is relative
+        to the index root. Without include_hidden, dot-files are skipped and
+        dot-directories are not entered. Without include_ignored, paths excluded
+        by .gitignore rules or HEAVY_DIRS are skipped and such directories are
+        not entered (directory itself is walked even when it is ignored).
+        """
+        start = self._relative(directory)
+        now = time.monotonic()
+        self.watched = is_watched(self.root, event_driven=True)
+        with self._lock:
+            results = []
+            stack = [(start, None if include_ignored else self._inherited_rules(start, now))]
+            while stack:
+                current, rules = stack.pop()
+                children = self._listing(current, now)
+                if children is None:
+                    continue
+                if rules is not None:
+                    rules += self._own_rules(current, children, now)
+                for name, is_dir in children:
+                    if not include_hidden and name.startswith('.'):
+                        continue
+                    relative = current + os.sep + name if current else name
+                    if rules is not None and is_ignored(rules, relative, name, is_dir):
+                        continue
+                    entry = self._entry(relative, is_dir, now)
+                    if entry is None:
+                        continue
+                    results.append(entry)
+                    if is_dir and recursive:
+                        stack.append((relative, rules))
+        return iter(results)
+
+    def list(self, directory: Path, pattern: str = "*", recursive: bool = True,
+             include_hidden: bool = True, include_ignored: bool = False) -> List[Tuple[str, FileEntry]]:
+        """
+        (path relative to directory, entry) pairs matching a glob pattern, sorted
+        by path; recursive=True follows Path.rglob, recursive=False Path.glob
+        """
+        base = self._relative(directory)
+        skip = len(base) + 1 if base else 0
+        descend = recursive or '/' in pattern or os.sep in pattern
+        results = []
+        for entry in self.walk(directory, descend, include_hidden, include_ignored):
+            relative = entry.relative[skip:]
+            if matches_pattern(relative, pattern, recursive):
+                results.append((relative, entry))
+        results.sort(key=lambda item: item[0])
+        return results
+
+    def get(self, path: Path) -> Optional[FileEntry]:
+        """
+        Entry for one path (None if it does not exist), always re-stat'ed: its
+        content is about to be read, and a file written by a subprocess a moment
+        ago may not have been reported by the watcher yet
+        """
+        relative = self._relative(path)
+        if not relative:
+            try:
+                return FileEntry(self.root, "", os.stat(self.root), True)
+            except OSError:
+                return None
+        self.watched = is_watched(self.root, event_driven=True)
+        with self._lock:
+            return self._entry(relative, os.path.isdir(path), time.monotonic(), trust=False)
+
+
+_indexes: Dict[str, WorkspaceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def project_root(path: Path) -> Path:
+    """
+    Directory an index is kept for: the project folder under OUTPUT_DIR, else the
+    enclosing git repository, else the directory itself
+    """
+    path = Path(os.path.abspath(path))
+    directory = path if path.is_dir() else path.parent
+    output_dir = Path(os.path.abspath(OUTPUT_DIR))
+    if output_dir in directory.parents:
+        return output_dir / directory.relative_to(output_dir).parts[0]
+    for candidate in [directory] + list(directory.parents):
+        if (candidate / '.git').exists():
+            return candidate
+    return directory
+
+
+def get_workspace_index(path: Path) -> WorkspaceIndex:
+    """Process-wide index of the project containing path"""
+    path = Path(os.path.abspath(path))
+    with _indexes_lock:
+        for root, index in _indexes.items():
+            if path == Path(root) or Path(root) in path.parents:
+                return index
+        root = project_root(path)
+        index = _indexes[str(root)] = WorkspaceIndex(root)
+        return index
+
+
+def invalidate_path(path: Path, structure: bool = True) -> None:
+    """Tell every index containing path that it changed"""
+    path = Path(os.path.abspath(path))
+    with _indexes_lock:
+        indexes = [index for root, index in _indexes.items() if path == Path(root) or Path(root) in path.parents]
+    for index in indexes:
+        index.invalidate(path, structure)
+
+
+def _on_change(event: ChangeEvent) -> None:
+    invalidate_path(event.path, structure=event.kind != 'modified')
+
+
+subscribe(_on_change)
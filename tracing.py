@@ -0,0 +1,372 @@
+"""
+Structured tracing for pipeline runs.
+
+A run is a tree of spans: phases and feedback steps (runner), crew kickoffs
+(traced_kickoff), LLM calls (llm.client), tool calls (@traced_tool under every
+@tool) and the subprocesses tools start (traced_run). Each span records wall
+time plus counters such as tokens, and tool spans record the bytes their thread
+read and wrote. At the end of a run the trace is written as OTLP JSON
+(<name>-<time>.trace.json) and as collapsed stacks of self time in
+milliseconds (<name>-<time>.folded, for flamegraph.pl or speedscope), and a
+summary of where the time went is printed.
+
+The current span is a context variable, so spans nest across asyncio tasks and
+asyncio.to_thread; spans started in threads that did not inherit the context
+attach to the root of the most recent trace.
+"""
+import os
+import json
+import time
+import functools
+import threading
+import subprocess
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config import TRACING_ENABLED, TRACE_DIR
+
+
+# Counters summed over the whole run in the summary
+SUMMED_COUNTERS = ('tokens', 'prompt_tokens', 'bytes_read', 'bytes_written', 'output_bytes')
+
+# Frames listed in the printed summary
+SUMMARY_TOP_FRAMES = 12
+
+# OTLP span kinds: everything is internal except the calls that leave the process
+OTLP_KIND_INTERNAL = 1
+OTLP_KIND_CLIENT = 3
+
+
+def _thread_io() -> Optional[Tuple[int, int]]:
+    """Bytes read and written by the calling thread so far (Linux only)"""
+    try:
+        with open('/proc/thread-self/io', 'rb') as f:
+            fields = dict(line.split(b':', 1) for line in f.read().splitlines() if b':' in line)
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class Span:
+    """One timed operation in a trace"""
+
+    __slots__ = ('trace', 'name', 'kind', 'span_id', 'parent', 'start', 'end', 'attributes',
+                 '_started', 'duration', 'children', '_io')
+
+    def __init__(self, trace: 'Trace', name: str, kind: str, parent: Optional['Span'], **attributes: Any):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        self.parent = parent
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.end: Optional[float] = None
+        self.duration = 0.0
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.children: List['Span'] = []
+        self._io: Optional[Tuple[int, int]] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, **counters: float) -> None:
+        """Increment numeric counters (tokens, bytes ...)"""
+        for key, value in counters.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def measure_io(self) -> None:
+        """Record the bytes this thread reads and writes until the span finishes"""
+        self._io = _thread_io()
+
+    def finish(self) -> None:
+        if self.end is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        self.end = self.start + self.duration
+        if self._io is not None:
+            current = _thread_io()
+            if current is not None:
+                self.add(bytes_read=current[0] - self._io[0], bytes_written=current[1] - self._io[1])
+
+    @property
+    def path(self) -> List[str]:
+        names, span = [], self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return names[::-1]
+
+    @property
+    def self_time(self) -> float:
+        """Wall time not covered by child spans (children running concurrently can cover all of it)"""
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+
+class _NullSpan:
+    """Stand-in returned when no trace is active"""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, **counters: float) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+_current_trace: contextvars.ContextVar[Optional['Trace']] = contextvars.ContextVar('trace', default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('span', default=None)
+_last_trace: Optional['Trace'] = None
+
+
+class Trace:
+    """All spans of one pipeline run"""
+
+    def __init__(self, name: str, directory: Path = TRACE_DIR):
+        self.name = name
+        self.directory = Path(directory)
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._phases: Dict[int, Span] = {}
+        self.root = self.start_span(name, 'run', None)
+
+    def start_span(self, name: str, kind: str, parent: Optional[Span], **attributes: Any) -> Span:
+        span = Span(self, name, kind, parent, **attributes)
+        with self._lock:
+            self.spans.append(span)
+            if parent is not None:
+                parent.children.append(span)
+        return span
+
+    def enter_phase(self, name: str, depth: int) -> Span:
+        """End the open phase at depth (and any below it) and start a new one"""
+        for level in sorted([level for level in self._phases if level >= depth], reverse=True):
+            self._phases.pop(level).finish()
+        parent = self._phases.get(depth - 1, self.root)
+        span = self.start_span(name, 'phase', parent)
+        self._phases[depth] = span
+        return span
+
+    def close(self) -> None:
+        for span in self.spans:
+            span.finish()
+
+    def totals(self) -> Dict[str, float]:
+        """Counters summed over all spans, plus wall time per span kind"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            for key in SUMMED_COUNTERS:
+                totals[key] = totals.get(key, 0) + span.attributes.get(key, 0)
+            if span.kind in ('llm', 'tool', 'subprocess', 'crew'):
+                totals[f'{span.kind}_seconds'] = totals.get(f'{span.kind}_seconds', 0) + span.duration
+                totals[f'{span.kind}_count'] = totals.get(f'{span.kind}_count', 0) + 1
+        return totals
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON export (resourceSpans), loadable by OpenTelemetry collectors and Jaeger"""
+        def value(v: Any) -> Dict[str, Any]:
+            if isinstance(v, bool):
+                return {'boolValue': v}
+            if isinstance(v, int):
+                return {'intValue': str(v)}
+            if isinstance(v, float):
+                return {'doubleValue': v}
+            return {'stringValue': str(v)}
+
+        spans = []
+        for span in self.spans:
+            attributes = {'span.kind': span.kind, **span.attributes}
+            spans.append({
+                'traceId': self.trace_id,
+                'spanId': span.span_id,
+                'parentSpanId': span.parent.span_id if span.parent else '',
+                'name': span.name,
+                'kind': OTLP_KIND_CLIENT if span.kind in ('llm', 'subprocess') else OTLP_KIND_INTERNAL,
+                'startTimeUnixNano': str(int(span.start * 1e9)),
+                'endTimeUnixNano': str(int((span.end or span.start) * 1e9)),
+                'attributes': [{'key': k, 'value': value(v)} for k, v in attributes.items() if v is not None],
+                'status': {'code': 2, 'message': str(span.attributes['error'])} if 'error' in span.attributes
+                          else {'code': 1},
+            })
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': 'developer-ai-agent'}}]},
+            'scopeSpans': [{'scope': {'name': 'tracing'}, 'spans': spans}],
+        }]}
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """Self time in milliseconds per call stack ('run;PHASE 2;crew:development;tool:write_file')"""
+        stacks: Dict[str, int] = {}
+        for span in self.spans:
+            key = ";".join(name.replace(";", ",") for name in span.path)
+            stacks[key] = stacks.get(key, 0) + int(span.self_time * 1000)
+        return {key: ms for key, ms in stacks.items() if ms > 0}
+
+    def export(self) -> Tuple[Path, Path]:
+        """Write the OTLP JSON trace and the collapsed stacks; returns both paths"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.root.start))}"
+        trace_path = self.directory / f"{stem}.trace.json"
+        trace_path.write_text(json.dumps(self.to_otlp(), indent=1), encoding='utf-8')
+        folded_path = self.directory / f"{stem}.folded"
+        folded_path.write_text(
+            "".join(f"{stack} {ms}\n" for stack, ms in sorted(self.collapsed_stacks().items())),
+            encoding='utf-8'
+        )
+        return trace_path, folded_path
+
+    def summary(self) -> List[str]:
+        """Printable breakdown of the run's time"""
+        total = self.root.duration or 1e-9
+        totals = self.totals()
+        lines = [f"\n⏱️  Trace summary ({self.root.duration:.1f}s)"]
+
+        for span in self.spans:
+            if span.kind == 'phase':
+                indent = "  " * (len(span.path) - 1)
+                lines.append(f"{indent}{span.name}: {span.duration:.1f}s ({span.duration / total:.0%})")
+
+        lines.append(
+            f"  LLM: {int(totals.get('llm_count', 0))} calls, {totals.get('llm_seconds', 0):.1f}s, "
+            f"{int(totals.get('tokens', 0)):,} tokens"
+        )
+        lines.append(
+            f"  Tools: {int(totals.get('tool_count', 0))} calls, {totals.get('tool_seconds', 0):.1f}s "
+            f"(subprocesses {int(totals.get('subprocess_count', 0))}, {totals.get('subprocess_seconds', 0):.1f}s)"
+        )
+        lines.append(
+            f"  I/O: {int(totals.get('bytes_read', 0)):,} bytes read, "
+            f"{int(totals.get('bytes_written', 0)):,} bytes written"
+        )
+
+        # Self time per operation name across the whole run
+        frames: Dict[str, List[float]] = {}
+        for span in self.spans:
+            if span.kind in ('llm', 'tool', 'subprocess'):
+                frame = frames.setdefault(span.name, [0, 0.0])
+                frame[0] += 1
+                frame[1] += span.self_time
+        if frames:
+            lines.append("  Top operations by self time:")
+            for name, (count, seconds) in sorted(frames.items(), key=lambda item: -item[1][1])[:SUMMARY_TOP_FRAMES]:
+                lines.append(f"    {seconds:8.1f}s  {count:4d}x  {name}")
+        return lines
+
+
+def current_span() -> Any:
+    """Innermost open span of this context (NULL_SPAN when not tracing)"""
+    span = _current_span.get()
+    if span is not None:
+        return span
+    trace = _current_trace.get() or _last_trace
+    return trace.root if trace is not None else NULL_SPAN
+
+
+@contextmanager
+def start_trace(name: str, directory: Path = TRACE_DIR) -> Iterator[Optional[Trace]]:
+    """Trace everything run inside the block; exports and prints the summary on exit"""
+    global _last_trace
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    trace = Trace(name, directory)
+    _last_trace = trace
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        trace.close()
+        for line in trace.summary():
+            print(line)
+        try:
+            trace_path, folded_path = trace.export()
+            print(f"  Trace: {trace_path}")
+            print(f"  Flamegraph stacks: {folded_path}")
+        except OSError as e:
+            print(f"⚠ Could not write trace: {e}")
+
+
+@contextmanager
+def span(name: str, kind: str = 'internal', measure_io: bool = False, **attributes: Any) -> Iterator[Any]:
+    """Time the block as a child of the current span"""
+    parent = current_span()
+    if parent is NULL_SPAN:
+        yield NULL_SPAN
+        return
+
+    child = parent.trace.start_span(name, kind, parent, **attributes)
+    if measure_io:
+        child.measure_io()
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+
+def enter_phase(name: str, depth: int = 0) -> None:
+    """
+    Mark the start of a pipeline phase (depth 0) or a step inside one (depth 1+).
+
+    Ends the previous phase at the same depth, so phases need no enclosing block;
+    later spans of this context nest under the new phase.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        _current_span.set(trace.enter_phase(name, depth))
+
+
+def add_to_span(**counters: float) -> None:
+    """Increment counters (tokens, bytes ...) on the current span"""
+    current_span().add(**counters)
+
+
+def traced_tool(func: Callable) -> Callable:
+    """Record a span for every call of a tool function (apply under @tool)"""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(f"tool:{func.__name__}", 'tool', measure_io=True) as s:
+            result = func(*args, **kwargs)
+            if isinstance(result, str):
+                s.set(result_chars=len(result))
+            return result
+    return wrapper
+
+
+def subprocess_span(args: Any, **attributes: Any):
+    """Span for running a command, named after its program"""
+    command = args if isinstance(args, str) else " ".join(str(arg) for arg in args)
+    parts = command.split() or ["subprocess"]
+    # "python -m pytest" is more useful as "pytest" than as "python"
+    program = parts[2] if len(parts) > 2 and parts[1] == "-m" else Path(parts[0]).name
+    return span(f"subprocess:{program}", 'subprocess', command=command[:300], **attributes)
+
+
+def traced_run(args: Any, **kwargs: Any) -> subprocess.CompletedProcess:
+    """subprocess.run recorded as a subprocess span (command, exit code, output size)"""
+    with subprocess_span(args) as s:
+        result = subprocess.run(args, **kwargs)
+        s.set(returncode=result.returncode)
+        output = sum(len(stream) for stream in (result.stdout, result.stderr) if stream)
+        if output:
+            s.add(output_bytes=output)
+        return result
+
+
+async def traced_kickoff(crew: Any, name: str) -> Any:
+    """Await crew.kickoff_async() inside a crew span"""
+    with span(f"crew:{name}", 'crew', agents=", ".join(agent.role for agent in crew.agents)):
+        return await crew.kickoff_async()